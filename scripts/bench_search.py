@@ -0,0 +1,116 @@
+"""Benchmark component search on a synthetic catalog.
+
+Compares the legacy tiered list-scan ranking with ComponentCatalog.search
+on a generated 50k-component catalog and checks both return identical
+results.
+
+Usage: python scripts/bench_search.py [--size 50000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+from tools.catalog import ComponentCatalog
+
+
+COMPONENT_WORDS = [
+    "Button", "Input", "Avatar", "Badge", "Checkbox", "Chip", "Dropdown", "Tab Bar",
+    "Table", "Text Area", "Toast", "Tooltip", "Spinner", "Switch", "Radio", "Slider",
+    "Link Cell", "Modal", "Account Card", "Page Header", "Search Module", "Icon Button",
+]
+QUERIES = [
+    "Button", "button", "tab bar", "tabbar", "Link Cell", "linkcell", "text",
+    "Size=L", "card", "Search", "modal", "zzz", "a",
+]
+
+
+def make_components(size: int, seed: int = 42) -> list[dict]:
+    """Generate a component list shaped like /files/{key}/components."""
+    rng = random.Random(seed)
+    components = []
+    for i in range(size):
+        frame = f"{rng.choice(COMPONENT_WORDS)}{rng.choice(['', '', ' ' + str(i % 97)])}"
+        if rng.random() < 0.7:
+            name = f"Size={rng.choice('SML')}, Type={rng.choice(['Primary', 'Secondary', 'Ghost'])}, State={rng.choice(['Default', 'Hover', 'Disabled'])}"
+        else:
+            name = f"{rng.choice(COMPONENT_WORDS)} {i}"
+        components.append({
+            "node_id": f"{i // 1000}:{i}",
+            "name": name,
+            "containing_frame": {"name": frame, "nodeId": f"f:{i % 5000}", "pageId": f"p:{i % 40}"},
+        })
+    return components
+
+
+def legacy_search(components: list[dict], query: str) -> list[dict]:
+    """The list-scan ranking used before the catalog (for comparison)."""
+    query_lower = query.lower().strip()
+    exact_frame = [c for c in components
+                   if c.get("containing_frame", {}).get("name", "").lower().strip() == query_lower]
+    exact_name = [c for c in components
+                  if c["name"].lower().strip() == query_lower and c not in exact_frame]
+    starts_frame = [c for c in components
+                    if c.get("containing_frame", {}).get("name", "").lower().startswith(query_lower)
+                    and c not in exact_frame and c not in exact_name]
+    starts_name = [c for c in components
+                   if c["name"].lower().startswith(query_lower)
+                   and c not in exact_frame and c not in exact_name and c not in starts_frame]
+
+    def clean(s): return s.lower().replace(" ", "").replace("-", "").replace("_", "")
+    query_clean = clean(query)
+    fuzzy_matches = []
+    seen = set(c["node_id"] for c in exact_frame + exact_name + starts_frame + starts_name)
+    if len(query_clean) > 3:
+        for c in components:
+            if c["node_id"] in seen:
+                continue
+            if query_clean in clean(c.get("containing_frame", {}).get("name", "")):
+                fuzzy_matches.append(c)
+                seen.add(c["node_id"])
+                continue
+            if query_clean in clean(c["name"]):
+                fuzzy_matches.append(c)
+                seen.add(c["node_id"])
+    contains = [c for c in components
+                if (query_lower in c["name"].lower()
+                    or query_lower in c.get("containing_frame", {}).get("name", "").lower())
+                and c["node_id"] not in seen]
+    return (exact_frame + exact_name + starts_frame + starts_name + fuzzy_matches + contains)[:20]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the (slow) legacy run")
+    args = parser.parse_args()
+
+    components = make_components(args.size)
+    print(f"🧪 Synthetic catalog: {len(components)} components, {len(QUERIES)} queries")
+
+    start = time.perf_counter()
+    catalog = ComponentCatalog(components, version="bench")
+    print(f"🏗  Catalog build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"\n{'query':<12} {'catalog ms':>11} {'legacy ms':>11}  same")
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = catalog.search(query)
+        catalog_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        legacy_ms, same = float("nan"), "-"
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            expected = legacy_search(components, query)
+            legacy_ms = (time.perf_counter() - start) * 1000
+            same = "✅" if [c["node_id"] for c in expected] == [c["node_id"] for c in results] else "❌"
+
+        print(f"{query!r:<12} {catalog_ms:>11.3f} {legacy_ms:>11.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Build the full-text guide index offline.
+
+Fetches the guide frames of the UI kit and organisms files and the pages
+of the patterns file, and writes the index the app loads for
+search_design_system (FULLTEXT_INDEX_PATH, default
+.cache/fulltext/index.json). The app rebuilds files whose version changed
+on its own; this script saves the cold build on first start.
+
+Usage: python scripts/build_fulltext_index.py [--output PATH] [--query TEXT]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import src.figma_api as figma_api
+from tools.figma_tools import FULLTEXT_INDEX_PATH, build_fulltext_index
+
+
+async def run(output: str, query: str):
+    await figma_api.open_http_client()
+    try:
+        start = time.perf_counter()
+        index = await build_fulltext_index()
+        print(f"🏗  Indexed {len(index)} guides in {time.perf_counter() - start:.1f} s")
+        for file_key, version in index.versions.items():
+            print(f"   {file_key}: version {version}")
+        index.save(output)
+        print(f"💾 Saved to {output}")
+
+        if query:
+            start = time.perf_counter()
+            hits = index.search(query)
+            print(f"\n🔎 {query!r} ({(time.perf_counter() - start) * 1000:.2f} ms)")
+            for hit in hits:
+                print(f"   {hit['score']:>6.2f}  {hit['kind']:<9} {hit['name']}: {hit['snippet']}")
+    finally:
+        await figma_api.close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=FULLTEXT_INDEX_PATH)
+    parser.add_argument("--query", default="", help="Run a sample query after building")
+    args = parser.parse_args()
+    asyncio.run(run(args.output, args.query))
+
+
+if __name__ == "__main__":
+    main()
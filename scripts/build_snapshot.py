@@ -0,0 +1,51 @@
+"""Build the offline design system snapshot.
+
+Fetches names, node ids, guide texts, property definitions and cover
+frames of the UI kit, organisms and patterns files and writes
+design_system_index.json (SNAPSHOT_PATH, default
+src/design_system_index.json), which the app answers common questions
+from without calling Figma. The app refreshes files whose version changed
+on its own; rerun this script to update the bundled copy. The committed
+copy lists names only (format 1) until this script is run with Figma access.
+
+Usage: python scripts/build_snapshot.py [--output PATH]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import src.figma_api as figma_api
+from tools.figma_tools import SNAPSHOT_PATH, build_snapshot
+
+
+async def run(output: str):
+    await figma_api.open_http_client()
+    try:
+        start = time.perf_counter()
+        snapshot = await build_snapshot()
+        print(f"🏗  Built snapshot in {time.perf_counter() - start:.1f} s")
+        for kind, entries in snapshot.entries.items():
+            print(f"   {kind}: {len(entries)}")
+        for file_key, info in snapshot.files.items():
+            print(f"   {file_key}: version {info['version']}")
+        snapshot.save(output)
+        print(f"💾 Saved to {output}")
+    finally:
+        await figma_api.close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+    asyncio.run(run(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# agent package
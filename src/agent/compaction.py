@@ -0,0 +1,176 @@
+"""Tool-result compaction.
+
+Tool results go back into the prompt of the next model turn, so they are
+shrunk first: debug fields are dropped, repeated lines are removed,
+component property definitions are encoded as one line per property, and
+the result is cut down to a per-tool token budget by trimming its longest
+texts and lists.
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+# Token budgets per tool (estimated, see ``estimate_tokens``)
+DEFAULT_BUDGET = 1200
+TOOL_BUDGETS = {
+    "get_design_component_details": 1500,
+    "get_design_pattern_info": 2000,
+    "get_component_variant_image_tool": 600,
+    "search_design_system_tool": 800,
+    "figma_get_comments": 1000,
+}
+
+# Shortest a text is trimmed to, so trimming never leaves a stub
+_MIN_TEXT_CHARS = 200
+_TRIM_MARK = "…"
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate token count of a JSON value (about 4 characters per token)."""
+    return len(json.dumps(value, ensure_ascii=False, default=str)) // 4 + 1
+
+
+@dataclass
+class CompactionReport:
+    """Estimated size of a tool result before and after compaction."""
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def saved(self) -> int:
+        return max(self.tokens_before - self.tokens_after, 0)
+
+
+def dedupe_lines(text: str) -> str:
+    """Drop repeated non-empty lines and runs of blank lines."""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        key = line.strip()
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        elif lines and not lines[-1].strip():
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def encode_props(definitions: dict) -> str:
+    """One line per component property with its default value:
+    "Size: S|M|L = M", "Disabled: bool = false", 'Label: text = "OK"'.
+
+    Figma's "#123:4" suffixes on property names are dropped.
+    """
+    lines = []
+    for prop_name, prop_def in definitions.items():
+        name = prop_name.split("#", 1)[0]
+        p_type = prop_def.get("type")
+        default = prop_def.get("defaultValue")
+        if p_type == "VARIANT":
+            line = f"{name}: {'|'.join(prop_def.get('variantOptions', []))}"
+        elif p_type == "BOOLEAN":
+            line = f"{name}: bool"
+            default = None if default is None else str(default).lower()
+        elif p_type == "TEXT":
+            line = f"{name}: text"
+            default = None if default is None else json.dumps(default, ensure_ascii=False)
+        elif p_type == "INSTANCE_SWAP":
+            line = f"{name}: instance"
+        else:
+            continue
+        lines.append(line if default is None else f"{line} = {default}")
+    return "\n".join(lines)
+
+
+def _strip(value: Any, debug: bool) -> Any:
+    """Copy of ``value`` without debug fields, with deduped texts and encoded props."""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if not debug and key.startswith("_"):
+                continue
+            if key == "props" and isinstance(item, dict) and isinstance(item.get("definitions"), dict):
+                result[key] = encode_props(item["definitions"]) or item.get("summary", "")
+                continue
+            result[key] = _strip(item, debug)
+        return result
+    if isinstance(value, list):
+        return [_strip(item, debug) for item in value]
+    if isinstance(value, str) and "\n" in value:
+        return dedupe_lines(value)
+    return value
+
+
+def _largest(value: Any, path: tuple = ()) -> Optional[tuple[tuple, int]]:
+    """Path and size of the largest trimmable text or list in ``value``."""
+    if isinstance(value, str):
+        return (path, len(value)) if len(value) > _MIN_TEXT_CHARS else None
+    if isinstance(value, list):
+        best = (path, estimate_tokens(value) * 4) if len(value) > 1 else None
+        children = enumerate(value)
+    elif isinstance(value, dict):
+        best = None
+        children = value.items()
+    else:
+        return None
+    for key, item in children:
+        found = _largest(item, path + (key,))
+        if found and (best is None or found[1] > best[1]):
+            best = found
+    return best
+
+
+def _trim_text(text: str, chars: int) -> str:
+    """Cut a text to about ``chars`` characters, at a line break if possible."""
+    chars = max(chars, _MIN_TEXT_CHARS)
+    if len(text) <= chars:
+        return text
+    cut = text.rfind("\n", 0, chars)
+    if cut < chars // 2:
+        cut = chars
+    return text[:cut].rstrip() + _TRIM_MARK
+
+
+def _fit(value: Any, budget: int) -> Any:
+    """Trim the largest texts and lists until ``value`` fits ``budget`` tokens."""
+    while True:
+        excess = estimate_tokens(value) - budget
+        if excess <= 0:
+            return value
+        found = _largest(value)
+        if found is None:
+            return value  # Nothing left to trim
+        path, size = found
+        parent = value
+        for key in path[:-1]:
+            parent = parent[key]
+        target = parent[path[-1]] if path else value
+        if isinstance(target, str):
+            trimmed = _trim_text(target, len(target) - excess * 4)
+            if trimmed == target:
+                return value
+        else:
+            trimmed = target[:max(len(target) // 2, 1)]
+        if not path:
+            value = trimmed
+        else:
+            parent[path[-1]] = trimmed
+
+
+def compact_result(tool_name: str, result: Any, debug: bool = False) -> tuple[Any, CompactionReport]:
+    """Compact a tool result for the model.
+
+    Args:
+        tool_name: Tool that produced the result (selects the token budget)
+        result: JSON-like tool result
+        debug: Keep underscore-prefixed debug fields (e.g. ``_debug_info``)
+
+    Returns:
+        (compacted result, report with token counts before/after)
+    """
+    before = estimate_tokens(result)
+    compacted = _fit(_strip(result, debug), TOOL_BUDGETS.get(tool_name, DEFAULT_BUDGET))
+    return compacted, CompactionReport(before, estimate_tokens(compacted))
@@ -0,0 +1,239 @@
+"""Gemini context caching for the static prompt prefix.
+
+The system instruction and tool declarations are identical for every
+message, so they are uploaded once as a Gemini cached content and requests
+reference it by name instead of resending them. The cache name is shared
+by all sessions of the process and persisted to a small state file, so a
+restart reuses it as well. It is refreshed shortly before it expires.
+
+``LocalCacheBackend`` is an in-memory stand-in for the Gemini caches API,
+for running without network access.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from google.genai import types
+
+
+def tool_declarations(tools: list[Callable]) -> list[types.Tool]:
+    """Convert tool functions to the declarations Gemini sees."""
+    return [types.Tool(function_declarations=[
+        types.FunctionDeclaration.from_callable_with_api_option(callable=tool)
+        for tool in tools
+    ])]
+
+
+def _expires_at(cached: types.CachedContent, ttl: float) -> float:
+    """Expiry of a cached content as a wall-clock timestamp."""
+    if cached.expire_time:
+        return cached.expire_time.timestamp()
+    return time.time() + ttl
+
+
+class GeminiCacheBackend:
+    """Cached contents stored by the Gemini API."""
+
+    def __init__(self, client):
+        self._caches = client.aio.caches
+
+    async def create(self, model: str, config: types.CreateCachedContentConfig) -> types.CachedContent:
+        return await self._caches.create(model=model, config=config)
+
+    async def update(self, name: str, ttl: str) -> types.CachedContent:
+        return await self._caches.update(name=name, config=types.UpdateCachedContentConfig(ttl=ttl))
+
+    async def get(self, name: str) -> types.CachedContent:
+        return await self._caches.get(name=name)
+
+
+class LocalCacheBackend:
+    """In-memory stand-in for the Gemini caches API (offline runs)."""
+
+    def __init__(self):
+        self.entries: dict[str, tuple[types.CreateCachedContentConfig, float]] = {}  # name -> (config, expires_at)
+        self.calls = {"create": 0, "update": 0, "get": 0}
+
+    def _cached(self, name: str) -> types.CachedContent:
+        config, expires_at = self.entries[name]
+        return types.CachedContent(
+            name=name,
+            display_name=config.display_name,
+            expire_time=datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        )
+
+    def _lookup(self, name: str):
+        entry = self.entries.get(name)
+        if entry is None or entry[1] <= time.time():
+            self.entries.pop(name, None)
+            raise LookupError(f"404 NOT_FOUND: cached content {name} not found")
+        return entry
+
+    async def create(self, model: str, config: types.CreateCachedContentConfig) -> types.CachedContent:
+        self.calls["create"] += 1
+        name = f"cachedContents/local-{self.calls['create']}"
+        self.entries[name] = (config, time.time() + float(config.ttl.rstrip("s")))
+        return self._cached(name)
+
+    async def update(self, name: str, ttl: str) -> types.CachedContent:
+        self.calls["update"] += 1
+        config, _ = self._lookup(name)
+        self.entries[name] = (config, time.time() + float(ttl.rstrip("s")))
+        return self._cached(name)
+
+    async def get(self, name: str) -> types.CachedContent:
+        self.calls["get"] += 1
+        self._lookup(name)
+        return self._cached(name)
+
+    def resolve(self, name: str) -> types.CreateCachedContentConfig:
+        """Cached system instruction and tools, for fake model backends."""
+        return self._lookup(name)[0]
+
+
+class PromptCache:
+    """Keeps the system instruction and tools in a Gemini cached content.
+
+    ``generation_config()`` returns a config that references the cached
+    content when it is available and falls back to sending the prefix
+    inline when it is not (caching disabled, prefix below the model's
+    minimum cacheable size, API errors). After a failed upload, caching is
+    retried no sooner than ``retry_after`` seconds later.
+    """
+
+    def __init__(
+        self,
+        backend,  # GeminiCacheBackend, LocalCacheBackend, or None to disable caching
+        model: str,
+        system_instruction: str,
+        tools: list[Callable],
+        ttl: float = 3600,
+        refresh_margin: float = 300,
+        retry_after: float = 600,
+        state_path: Optional[str] = None
+    ):
+        self.backend = backend
+        self.model = model
+        self.system_instruction = system_instruction
+        self.tools = tools
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self.state_path = state_path
+        self.fingerprint = self._fingerprint()
+        self._name: Optional[str] = None
+        self._expires_at = 0.0
+        self._disabled_until = 0.0
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    def _fingerprint(self) -> str:
+        """Hash of everything in the cached prefix; a change means a new cache."""
+        declarations = [t.model_dump(mode="json", exclude_none=True) for t in tool_declarations(self.tools)]
+        payload = json.dumps([self.model, self.system_instruction, declarations], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name of the cached content in use, if any."""
+        return self._name
+
+    def inline_config(self, **kwargs) -> types.GenerateContentConfig:
+        """Config that sends the system instruction and tools with the request."""
+        return types.GenerateContentConfig(system_instruction=self.system_instruction, tools=self.tools, **kwargs)
+
+    async def generation_config(self, **kwargs) -> types.GenerateContentConfig:
+        """Config for a generate call, using the cached prefix when possible."""
+        name = await self.ensure()
+        if name is None:
+            return self.inline_config(**kwargs)
+        return types.GenerateContentConfig(cached_content=name, **kwargs)
+
+    async def ensure(self) -> Optional[str]:
+        """Get a live cached content name, creating or refreshing it as needed."""
+        now = time.time()
+        if self._name and self._expires_at - now > self.refresh_margin:
+            return self._name
+        if self.backend is None or now < self._disabled_until:
+            return None
+
+        async with self._lock:
+            now = time.time()
+            if self._name and self._expires_at - now > self.refresh_margin:
+                return self._name
+            if not self._loaded:
+                self._loaded = True
+                await self._restore()
+                if self._name and self._expires_at - now > self.refresh_margin:
+                    return self._name
+            try:
+                if self._name and self._expires_at > now:
+                    cached = await self.backend.update(self._name, f"{int(self.ttl)}s")
+                else:
+                    cached = await self._create()
+            except Exception as e:
+                if self._name:
+                    # Expired or deleted server-side: upload a new one
+                    self._name = None
+                    try:
+                        cached = await self._create()
+                    except Exception as e:
+                        return self._fail(e)
+                else:
+                    return self._fail(e)
+            self._name = cached.name
+            self._expires_at = _expires_at(cached, self.ttl)
+            self._save()
+            return self._name
+
+    async def _create(self) -> types.CachedContent:
+        print(f"🧠 Uploading prompt cache ({self.fingerprint})")
+        return await self.backend.create(self.model, types.CreateCachedContentConfig(
+            display_name=f"design-system-agent-{self.fingerprint}",
+            system_instruction=self.system_instruction,
+            tools=tool_declarations(self.tools),
+            ttl=f"{int(self.ttl)}s"
+        ))
+
+    def _fail(self, error: Exception) -> None:
+        print(f"⚠️ Prompt cache unavailable, sending prompt inline: {error}")
+        self._name = None
+        self._disabled_until = time.time() + self.retry_after
+        return None
+
+    def invalidate(self):
+        """Drop the cached content name (e.g. after the API rejected it)."""
+        self._name = None
+        self._expires_at = 0.0
+
+    async def _restore(self):
+        """Reuse a cached content from a previous process if it's still live."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("fingerprint") != self.fingerprint or state.get("expires_at", 0) <= time.time():
+            return
+        try:
+            cached = await self.backend.get(state["name"])
+        except Exception:
+            return
+        self._name = cached.name
+        self._expires_at = _expires_at(cached, self.ttl)
+
+    def _save(self):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "name": self._name, "expires_at": self._expires_at}, f)
+        except OSError as e:
+            print(f"⚠️ Could not save prompt cache state: {e}")
@@ -0,0 +1,169 @@
+"""Deterministic intent router.
+
+Plain lookup questions ("Расскажи про Button", "Какие варианты у Input?")
+are matched against the local name index (``design_system_index.json``)
+and answered from the tool result with a template, without a model call.
+Anything the router is not sure about returns None and goes to Gemini.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from tools.fuzzy import FuzzyIndex, edit_distance, normalize
+
+
+DETAILS = "details"
+VARIANTS = "variants"
+
+# Lookup phrasings; the rest of the message must be just a name
+_INTENTS = [
+    (VARIANTS, re.compile(
+        r"^(?:какие|покажи|перечисли)?\s*(?:есть\s+)?(?:варианты|состояния|свойства|пропсы)"
+        r"(?:\s+(?:есть\s+)?(?:у|для|в))?\s+(?P<name>.+)$"
+    )),
+    (VARIANTS, re.compile(r"^(?:what|which)\s+(?:variants|props|properties)\s+(?:does|do|has|have)\s+(?P<name>.+?)(?:\s+have)?$")),
+    (DETAILS, re.compile(
+        r"^(?:расскажи|расскажите)\s+(?:мне\s+)?(?:про|о|об|по)\s+(?P<name>.+)$"
+        r"|^(?:что\s+такое|что\s+за|покажи|гайд\s+(?:по|для)|информация\s+(?:о|об|по))\s+(?P<name2>.+)$"
+    )),
+    (DETAILS, re.compile(r"^(?:tell\s+me\s+about|what\s+is|show(?:\s+me)?)\s+(?:the\s+)?(?P<name>.+)$")),
+]
+
+# Words naming the kind of thing asked about ("компонент Button", "паттерн Валидация")
+_KIND_WORDS = {
+    "компонент": "components", "компонента": "components", "компоненте": "components", "component": "components",
+    "паттерн": "patterns", "паттерна": "patterns", "паттерне": "patterns", "pattern": "patterns",
+    "организм": "organisms", "организма": "organisms", "организме": "organisms", "organism": "organisms",
+}
+
+# Message length beyond which a question is unlikely to be a plain lookup
+_MAX_MESSAGE_LENGTH = 80
+
+# Guide text shown in a templated answer
+GUIDE_LIMIT = 3000
+
+
+@dataclass
+class Route:
+    """A confidently recognized lookup question."""
+    kind: str    # "components", "organisms" or "patterns"
+    name: str    # Name as listed in the index
+    intent: str  # DETAILS or VARIANTS
+
+
+class IntentRouter:
+    """Matches lookup questions against known component and pattern names."""
+
+    def __init__(self, names: dict[str, list[str]]):
+        self._exact: dict[str, list[tuple[str, str]]] = {}  # normalized name -> [(kind, name)]
+        self._fuzzy = FuzzyIndex(max_distance=1)
+        self._kinds: dict[str, set[str]] = {}  # name -> kinds
+        for kind, kind_names in names.items():
+            for name in kind_names:
+                self._exact.setdefault(normalize(name), []).append((kind, name))
+                self._kinds.setdefault(name, set()).add(kind)
+                self._fuzzy.add(name)
+
+    def route(self, message: str) -> Optional[Route]:
+        """Recognize a lookup question, or None if unsure."""
+        text = message.strip().lower().replace("ё", "е")
+        text = re.sub(r"[?!.,:;«»\"'`]+", " ", text)
+        text = re.sub(r"\s+", " ", text).strip()
+        if not text or len(text) > _MAX_MESSAGE_LENGTH:
+            return None
+
+        intent, name_part = DETAILS, text  # A bare name asks for details
+        for candidate_intent, pattern in _INTENTS:
+            match = pattern.match(text)
+            if match:
+                intent = candidate_intent
+                name_part = next(g for g in match.groups() if g)
+                break
+
+        words = name_part.split()
+        kind_hint = None
+        while words and words[0] in _KIND_WORDS:
+            kind_hint = _KIND_WORDS[words.pop(0)]
+        while words and words[-1] in _KIND_WORDS:
+            kind_hint = _KIND_WORDS[words.pop()]
+        if not words:
+            return None
+
+        matches = self._match(" ".join(words))
+        if kind_hint:
+            matches = [(kind, name) for kind, name in matches if kind == kind_hint]
+        if len(matches) != 1:
+            return None  # Unknown or ambiguous name
+        kind, name = matches[0]
+        if intent == VARIANTS and kind == "patterns":
+            return None
+        return Route(kind=kind, name=name, intent=intent)
+
+    def _match(self, query: str) -> list[tuple[str, str]]:
+        """Names equal to ``query``, or the single name one typo/ending away."""
+        term = normalize(query)
+        exact = self._exact.get(term)
+        if exact:
+            return exact
+        if len(term) < 5:
+            return []
+        # Russian case endings ("валидацию") and single typos ("Chekbox")
+        close = [name for _, name in self._fuzzy.lookup(query, limit=3)
+                 if edit_distance(term, normalize(name), 1) <= 1]
+        if len(close) != 1:
+            return []
+        return [(kind, close[0]) for kind in sorted(self._kinds[close[0]])]
+
+
+def _same_name(a: str, b: str) -> bool:
+    a, b = normalize(a), normalize(b)
+    return bool(a and b) and (a == b or a in b or b in a)
+
+
+def _trim_guide(guide: str) -> str:
+    if len(guide) <= GUIDE_LIMIT:
+        return guide
+    cut = guide.rfind("\n", 0, GUIDE_LIMIT)
+    return guide[:cut if cut > 0 else GUIDE_LIMIT].rstrip() + "\n\n…"
+
+
+def render(route: Route, result: dict) -> Optional[str]:
+    """Answer text for a routed question from the tool result.
+
+    Returns None when the result doesn't clearly answer the question
+    (error, a different component was found, nothing to show), so the
+    caller can fall back to the model.
+    """
+    if not result or result.get("error"):
+        return None
+
+    if route.kind == "patterns":
+        if not _same_name(result.get("name", ""), route.name) or not result.get("guide"):
+            return None
+        lines = [f"### {result['name']}", "", _trim_guide(result["guide"])]
+        if result.get("examples"):
+            lines += ["", f"**Примеры:** {', '.join(result['examples'])}"]
+        if result.get("related_patterns"):
+            lines += ["", f"**Похожие паттерны:** {', '.join(result['related_patterns'])}"]
+    else:
+        found_name = result.get("found_name", "")
+        if not _same_name(found_name, route.name):
+            return None
+        summary = (result.get("props") or {}).get("summary")
+        lines = [f"### {found_name}"]
+        if route.intent == VARIANTS:
+            if not summary:
+                return None
+            lines += ["", "**Свойства и варианты:**", summary]
+            if result.get("variants_count"):
+                lines += ["", f"Всего вариантов: {result['variants_count']}"]
+        else:
+            if not result.get("guide"):
+                return None
+            lines += ["", _trim_guide(result["guide"])]
+            if summary:
+                lines += ["", "**Свойства:**", summary]
+
+    if result.get("figma_link"):
+        lines += ["", f"🔗 [Открыть в Figma]({result['figma_link']})"]
+    return "\n".join(lines)
@@ -0,0 +1,210 @@
+"""Process-wide scheduler for Gemini calls.
+
+All sessions share one quota, so model calls are admitted centrally: at
+most ``max_concurrent`` run at once, requests and tokens per minute stay
+within budget, and waiting requests are served round-robin per user so
+one busy user can't starve the others. A 429 pauses admission for
+everyone instead of letting every session retry on its own.
+"""
+import asyncio
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+
+class Budget:
+    """Continuously refilled budget of ``per_minute`` units (requests or tokens)."""
+
+    def __init__(self, per_minute: int):
+        self.rate = max(per_minute, 1) / 60.0
+        self.capacity = float(max(per_minute, 1))
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill(time.monotonic())
+        # A request larger than the whole budget only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float):
+        self._refill(time.monotonic())
+        self.available -= amount
+
+    def adjust(self, amount: float):
+        """Correct an earlier estimate (positive = more was used)."""
+        self.available -= amount
+
+
+@dataclass
+class Ticket:
+    """A request waiting for (or holding) a model call slot."""
+    user: str
+    tokens: int
+    future: asyncio.Future = field(repr=False)
+
+
+class LLMScheduler:
+    """Admits model calls under a concurrency limit and RPM/TPM budgets."""
+
+    def __init__(self, max_concurrent: int, rpm: int, tpm: int):
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._requests = Budget(rpm)
+        self._tokens = Budget(tpm)
+        self._queues: OrderedDict[str, deque[Ticket]] = OrderedDict()  # user -> waiting tickets, in serving order
+        self._blocked_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> int:
+        """Number of model calls in progress."""
+        return self._active
+
+    def queue_length(self) -> int:
+        """Number of waiting requests."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place of a waiting ticket in the round-robin order, 0 if not waiting."""
+        queues = [list(queue) for queue in self._queues.values()]
+        place = 0
+        for round_index in range(max((len(q) for q in queues), default=0)):
+            for queue in queues:
+                if round_index < len(queue):
+                    place += 1
+                    if queue[round_index] is ticket:
+                        return place
+        return 0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user: str,
+        tokens: int,
+        on_wait: Optional[Callable[[int], Awaitable[None]]] = None
+    ):
+        """Hold a model call slot for the duration of the block.
+
+        Yields a dict; set ``used_tokens`` in it to the actual token count
+        to correct the TPM estimate. ``on_wait(position)`` is awaited when
+        the request has been queued for a while and its position changes.
+        """
+        await self._acquire(user, tokens, on_wait)
+        usage = {"used_tokens": None}
+        try:
+            yield usage
+        finally:
+            if usage["used_tokens"] is not None:
+                self._tokens.adjust(usage["used_tokens"] - tokens)
+            self._active -= 1
+            self._wakeup.set()
+
+    async def _acquire(self, user: str, tokens: int, on_wait):
+        ticket = Ticket(user, tokens, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(user, deque()).append(ticket)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+        reported = None
+        try:
+            while not ticket.future.done():
+                await asyncio.wait({ticket.future}, timeout=0.5)
+                position = self.position(ticket)
+                if on_wait and position and position != reported:
+                    reported = position
+                    await on_wait(position)
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # Slot was granted just as we were cancelled; give it back
+                self._active -= 1
+                self._wakeup.set()
+            else:
+                ticket.future.cancel()
+                self._discard(ticket)
+            raise
+
+    def _discard(self, ticket: Ticket):
+        queue = self._queues.get(ticket.user)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user]
+
+    def _next_ticket(self) -> Optional[Ticket]:
+        """Head ticket of the next user in round-robin order."""
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()
+            if queue:
+                return queue[0]
+            del self._queues[user]
+        return None
+
+    async def _dispatch(self):
+        """Grant slots while there are waiting requests."""
+        while True:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return
+            now = time.monotonic()
+            wait = max(
+                self._blocked_until - now,
+                self._requests.wait_time(1),
+                self._tokens.wait_time(ticket.tokens),
+            )
+            if self._active >= self.max_concurrent or wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Grant, then move this user behind the others
+            queue = self._queues[ticket.user]
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(ticket.user)
+            else:
+                del self._queues[ticket.user]
+            self._requests.take(1)
+            self._tokens.take(ticket.tokens)
+            self._active += 1
+            ticket.future.set_result(None)
+
+    def penalize(self, seconds: float):
+        """Pause admission for everyone after the API reported a rate limit."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._wakeup.set()
+
+
+def retry_delay(error: Exception, attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Delay before retrying a rate-limited call.
+
+    Uses the server's ``retryDelay`` hint when the error carries one,
+    otherwise full-jitter exponential backoff.
+    """
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    if match:
+        return float(match.group(1)) + random.uniform(0, 1)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """Whether a Gemini API error is a quota/rate-limit rejection."""
+    return getattr(error, "code", None) == 429 or "429" in str(error) or "RESOURCE_EXHAUSTED" in str(error)
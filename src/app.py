@@ -4,14 +4,14 @@ Features:
 - Gemini 3 Flash Preview with Thinking mode
 - Complete Figma API Toolset (27+ methods)
 - Beautiful tool call visualization with cl.Step
-- Automatic Function Calling (AFC)
+- Concurrent function calling with token-streamed answers
 """
 import chainlit as cl
 from google import genai
 from google.genai import types
 import os
 import asyncio
-import json
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,18 +21,22 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 import src.figma_api as figma_api
 from tools.figma_tools import (
-    get_file_key, 
-    analyze_figma_url, 
     search_components, 
     get_component_details,
-    search_patterns,
     get_pattern_info,
     search_design_system,
-    generate_figma_link,
     get_variant_image,
+    get_snapshot,
+    load_snapshot,
+    start_snapshot_refresh,
     FIGMA_UI_KIT_KEY,
-    FIGMA_PATTERNS_KEY
+    FILE_KEYS
 )
+from tools.snapshot import Snapshot
+from agent.prompt_cache import PromptCache, GeminiCacheBackend
+from agent.router import IntentRouter, render as render_route
+from agent.scheduler import LLMScheduler, is_rate_limit, retry_delay
+from agent.compaction import compact_result
 
 # Initialize Gemini client
 client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
@@ -40,17 +44,9 @@ client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 
 # =============================================================================
 # =============================================================================
-# Helper for Async execution in Sync Tools
+# Helpers
 # =============================================================================
 
-def run_async(coro):
-    """Run async coroutine in a sync context."""
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
 def resolve_file_key(file_alias: str) -> str:
     """Resolve file alias to actual Figma file key."""
     if file_alias == "ui-kit":
@@ -58,35 +54,40 @@ def resolve_file_key(file_alias: str) -> str:
     return file_alias
 
 # =============================================================================
-import httpx
+# Image Proxy
+# =============================================================================
 
-# Helper to safely send image from sync tool
-def send_image_sync(url: str, name: str):
-    """Download and send image to Chainlit UI synchronously."""
+async def send_image(url: str, name: str):
+    """Send an image to Chainlit UI from the image cache, or download it."""
     try:
-        # Download image content (server-side, bypassing client S3 blocks)
-        with httpx.Client() as http:
-            resp = http.get(url, timeout=10)
-            if resp.status_code == 200:
-                image_data = resp.content
-                
-                # Send to Chainlit
-                # cl.run_sync runs an async function from a sync context
-                async def _send():
-                    await cl.Message(
-                        content="", 
-                        elements=[
-                            cl.Image(content=image_data, name=name, display="inline")
-                        ]
-                    ).send()
-                
-                cl.run_sync(_send())
+        if os.path.isfile(url):
+            # Cached render: no Figma or S3 round trip
+            with open(url, "rb") as f:
+                content = f.read()
+        else:
+            # Download image content (server-side, bypassing client S3 blocks)
+            http = figma_api.get_http_client()
+            resp = await http.get(url, timeout=10)
+            if resp.status_code != 200:
+                return
+            content = resp.content
+        await cl.Message(
+            content="", 
+            elements=[
+                cl.Image(content=content, name=name, display="inline")
+            ]
+        ).send()
     except Exception as e:
         print(f"Failed to send image: {e}")
-# Sync Tools (No Visualization for AFC Compatibility)
+
+# =============================================================================
+# Async Tools (No Visualization for AFC Compatibility)
+#
+# Tools are coroutines: AFC awaits them on the Chainlit event loop, so a
+# slow Figma fetch yields to other sessions instead of blocking them.
 # =============================================================================
 
-def get_design_component_details(component_name: str, file: str = "ui-kit") -> dict:
+async def get_design_component_details(component_name: str, file: str = "ui-kit", question: str = "") -> dict:
     """SUPER TOOL: Get full component details (guide, variants, tokens).
     
     ALWAYS use this tool when asked about a component (e.g. "Tell me about Button").
@@ -94,20 +95,20 @@ def get_design_component_details(component_name: str, file: str = "ui-kit") -> d
     Args:
         component_name: Name of the component (e.g. "Button", "Input")
         file: File alias (default: "ui-kit")
+        question: The user's specific question (e.g. "какая высота?"), to get only
+            the relevant guide passages. Leave empty for a general overview.
     """
     file_key = resolve_file_key(file)
-    res = run_async(
-        get_component_details(file_key, component_name)
-    )
+    res = await get_component_details(file_key, component_name, question=question or None)
     
     # Check for image and proxy it
     if res and res.get("image_url"):
-        send_image_sync(res["image_url"], f"{component_name}_preview")
+        await send_image(res["image_url"], f"{component_name}_preview")
         res["image_url"] = "Image sent to chat." # Hide raw URL from model
         
     return res
 
-def find_components(query: str, file: str = "ui-kit") -> list:
+async def find_components(query: str, file: str = "ui-kit") -> list:
     """Smart search for components by name (fuzzy match).
     
     Args:
@@ -115,12 +116,10 @@ def find_components(query: str, file: str = "ui-kit") -> list:
         file: File alias to search in (default: "ui-kit")
     """
     file_key = resolve_file_key(file)
-    return run_async(
-        search_components(query, file_key)
-    )
+    return await search_components(query, file_key)
 
 
-def get_design_pattern_info(pattern_name: str) -> dict:
+async def get_design_pattern_info(pattern_name: str, question: str = "") -> dict:
     """Get detailed info about a design PATTERN (not component).
     
     Use this for UX patterns like: validation, modals, forms, navigation, etc.
@@ -128,19 +127,19 @@ def get_design_pattern_info(pattern_name: str) -> dict:
     
     Args:
         pattern_name: Name of the pattern (e.g. "Валидация", "Модальные", "Формы")
+        question: The user's specific question (e.g. "когда показывать ошибку?"), to get
+            only the relevant guide passages. Leave empty for a general overview.
     """
-    res = run_async(
-        get_pattern_info(pattern_name)
-    )
+    res = await get_pattern_info(pattern_name, question=question or None)
     
     if res and res.get("image_url"):
-         send_image_sync(res["image_url"], f"{pattern_name}_preview")
+         await send_image(res["image_url"], f"{pattern_name}_preview")
          res["image_url"] = "Image sent to chat."
          
     return res
 
 
-def search_design_system_tool(query: str) -> list:
+async def search_design_system_tool(query: str, mode: str = "keyword") -> list:
     """Search across ALL design system: components AND patterns.
     
     Use this when user asks a general question that could be about either.
@@ -148,12 +147,12 @@ def search_design_system_tool(query: str) -> list:
     
     Args:
         query: Search term (e.g. "модальные", "кнопка", "валидация")
+        mode: "keyword" (names and guide text) or "similar" (for descriptions in
+            the user's own words, e.g. "штука снизу экрана с действиями")
     """
-    return run_async(
-        search_design_system(query)
-    )
+    return await search_design_system(query, mode=mode)
 
-def get_component_variant_image_tool(component_name: str, description: str) -> dict:
+async def get_component_variant_image_tool(component_name: str, description: str) -> dict:
     """Generate/Get image for a SPECIFIC component variant (e.g. Primary Button).
     
     Use this when user asks to "make", "show", "generate" a specific version.
@@ -162,167 +161,111 @@ def get_component_variant_image_tool(component_name: str, description: str) -> d
         component_name: Component name (e.g. "Button")
         description: Desired properties (e.g. "primary small disabled")
     """
-    res = run_async(
-        get_variant_image(component_name, description)
-    )
+    res = await get_variant_image(component_name, description)
     
     if res and res.get("image_url"):
-        send_image_sync(res["image_url"], res.get("variant_name", "variant"))
+        await send_image(res["image_url"], res.get("variant_name", "variant"))
         res["image_url"] = "Image sent to chat."
         
     return res
 
 # --- File Methods ---
 
-def figma_get_file(file_key: str, depth: int = 2) -> dict:
+async def figma_get_file(file_key: str, depth: int = 2) -> dict:
     """Get a Figma file by key."""
-    return run_async(
-        figma_api.figma_get_file(file_key, depth=depth)
-    )
+    return await figma_api.figma_get_file(file_key, depth=depth)
 
-def figma_get_file_nodes(file_key: str, ids: list[str]) -> dict:
+async def figma_get_file_nodes(file_key: str, ids: list[str]) -> dict:
     """Get specific nodes from a Figma file."""
-    return run_async(
-        figma_api.figma_get_file_nodes(file_key, ids)
-    )
+    return await figma_api.figma_get_file_nodes(file_key, ids)
 
-def figma_get_images(file_key: str, ids: list[str], format: str = "png") -> dict:
+async def figma_get_images(file_key: str, ids: list[str], format: str = "png") -> dict:
     """Render images from a Figma file."""
-    return run_async(
-        figma_api.figma_get_images(file_key, ids, format=format)
-    )
+    return await figma_api.figma_get_images(file_key, ids, format=format)
 
-def figma_get_image_fills(file_key: str) -> dict:
+async def figma_get_image_fills(file_key: str) -> dict:
     """Get image fills in a Figma file."""
-    return run_async(
-        figma_api.figma_get_image_fills(file_key)
-    )
+    return await figma_api.figma_get_image_fills(file_key)
 
-def figma_get_file_versions(file_key: str) -> dict:
+async def figma_get_file_versions(file_key: str) -> dict:
     """Get version history of a Figma file."""
-    return run_async(
-        figma_api.figma_get_file_versions(file_key)
-    )
+    return await figma_api.figma_get_file_versions(file_key)
 
 # --- Comment Methods ---
 
-def figma_get_comments(file_key: str) -> dict:
+async def figma_get_comments(file_key: str) -> dict:
     """Get comments in a Figma file."""
-    return run_async(
-        figma_api.figma_get_comments(file_key)
-    )
+    return await figma_api.figma_get_comments(file_key)
 
-def figma_post_comment(file_key: str, message: str, comment_id: str = None) -> dict:
+async def figma_post_comment(file_key: str, message: str, comment_id: str = None) -> dict:
     """Add a comment to a Figma file or reply to a comment."""
-    return run_async(
-        figma_api.figma_post_comment(file_key, message, comment_id=comment_id)
-    )
+    return await figma_api.figma_post_comment(file_key, message, comment_id=comment_id)
 
-def figma_delete_comment(file_key: str, comment_id: str) -> dict:
+async def figma_delete_comment(file_key: str, comment_id: str) -> dict:
     """Delete a comment from a Figma file."""
-    return run_async(
-        figma_api.figma_delete_comment(file_key, comment_id)
-    )
+    return await figma_api.figma_delete_comment(file_key, comment_id)
 
-def figma_get_comment_reactions(file_key: str, comment_id: str) -> dict:
+async def figma_get_comment_reactions(file_key: str, comment_id: str) -> dict:
     """Get reactions for a comment."""
-    return run_async(
-        figma_api.figma_get_comment_reactions(file_key, comment_id)
-    )
+    return await figma_api.figma_get_comment_reactions(file_key, comment_id)
 
-def figma_post_comment_reaction(file_key: str, comment_id: str, emoji: str) -> dict:
+async def figma_post_comment_reaction(file_key: str, comment_id: str, emoji: str) -> dict:
     """Add a reaction to a comment."""
-    return run_async(
-        figma_api.figma_post_comment_reaction(file_key, comment_id, emoji)
-    )
+    return await figma_api.figma_post_comment_reaction(file_key, comment_id, emoji)
 
-def figma_delete_comment_reaction(file_key: str, comment_id: str, emoji: str) -> dict:
+async def figma_delete_comment_reaction(file_key: str, comment_id: str, emoji: str) -> dict:
     """Delete a reaction from a comment."""
-    return run_async(
-        figma_api.figma_delete_comment_reaction(file_key, comment_id, emoji)
-    )
+    return await figma_api.figma_delete_comment_reaction(file_key, comment_id, emoji)
 
 # --- Team and Project Methods ---
 
-def figma_get_team_projects(team_id: str) -> dict:
+async def figma_get_team_projects(team_id: str) -> dict:
     """Get projects in a team."""
-    return run_async(
-        figma_api.figma_get_team_projects(team_id)
-    )
+    return await figma_api.figma_get_team_projects(team_id)
 
-def figma_get_project_files(project_id: str) -> dict:
+async def figma_get_project_files(project_id: str) -> dict:
     """Get files in a project."""
-    return run_async(
-        figma_api.figma_get_project_files(project_id)
-    )
+    return await figma_api.figma_get_project_files(project_id)
 
 # --- Component Methods ---
 
-def figma_get_team_components(team_id: str, page_size: int = 30) -> dict:
+async def figma_get_team_components(team_id: str, page_size: int = 30) -> dict:
     """Get components in a team library."""
-    return run_async(
-        figma_api.figma_get_team_components(team_id, page_size)
-    )
+    return await figma_api.figma_get_team_components(team_id, page_size)
 
-def figma_get_file_components(file_key: str) -> dict:
+async def figma_get_file_components(file_key: str) -> dict:
     """Get components in a file."""
-    return run_async(
-        figma_api.figma_get_file_components(file_key)
-    )
+    return await figma_api.figma_get_file_components(file_key)
 
-def figma_get_component(component_key: str) -> dict:
+async def figma_get_component(component_key: str) -> dict:
     """Get a component by key."""
-    return run_async(
-        figma_api.figma_get_component(component_key)
-    )
+    return await figma_api.figma_get_component(component_key)
 
-def figma_get_team_component_sets(team_id: str, page_size: int = 30) -> dict:
+async def figma_get_team_component_sets(team_id: str, page_size: int = 30) -> dict:
     """Get component sets in a team library."""
-    return run_async(
-        figma_api.figma_get_team_component_sets(team_id, page_size)
-    )
+    return await figma_api.figma_get_team_component_sets(team_id, page_size)
 
-def figma_get_file_component_sets(file_key: str) -> dict:
+async def figma_get_file_component_sets(file_key: str) -> dict:
     """Get component sets in a file."""
-    return run_async(
-        figma_api.figma_get_file_component_sets(file_key)
-    )
+    return await figma_api.figma_get_file_component_sets(file_key)
 
-def figma_get_component_set(component_set_key: str) -> dict:
+async def figma_get_component_set(component_set_key: str) -> dict:
     """Get a component set by key."""
-    return run_async(
-        figma_api.figma_get_component_set(component_set_key)
-    )
+    return await figma_api.figma_get_component_set(component_set_key)
 
 # --- Style Methods ---
 
-def figma_get_team_styles(team_id: str, page_size: int = 30) -> dict:
+async def figma_get_team_styles(team_id: str, page_size: int = 30) -> dict:
     """Get styles in a team library."""
-    return run_async(
-        figma_api.figma_get_team_styles(team_id, page_size)
-    )
+    return await figma_api.figma_get_team_styles(team_id, page_size)
 
-def figma_get_file_styles(file_key: str) -> dict:
+async def figma_get_file_styles(file_key: str) -> dict:
     """Get styles in a file."""
-    return run_async(
-        figma_api.figma_get_file_styles(file_key)
-    )
+    return await figma_api.figma_get_file_styles(file_key)
 
-def figma_get_style(style_key: str) -> dict:
+async def figma_get_style(style_key: str) -> dict:
     """Get a style by key."""
-    return run_async(
-        figma_api.figma_get_style(style_key)
-    )
-
-# --- Helper Methods ---
-
-async def helper_analyze_url(url: str) -> dict:
-    """Analyze Figma URL and return details."""
-    return await call_tool(
-        "analyze_figma_url", 
-        {"url": url}, 
-        analyze_figma_url(url)
-    )
+    return await figma_api.figma_get_style(style_key)
 
 
 # =============================================================================
@@ -338,6 +281,22 @@ TOOLS = [
     figma_get_comments,            # For comments
     figma_post_comment,            # For adding comments
 ]
+TOOL_MAP = {tool.__name__: tool for tool in TOOLS}
+
+MODEL = "gemini-2.5-flash"
+TOOL_TIMEOUT = 90.0   # Seconds per tool call
+MAX_TOOL_TURNS = 5    # Model turns that may request tools before answering
+NO_TOOLS = types.ToolConfig(function_calling_config=types.FunctionCallingConfig(mode="NONE"))
+TOOL_LIMIT_MESSAGE = "⚠️ Не удалось собрать ответ за отведённое число обращений к Figma. Попробуйте уточнить вопрос."
+MAX_MODEL_RETRIES = 6 # Rate-limited attempts per model turn
+DEBUG_TOOL_RESULTS = os.getenv("DEBUG_TOOL_RESULTS", "0") == "1"  # Keep _debug_info for the model
+
+# Shared by all sessions: Gemini quota is per API key, not per chat
+llm_scheduler = LLMScheduler(
+    max_concurrent=int(os.getenv("GEMINI_MAX_CONCURRENT", "8")),
+    rpm=int(os.getenv("GEMINI_RPM", "1000")),
+    tpm=int(os.getenv("GEMINI_TPM", "1000000"))
+)
 
 SYSTEM_PROMPT = """Ты — AI-ассистент по дизайн-системе Figma.
 
@@ -368,16 +327,20 @@ UX-практики: Валидация, Формы, Навигация по э
 
 ## ИСПОЛЬЗОВАНИЕ СВОЙСТВ
 
-В ответе `get_design_component_details` есть поле `props.summary`:
+В ответе `get_design_component_details` поле `props` — строки вида `Свойство: значения = по умолчанию`:
+- `Size: S|M|L = M` — вариант (допустимые значения через `|`)
+- `Disabled: bool = false` — флаг
+- `Label: text = "Кнопка"` — текст
+- `Icon: instance = 1:23` — слот для вложенного компонента
 - **ИСПОЛЬЗУЙ ЕГО** для описания компонента.
 - **НЕ ПЕРЕЧИСЛЯЙ** список вариантов из поля `variants`, если их много. Лучше написать: "Основные свойства: размер, цвет, состояние...".
-- Если есть `props.definitions` (для кода), используй их для генерации примеров, если просят код.
+- Если просят код, генерируй примеры по этим строкам; значения по умолчанию можно не указывать.
 
 ## ГЕНЕРАЦИЯ (КОД + ИЗОБРАЖЕНИЕ)
 
 Если попросили "сгенерировать", "сделать" или "показать" конкретный варинт (кнопку primary):
 
-1. **Код**: используй `get_design_component_details` → поле `props.definitions` → генерируй JSX
+1. **Код**: используй `get_design_component_details` → поле `props` → генерируй JSX
 2. **Изображение**: вызови `get_component_variant_image_tool(name, properties)`
    
 Пример вопроса: "Сделай кнопку primary small"
@@ -396,7 +359,7 @@ UX-практики: Валидация, Формы, Навигация по э
 
 ## ОТЛАДКА
 
-Если в ответе есть поле `_debug_info` и что-то не нашлось (картинка или свойства):
+Поле `_debug_info` приходит только в режиме отладки. Если оно есть и что-то не нашлось (картинка или свойства):
 - Сообщи пользователю технические детали: "Debug Info: Page={page_id}, Target={target_id}, Via={image_found_via}".
 - Это поможет разработчику исправить ошибку.
 
@@ -407,7 +370,59 @@ UX-практики: Валидация, Формы, Навигация по э
 - Всегда давай ссылку на Figma
 """
 
+# System prompt and tool schemas are uploaded once as a Gemini cached content
+prompt_cache = PromptCache(
+    GeminiCacheBackend(client) if os.getenv("GEMINI_CONTEXT_CACHE", "1") != "0" else None,
+    MODEL,
+    SYSTEM_PROMPT,
+    TOOLS,
+    ttl=float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "3600")),
+    state_path=os.getenv("GEMINI_CACHE_STATE", ".cache/gemini/prompt_cache.json")
+)
+
+# Offline snapshot of names, guides and props (refreshed in the background)
+snapshot = load_snapshot()
+print(f"📦 Snapshot: {len(snapshot)} entries, built {snapshot.built_at or 'never'}")
+if not snapshot.detailed():
+    print("⚠️ Snapshot has names only; run scripts/build_snapshot.py to answer lookups offline")
+
+# Plain lookups ("Расскажи про Button") are answered without the model
+FAST_PATH = os.getenv("FAST_PATH", "1") != "0"
+_router: tuple[Optional[Snapshot], Optional[IntentRouter]] = (None, None)  # (snapshot, its router)
+
+
+def get_router() -> Optional[IntentRouter]:
+    """Intent router over the current snapshot's names (None when the fast path is off).
+    
+    Rebuilt whenever the background refresh swaps in a new snapshot, so
+    components added in Figma are routed without a restart.
+    """
+    global _router
+    if not FAST_PATH:
+        return None
+    current = get_snapshot()
+    if _router[0] is not current:
+        _router = (current, IntentRouter(current.names()))
+    return _router[1]
+
+
+
+@cl.on_app_startup
+async def on_app_startup():
+    """Open the shared Figma HTTP client, upload the prompt cache and refresh the snapshot."""
+    try:
+        await figma_api.open_http_client()
+    except ValueError as e:
+        print(f"Figma client not started: {e}")
+    else:
+        start_snapshot_refresh()
+    await prompt_cache.ensure()
+
 
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    """Close pooled Figma connections."""
+    await figma_api.close_http_client()
 
 
 @cl.on_chat_start
@@ -432,42 +447,201 @@ async def on_chat_start():
 
 
 
+async def run_tool_call(call: types.FunctionCall) -> types.Part:
+    """Execute one model function call with a timeout and wrap the result.
+    
+    Each call is shown as its own live step while it runs. Results are
+    compacted to the tool's token budget before they go back to the model.
+    """
+    async with cl.Step(name=f"🔧 {call.name}", type="tool") as tool_step:
+        tool_step.input = call.args or {}
+        func = TOOL_MAP.get(call.name)
+        if func is None:
+            response = {"error": f"Unknown tool: {call.name}"}
+        else:
+            try:
+                result = await asyncio.wait_for(func(**(call.args or {})), timeout=TOOL_TIMEOUT)
+                result, report = compact_result(call.name, result, debug=DEBUG_TOOL_RESULTS)
+                if report.saved:
+                    tool_step.name += f" (−{report.saved} tokens)"
+                response = {"result": result}
+            except asyncio.TimeoutError:
+                response = {"error": f"Tool '{call.name}' timed out after {TOOL_TIMEOUT:.0f}s"}
+            except Exception as e:
+                response = {"error": str(e)}
+        tool_step.output = response
+    
+    part = types.Part.from_function_response(name=call.name, response=response)
+    part.function_response.id = call.id
+    return part
+
+
+def current_user() -> str:
+    """Identity for fair queuing: the signed-in user, else the chat session."""
+    user = cl.context.session.user
+    return user.identifier if user else cl.context.session.id
+
+
+def estimate_tokens(contents: list) -> int:
+    """Rough prompt size for the TPM budget (about 4 characters per token)."""
+    chars = len(SYSTEM_PROMPT) + sum(
+        len(part.model_dump_json(exclude_none=True))
+        for content in contents
+        for part in content.parts or []
+    )
+    return chars // 4 + 1
+
+
+async def stream_model_turn(
+    contents: list,
+    config: types.GenerateContentConfig,
+    step: cl.Step,
+    answer: cl.Message
+) -> types.Content:
+    """Run one model turn, streaming its text into ``answer`` token by token.
+    
+    The call waits for a slot from the shared scheduler (showing the queue
+    position in ``step``). Rate-limit errors pause the scheduler for all
+    sessions and the call is queued again. If the cached prompt prefix is
+    rejected, the request is resent with the prompt inline and the cache
+    is re-created for the next turn. Both only happen while no text has
+    been streamed yet; after that the error is raised.
+    
+    Returns the complete model content (text and function calls) for the history.
+    """
+    async def show_position(position: int):
+        step.output = f"⏳ Waiting for the model, queue position {position}"
+        await step.update()
+    
+    tokens = estimate_tokens(contents)
+    attempt = 0
+    while True:
+        async with llm_scheduler.slot(current_user(), tokens, on_wait=show_position) as usage:
+            parts = []
+            streamed = False
+            try:
+                # Quota and server errors also surface while the stream is read
+                stream = await client.aio.models.generate_content_stream(
+                    model=MODEL,
+                    contents=contents,
+                    config=config
+                )
+                async for chunk in stream:
+                    if chunk.usage_metadata and chunk.usage_metadata.total_token_count:
+                        usage["used_tokens"] = chunk.usage_metadata.total_token_count
+                    if not chunk.candidates or not chunk.candidates[0].content:
+                        continue
+                    for part in chunk.candidates[0].content.parts or []:
+                        if part.text and not part.thought:
+                            await answer.stream_token(part.text)
+                            streamed = True
+                        parts.append(part)
+            except Exception as e:
+                if streamed:
+                    # Retrying would repeat text the user has already seen
+                    raise
+                if usage["used_tokens"] is None:
+                    usage["used_tokens"] = 0
+                if is_rate_limit(e):
+                    if attempt >= MAX_MODEL_RETRIES:
+                        raise
+                    delay = retry_delay(e, attempt)
+                    llm_scheduler.penalize(delay)
+                    step.output = f"⏳ Rate limit hit. Retrying in {delay:.0f}s..."
+                    await step.update()
+                    attempt += 1
+                    continue
+                if config.cached_content:
+                    prompt_cache.invalidate()
+                    config = prompt_cache.inline_config(
+                        automatic_function_calling=config.automatic_function_calling
+                    )
+                    continue
+                raise
+            return types.Content(role="model", parts=parts)
+
+
+async def answer_directly(text: str) -> bool:
+    """Answer a plain lookup question from a tool result with a template.
+    
+    Returns False (nothing sent) when the router isn't confident or the
+    result doesn't clearly answer the question; the model handles those.
+    """
+    router = get_router()
+    route = router.route(text) if router else None
+    if route is None:
+        return False
+    
+    async with cl.Step(name="⚡ Быстрый ответ", type="tool") as step:
+        step.input = {"kind": route.kind, "name": route.name, "intent": route.intent}
+        try:
+            if route.kind == "patterns":
+                lookup = get_pattern_info(route.name)
+            else:
+                file_key = FIGMA_UI_KIT_KEY if route.kind == "components" else FILE_KEYS[route.kind]
+                lookup = get_component_details(file_key, route.name)
+            result = await asyncio.wait_for(lookup, timeout=TOOL_TIMEOUT)
+        except Exception as e:
+            result = {"error": str(e)}
+        answer = render_route(route, result)
+        step.output = "✅ Ответ из гайда" if answer else "↪️ Передаю модели"
+    
+    if answer is None:
+        return False
+    # Images are only sent once the templated answer is certain, so a
+    # fallback to the model doesn't post the preview twice
+    if result.get("image_url"):
+        await send_image(result["image_url"], f"{route.name}_preview")
+    await cl.Message(content=answer).send()
+    return True
+
+
 @cl.on_message
 async def on_message(message: cl.Message):
+    if await answer_directly(message.content):
+        return
+    
+    # Function calling is driven here instead of AFC, so that all calls
+    # from one model turn run concurrently and answer in one follow-up turn
+    afc = types.AutomaticFunctionCallingConfig(disable=True)
+    contents = [types.Content(role="user", parts=[types.Part.from_text(text=message.content)])]
+    answer = cl.Message(content="")
+    
     async with cl.Step(name="🤖 Поиск", type="run") as step:
-        retry_count = 0
-        max_retries = 3
-        while retry_count < max_retries:
-            try:
-                response = await client.aio.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=message.content,
-                    config=types.GenerateContentConfig(
-                        system_instruction=SYSTEM_PROMPT,
-                        tools=TOOLS
-                    )
-                )
+        try:
+            for turn in range(MAX_TOOL_TURNS + 1):
+                final = turn == MAX_TOOL_TURNS
+                if final:
+                    # Out of tool turns: answer from the results gathered so far.
+                    # A cached prompt can't carry tool_config, so send it inline.
+                    config = prompt_cache.inline_config(automatic_function_calling=afc, tool_config=NO_TOOLS)
+                else:
+                    config = await prompt_cache.generation_config(automatic_function_calling=afc)
+                model_content = await stream_model_turn(contents, config, step, answer)
                 
-                answer_text = ""
-                for candidate in response.candidates:
-                    for part in candidate.content.parts:
-                        if part.text:
-                            answer_text += part.text
+                function_calls = [p.function_call for p in model_content.parts if p.function_call]
+                if not function_calls:
+                    break
+                if final:
+                    await answer.stream_token(("\n\n" if answer.content else "") + TOOL_LIMIT_MESSAGE)
+                    break
                 
-                break
+                step.output = "🔧 " + ", ".join(call.name for call in function_calls)
+                contents.append(model_content)
+                tool_parts = await asyncio.gather(*(run_tool_call(call) for call in function_calls))
+                contents.append(types.Content(role="user", parts=list(tool_parts)))
                     
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str and retry_count < max_retries - 1:
-                    wait_time = (2 ** retry_count) * 2
-                    step.output = f"⏳ Rate limit hit. Retrying in {wait_time}s..."
-                    await asyncio.sleep(wait_time)
-                    retry_count += 1
-                    continue
-                else:
-                    step.output = f"❌ Error: {error_str}"
-                    await cl.Message(content=f"Error: {error_str}").send()
-                    return
-
-    if answer_text:
-        await cl.Message(content=answer_text).send()
+        except Exception as e:
+            error_str = str(e)
+            step.output = f"❌ Error: {error_str}"
+            if answer.content:
+                # Keep what was streamed, marked as cut off, instead of a dangling message
+                answer.content += f"\n\n⚠️ Ответ прерван: {error_str}"
+                await answer.send()
+            else:
+                await cl.Message(content=f"Error: {error_str}").send()
+            return
+
+    if answer.content:
+        # Finalize the streamed message
+        await answer.send()
@@ -5,22 +5,49 @@ Comprehensive Figma API implementation with all public endpoints.
 
 # Base client
 from .client import (
+    figma_send,
     figma_request,
     figma_get,
     figma_post,
     figma_put,
     figma_delete,
     get_config,
+    get_http_client,
+    open_http_client,
+    close_http_client,
     FigmaConfig,
+    FigmaAPIError,
+    Priority,
+    request_priority,
+    get_scheduler,
+    get_response_cache,
+    get_image_cache,
+    get_file_version,
 )
 
 # File methods
 from .files import (
     figma_get_file,
     figma_get_file_nodes,
+    figma_load_nodes,
     figma_get_images,
+    figma_render_image,
     figma_get_image_fills,
     figma_get_file_versions,
+    figma_stream_nodes,
+    text_under,
+    of_type,
+    name_contains,
+    instances_of,
+)
+
+# Request batching
+from .batching import (
+    Batcher,
+    ImageRenderBatcher,
+    NodeLoader,
+    get_image_batcher,
+    get_node_loader,
 )
 
 # Comment methods
@@ -66,19 +93,43 @@ from .analytics import (
 
 __all__ = [
     # Client
+    "figma_send",
     "figma_request",
     "figma_get",
     "figma_post",
     "figma_put",
     "figma_delete",
     "get_config",
+    "get_http_client",
+    "open_http_client",
+    "close_http_client",
     "FigmaConfig",
+    "FigmaAPIError",
+    "Priority",
+    "request_priority",
+    "get_scheduler",
+    "get_response_cache",
+    "get_image_cache",
+    "get_file_version",
     # Files
     "figma_get_file",
     "figma_get_file_nodes",
+    "figma_load_nodes",
     "figma_get_images",
+    "figma_render_image",
     "figma_get_image_fills",
     "figma_get_file_versions",
+    "figma_stream_nodes",
+    "text_under",
+    "of_type",
+    "name_contains",
+    "instances_of",
+    # Batching
+    "Batcher",
+    "ImageRenderBatcher",
+    "NodeLoader",
+    "get_image_batcher",
+    "get_node_loader",
     # Comments
     "figma_get_comments",
     "figma_post_comment",
@@ -0,0 +1,227 @@
+"""Figma API - Request Batching.
+
+Many Figma endpoints take a list of node ids (``ids=1:2,3:4``), but tools
+mostly ask for one node at a time. A batcher collects the ids requested
+for the same group (file, render settings, ...) within a short window,
+sends one request per group (split so the ``ids`` parameter stays under a
+URL length limit) and hands each waiting caller its own result. Ids asked
+for twice in a window are fetched once.
+"""
+import asyncio
+import contextvars
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, Optional
+from urllib.parse import quote
+
+from .client import (
+    _coalesced_get,
+    figma_get,
+    FigmaAPIError,
+    get_config,
+    get_file_version,
+    get_response_cache,
+    request_key,
+)
+from .priority import Lane, Priority, join, start_shared
+
+
+# Encoded length budget for the ``ids`` query parameter (Figma rejects
+# URLs longer than about 8 KB; keep room for the rest of the URL)
+MAX_IDS_LENGTH = 4000
+
+# Responses meaning some id of the request is invalid or missing
+_BAD_ID_ERRORS = ("HTTP 400:", "HTTP 404:")
+
+
+def split_ids(ids: list[str], max_length: int = MAX_IDS_LENGTH) -> list[list[str]]:
+    """Split ids into chunks whose URL-encoded ``ids=`` value fits ``max_length``."""
+    chunks, chunk, length = [], [], 0
+    for node_id in ids:
+        size = len(quote(node_id, safe="")) + (3 if chunk else 0)  # "%2C" separator
+        if chunk and length + size > max_length:
+            chunks.append(chunk)
+            chunk, length = [], 0
+            size -= 3
+        chunk.append(node_id)
+        length += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class Batcher(ABC):
+    """Collects per-id requests and fetches them in batches.
+
+    Subclasses implement ``fetch(group, ids)``, returning a result per id
+    (missing ids resolve to None). Callers sharing a batch share results,
+    which they must treat as read-only.
+    """
+
+    def __init__(self, window: Optional[float] = None, max_ids_length: int = MAX_IDS_LENGTH):
+        self.window = window
+        self.max_ids_length = max_ids_length
+        self._pending: dict[Hashable, tuple[Lane, dict[str, asyncio.Future]]] = {}  # group -> (lane, id -> result)
+        self._stats = {"requests": 0, "batches": 0, "ids": 0}
+
+    @abstractmethod
+    async def fetch(self, group: Hashable, ids: list[str]) -> dict[str, Any]:
+        """Fetch one batch: a result per id of the group."""
+
+    async def load(self, group: Hashable, node_id: str) -> Any:
+        """Get the result for one id, batched with other ids of the group."""
+        self._stats["requests"] += 1
+        if group not in self._pending:
+            # The batch runs in its own lane, raised by each caller that joins it
+            self._pending[group] = (Lane(Priority.BACKGROUND), {})
+            window = self.window if self.window is not None else get_config().batch_window
+            asyncio.get_running_loop().call_later(window, self._dispatch, group, context=contextvars.Context())
+        lane, pending = self._pending[group]
+        join(lane)
+        future = pending.get(node_id)
+        if future is None:
+            future = pending[node_id] = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(future)
+
+    async def load_many(self, group: Hashable, ids: list[str]) -> dict[str, Any]:
+        """Get results for several ids of one group."""
+        results = await asyncio.gather(*(self.load(group, node_id) for node_id in ids))
+        return dict(zip(ids, results))
+
+    def _dispatch(self, group: Hashable):
+        lane, pending = self._pending.pop(group)
+        try:
+            chunks = split_ids(list(pending), self.max_ids_length)
+        except Exception as e:
+            # This runs as a loop callback: fail the callers instead of leaving them waiting
+            for future in pending.values():
+                future.set_exception(e)
+            return
+        for chunk in chunks:
+            self._stats["batches"] += 1
+            self._stats["ids"] += len(chunk)
+            start_shared(self._run(group, {i: pending[i] for i in chunk}), lane)
+
+    async def _run(self, group: Hashable, futures: dict[str, asyncio.Future]):
+        try:
+            results = await self.fetch(group, list(futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for node_id, future in futures.items():
+            if not future.done():
+                future.set_result(results.get(node_id))
+
+    def stats(self) -> dict:
+        """Counters: ids requested, batches sent and distinct ids fetched."""
+        return dict(self._stats)
+
+
+class ImageRenderBatcher(Batcher):
+    """Batches ``/images`` renders per (file key, scale, format).
+
+    Results are the render URLs (None for nodes Figma didn't render).
+    """
+
+    async def fetch(self, group: tuple, ids: list[str]) -> dict[str, Optional[str]]:
+        file_key, scale, format = group
+        data = await figma_get(
+            f"/images/{file_key}",
+            params={"ids": ",".join(ids), "scale": scale, "format": format},
+            timeout=60.0
+        )
+        error = data.get("error")
+        if isinstance(error, str):
+            if not error.startswith(_BAD_ID_ERRORS):
+                # Rate limits and server errors would fail every id again
+                raise FigmaAPIError(error)
+            if len(ids) > 1:
+                # One bad id fails the whole request; render the rest one by one
+                results = await asyncio.gather(*(self.fetch(group, [i]) for i in ids))
+                return {k: v for result in results for k, v in result.items()}
+            return {}
+        return data.get("images") or {}
+
+    async def render(self, file_key: str, node_id: str, scale: float = 2, format: str = "png") -> Optional[str]:
+        """Get the render URL of one node."""
+        return await self.load((file_key, scale, format), node_id)
+
+
+class NodeLoader(Batcher):
+    """Batches ``/files/{key}/nodes`` fetches per (file key, depth).
+
+    The result for an id is a single-node response (``{"name", "version",
+    ..., "nodes": {id: {...}}}``) or the error response. A batch rejected
+    for a bad id is retried id by id, so only that id's callers get the
+    error. Each node is cached under the key of its own single-id request,
+    so it is found again whichever batch it was fetched in.
+    """
+
+    async def fetch(self, group: tuple, ids: list[str]) -> dict[str, dict]:
+        file_key, depth = group
+        endpoint = f"/files/{file_key}/nodes"
+        cache = get_response_cache()
+        version = await get_file_version(file_key) if cache is not None else None
+
+        results = {}
+        if version:
+            cached = await asyncio.gather(*(
+                cache.get(request_key(endpoint, {"ids": i, "depth": depth}), version) for i in ids
+            ))
+            results = {i: data for i, data in zip(ids, cached) if data is not None}
+        missing = [i for i in ids if i not in results]
+        if not missing:
+            return results
+
+        params = {"ids": ",".join(missing), "depth": depth} if depth else {"ids": ",".join(missing)}
+        data = await _coalesced_get(endpoint, params, "v1", 120.0, use_cache=False)
+        error = data.get("error")
+        if isinstance(error, str):
+            if error.startswith(_BAD_ID_ERRORS) and len(missing) > 1:
+                # One bad id fails the whole request; fetch the rest one by one
+                singles = await asyncio.gather(*(self.fetch(group, [i]) for i in missing))
+                return {**results, **{k: v for single in singles for k, v in single.items()}}
+            return {**results, **{i: data for i in missing}}
+
+        meta = {k: v for k, v in data.items() if k != "nodes"}
+        nodes = data.get("nodes") or {}
+        for node_id in missing:
+            single = {**meta, "nodes": {node_id: nodes.get(node_id)}}
+            results[node_id] = single
+            if version and nodes.get(node_id) is not None:
+                await cache.put(request_key(endpoint, {"ids": node_id, "depth": depth}), version, single)
+        return results
+
+    async def load_nodes(self, file_key: str, ids: list[str], depth: Optional[int] = None) -> dict:
+        """Get nodes as one ``/nodes``-shaped response (or the error response)."""
+        results = await self.load_many((file_key, depth), list(dict.fromkeys(ids)))
+        merged = {"nodes": {}}
+        for node_id, data in results.items():
+            if data is None:
+                continue
+            if isinstance(data.get("error"), str):
+                return data
+            merged.update({k: v for k, v in data.items() if k != "nodes"})
+            merged["nodes"][node_id] = (data.get("nodes") or {}).get(node_id)
+        return merged
+
+
+_image_batcher: Optional[ImageRenderBatcher] = None
+_node_loader: Optional[NodeLoader] = None
+
+
+def get_image_batcher() -> ImageRenderBatcher:
+    """Get the process-wide image render batcher."""
+    global _image_batcher
+    if _image_batcher is None:
+        _image_batcher = ImageRenderBatcher()
+    return _image_batcher
+
+
+def get_node_loader() -> NodeLoader:
+    """Get the process-wide node loader."""
+    global _node_loader
+    if _node_loader is None:
+        _node_loader = NodeLoader()
+    return _node_loader
@@ -0,0 +1,347 @@
+"""Figma API - Persistent Response Cache.
+
+On-disk cache for file-scoped GET responses (documents, nodes, components,
+styles). Entries are keyed by endpoint and params and tagged with the file
+version they were fetched at; a lookup only hits when the tag matches the
+file's current version, so entries are revalidated against ``version``
+instead of expiring on a blind TTL. The cache is bounded in bytes with LRU
+eviction.
+
+Rendered node images get their own byte-bounded cache (``ImageCache``),
+keyed by everything that determines the render, so a cached preview is
+served without asking Figma to render it or downloading it from S3.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from .priority import Lane, join, start_shared
+
+
+# File-scoped endpoints whose response only changes with the file version
+_CACHEABLE = re.compile(
+    r"^/files/(?P<file_key>[^/]+)(/(nodes|components|component_sets|styles|variables/local))?$"
+)
+
+
+def cacheable_file_key(endpoint: str) -> Optional[str]:
+    """Get the file key if an endpoint is version-cacheable, else None."""
+    match = _CACHEABLE.match(endpoint)
+    return match.group("file_key") if match else None
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of JSON responses stored on disk."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()  # digest -> size
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from files on disk (oldest mtime first)."""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, digest, size in sorted(files):
+            self._entries[digest] = size
+            self._bytes += size
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    @staticmethod
+    def _digest(key: tuple) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    async def get(self, key: tuple, version: str) -> Optional[Any]:
+        """Get a cached response if it was stored for ``version``."""
+        digest = self._digest(key)
+        if digest not in self._entries:
+            self._stats["misses"] += 1
+            return None
+
+        entry = await asyncio.to_thread(self._read, digest)
+        if entry is None or entry.get("version") != version:
+            # File changed since this entry was stored (or entry is unreadable)
+            self._stats["stale"] += 1
+            self._stats["misses"] += 1
+            self._remove(digest)
+            return None
+
+        self._entries.move_to_end(digest)
+        self._stats["hits"] += 1
+        return entry["data"]
+
+    async def put(self, key: tuple, version: str, data: Any):
+        """Store a response for ``version``, evicting least recently used entries."""
+        digest = self._digest(key)
+        size = await asyncio.to_thread(self._write, digest, {"version": version, "data": data})
+        if size > self.max_bytes:
+            self._remove(digest)
+            return
+
+        self._bytes += size - self._entries.get(digest, 0)
+        self._entries[digest] = size
+        self._entries.move_to_end(digest)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _read(self, digest: str) -> Optional[dict]:
+        path = self._path(digest)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # Persist recency for the next process start
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, digest: str, entry: dict) -> int:
+        path = self._path(digest)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def _remove(self, digest: str):
+        size = self._entries.pop(digest, None)
+        if size is not None:
+            self._bytes -= size
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove all cached entries."""
+        for digest in list(self._entries):
+            self._remove(digest)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class ImageCache:
+    """Size-bounded LRU cache of rendered images stored on disk.
+
+    Images are content-addressed: each one is stored once under the
+    SHA-256 of its bytes, and a small ref file maps a render key (file key,
+    node id, file version, scale, format) to it. A node that renders the
+    same after a version bump costs one ref, not another image. Eviction
+    drops the least recently used images along with the refs pointing to
+    them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._blobs_dir = os.path.join(directory, "blobs")
+        self._refs_dir = os.path.join(directory, "refs")
+        self._blobs: OrderedDict[str, int] = OrderedDict()  # blob file name -> size
+        self._refs: dict[str, str] = {}             # ref file name -> blob file name
+        self._blob_refs: dict[str, set[str]] = {}  # blob file name -> ref file names
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        os.makedirs(self._refs_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order (oldest mtime first) and refs from disk."""
+        files = []
+        for name in os.listdir(self._blobs_dir):
+            if name.endswith(".tmp"):
+                continue
+            stat = os.stat(os.path.join(self._blobs_dir, name))
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._blobs[name] = size
+            self._bytes += size
+        for ref in os.listdir(self._refs_dir):
+            path = os.path.join(self._refs_dir, ref)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    name = f.read().strip()
+            except OSError:
+                continue
+            if ref.endswith(".tmp") or name not in self._blobs:
+                self._remove_file(path)  # Left behind by a crash
+            else:
+                self._link(ref, name)
+
+    @staticmethod
+    def key(file_key: str, node_id: str, version: str, scale: float, format: str) -> tuple:
+        """Render key of a node image."""
+        return (file_key, node_id, version, float(scale), format)
+
+    @staticmethod
+    def _ref_name(key: tuple) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def _ref_path(self, ref: str) -> str:
+        return os.path.join(self._refs_dir, ref)
+
+    def _blob_path(self, name: str) -> str:
+        return os.path.join(self._blobs_dir, name)
+
+    async def get(self, key: tuple) -> Optional[str]:
+        """Get the path of a cached image for a render key."""
+        name = self._refs.get(self._ref_name(key))
+        if name is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._blobs.move_to_end(name)
+        self._stats["hits"] += 1
+        path = self._blob_path(name)
+        await asyncio.to_thread(self._touch, path)
+        return path
+
+    async def put(self, key: tuple, content: bytes) -> Optional[str]:
+        """Store an image for a render key and get its path (None if it's too large)."""
+        if len(content) > self.max_bytes:
+            return None
+        name = f"{hashlib.sha256(content).hexdigest()}.{key[-1]}"
+        if name not in self._blobs:
+            await asyncio.to_thread(self._write, self._blob_path(name), content)
+            self._blobs[name] = len(content)
+            self._bytes += len(content)
+        self._blobs.move_to_end(name)
+        ref = self._ref_name(key)
+        await asyncio.to_thread(self._write, self._ref_path(ref), name.encode())
+        self._link(ref, name)
+
+        while self._bytes > self.max_bytes and self._blobs:
+            oldest = next(iter(self._blobs))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+        return self._blob_path(name) if name in self._blobs else None
+
+    def _link(self, ref: str, name: str):
+        previous = self._refs.get(ref)
+        if previous is not None and previous != name:
+            self._blob_refs.get(previous, set()).discard(ref)
+        self._refs[ref] = name
+        self._blob_refs.setdefault(name, set()).add(ref)
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)  # Persist recency for the next process start
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write(path: str, content: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _remove(self, name: str):
+        size = self._blobs.pop(name, None)
+        if size is not None:
+            self._bytes -= size
+        self._remove_file(self._blob_path(name))
+        for ref in self._blob_refs.pop(name, ()):
+            self._refs.pop(ref, None)
+            self._remove_file(self._ref_path(ref))
+
+    def clear(self):
+        """Remove all cached images and refs."""
+        for name in list(self._blobs):
+            self._remove(name)
+        for name in os.listdir(self._refs_dir):
+            self._remove_file(os.path.join(self._refs_dir, name))
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "images": len(self._blobs),
+            "refs": len(self._refs),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class FileVersionTracker:
+    """Tracks the current version of Figma files.
+
+    Versions are probed with ``probe(file_key)`` (a file metadata fetch) and
+    re-checked at most every ``check_interval`` seconds; concurrent checks
+    for the same file share one probe, run at the priority of the most
+    urgent of them.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str], Awaitable[dict]],
+        check_interval: float = 30.0
+    ):
+        self._probe = probe
+        self.check_interval = check_interval
+        self._versions: dict[str, tuple[float, dict]] = {}  # file_key -> (checked_at, info)
+        self._pending: dict[str, tuple[asyncio.Task, Lane]] = {}
+
+    async def get(self, file_key: str) -> Optional[dict]:
+        """Get ``{"version", "lastModified"}`` for a file, or None if unavailable."""
+        cached = self._versions.get(file_key)
+        if cached and time.monotonic() - cached[0] < self.check_interval:
+            return cached[1]
+
+        shared = self._pending.get(file_key)
+        if shared is None:
+            shared = self._pending[file_key] = start_shared(self._check(file_key))
+            shared[0].add_done_callback(lambda done: self._pending.pop(file_key, None))
+        task, lane = shared
+        join(lane)
+        return await asyncio.shield(task)
+
+    async def _check(self, file_key: str) -> Optional[dict]:
+        data = await self._probe(file_key)
+        if isinstance(data.get("error"), str) or not data.get("version"):
+            return None
+        info = {"version": data["version"], "lastModified": data.get("lastModified")}
+        self._versions[file_key] = (time.monotonic(), info)
+        return info
+
+    def invalidate(self, file_key: Optional[str] = None):
+        """Force the next lookup to re-probe one file (or all files)."""
+        if file_key is None:
+            self._versions.clear()
+        else:
+            self._versions.pop(file_key, None)
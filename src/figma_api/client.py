@@ -1,12 +1,36 @@
 """Figma API Base Client.
 
 Provides async HTTP client for all Figma API endpoints.
+
+All requests share one long-lived ``httpx.AsyncClient`` with connection
+pooling, keep-alive and HTTP/2, so repeated calls reuse TLS connections
+instead of doing a fresh handshake every time. Call ``open_http_client()``
+on application startup and ``close_http_client()`` on shutdown.
+
+Concurrent identical GETs are coalesced: they share one upstream request
+and one parsed result, which callers must treat as read-only. File-scoped
+GETs are also served from a persistent cache that is revalidated against
+the file's current version (see ``cache.py``).
+
+Requests are paced by a central scheduler: one token bucket per Figma
+rate-limit tier, ``Retry-After`` handling with jittered backoff, and
+priority lanes so interactive chat calls go ahead of background work.
 """
+import asyncio
+import email.utils
+import heapq
+import itertools
+import random
+import re
+import time
 import httpx
 import os
-from typing import Optional, Any
+from typing import Optional
 from dataclasses import dataclass
 
+from .cache import ResponseCache, ImageCache, FileVersionTracker, cacheable_file_key
+from .priority import Priority, Lane, request_priority, current_lane, current_priority, start_shared, join
+
 
 FIGMA_API_BASE = "https://api.figma.com/v1"
 FIGMA_API_V2 = "https://api.figma.com/v2"
@@ -17,9 +41,35 @@ class FigmaConfig:
     """Configuration for Figma API client."""
     api_key: str
     timeout: float = 30.0
+    # Connection pool settings for the shared HTTP client
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    # Rate limits (requests per minute) per Figma endpoint cost tier
+    tier1_rpm: int = 15
+    tier2_rpm: int = 50
+    tier3_rpm: int = 100
+    # Retry policy for 429 / transient errors
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_cap: float = 30.0
+    # Persistent response cache for file endpoints
+    cache_enabled: bool = True
+    cache_dir: str = ".cache/figma"
+    cache_max_mb: int = 512
+    image_cache_max_mb: int = 256
+    version_check_interval: float = 30.0
+    # How long batchers collect ids before sending (seconds)
+    batch_window: float = 0.02
+
+
+class FigmaAPIError(Exception):
+    """Raised by callers that treat a Figma error response as fatal."""
 
 
 _config: Optional[FigmaConfig] = None
+_http_client: Optional[httpx.AsyncClient] = None
 
 
 def get_config() -> FigmaConfig:
@@ -29,16 +79,289 @@ def get_config() -> FigmaConfig:
         api_key = os.getenv("FIGMA_API_KEY")
         if not api_key:
             raise ValueError("FIGMA_API_KEY environment variable is required")
-        _config = FigmaConfig(api_key=api_key)
+        _config = FigmaConfig(
+            api_key=api_key,
+            max_connections=int(os.getenv("FIGMA_HTTP_MAX_CONNECTIONS", 20)),
+            max_keepalive_connections=int(os.getenv("FIGMA_HTTP_MAX_KEEPALIVE", 10)),
+            keepalive_expiry=float(os.getenv("FIGMA_HTTP_KEEPALIVE_EXPIRY", 60.0)),
+            http2=os.getenv("FIGMA_HTTP2", "1") != "0",
+            tier1_rpm=int(os.getenv("FIGMA_RATE_TIER1_RPM", 15)),
+            tier2_rpm=int(os.getenv("FIGMA_RATE_TIER2_RPM", 50)),
+            tier3_rpm=int(os.getenv("FIGMA_RATE_TIER3_RPM", 100)),
+            max_retries=int(os.getenv("FIGMA_MAX_RETRIES", 4)),
+            cache_enabled=os.getenv("FIGMA_CACHE", "1") != "0",
+            cache_dir=os.getenv("FIGMA_CACHE_DIR", ".cache/figma"),
+            cache_max_mb=int(os.getenv("FIGMA_CACHE_MAX_MB", 512)),
+            image_cache_max_mb=int(os.getenv("FIGMA_IMAGE_CACHE_MAX_MB", 256)),
+            version_check_interval=float(os.getenv("FIGMA_VERSION_CHECK_SECONDS", 30.0)),
+            batch_window=float(os.getenv("FIGMA_BATCH_WINDOW_MS", 20)) / 1000,
+        )
     return _config
 
 
+def _create_http_client(config: FigmaConfig) -> httpx.AsyncClient:
+    """Build the pooled HTTP client from configuration."""
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        timeout=config.timeout,
+        limits=limits,
+        http2=config.http2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client, creating it on first use.
+    
+    The client is bound to the event loop it is first used on, so all
+    Figma calls must run on that loop. It carries no auth headers, so it
+    can also fetch rendered images from Figma's S3 URLs.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client(get_config())
+    return _http_client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared HTTP client (call on application startup)."""
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections (call on shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# =============================================================================
+# Rate-limit scheduler
+# =============================================================================
+
+# Figma groups endpoints into cost tiers with separate limits.
+# Tier 1: heavy document/render endpoints. Tier 3: cheap metadata endpoints.
+_TIER_PATTERNS = [
+    (1, re.compile(r"^/files/[^/]+(/nodes)?$")),
+    (1, re.compile(r"^/images/[^/]+$")),
+    (3, re.compile(r"^/files/[^/]+/meta$")),
+    (3, re.compile(r"^/(files|teams)/[^/]+/(components|component_sets|styles)$")),
+    (3, re.compile(r"^/(components|component_sets|styles)/[^/]+$")),
+]
+
+
+def endpoint_tier(endpoint: str) -> int:
+    """Get the Figma rate-limit tier for an endpoint (default: tier 2)."""
+    path = endpoint.split("?", 1)[0]
+    for tier, pattern in _TIER_PATTERNS:
+        if pattern.match(path):
+            return tier
+    return 2
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate = max(rate_per_minute, 1) / 60.0
+        self.capacity = float(capacity or max(rate_per_minute, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> float:
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for ``seconds`` (e.g. after a 429)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        # Allow a single probe request once the pause is over
+        self.tokens = min(self.tokens, 1.0)
+        self.updated = self.blocked_until
+
+
+class FigmaScheduler:
+    """Grants request slots per rate-limit tier, highest priority lane first."""
+
+    def __init__(self, rpm_by_tier: dict[int, int]):
+        self._buckets = {tier: TokenBucket(rpm) for tier, rpm in rpm_by_tier.items()}
+        self._waiters: dict[int, list] = {tier: [] for tier in rpm_by_tier}
+        self._dispatchers: dict[int, asyncio.Task] = {}
+        self._seq = itertools.count()
+
+    async def acquire(self, tier: int, priority: Priority = Priority.INTERACTIVE, lane: Optional[Lane] = None):
+        """Wait until a request in ``tier`` may be sent.
+        
+        A request of shared work is requeued when its ``lane`` is raised.
+        """
+        waiters = self._waiters[tier]
+        if not waiters and self._buckets[tier].try_take() == 0:
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(tier, priority, future)
+        if lane is not None:
+            lane.watch(future, lambda raised: self._enqueue(tier, raised, future))
+        await future
+    
+    def _enqueue(self, tier: int, priority: Priority, future: asyncio.Future):
+        # A requeued request keeps its old entry; whichever pops first wins
+        heapq.heappush(self._waiters[tier], (int(priority), next(self._seq), future))
+        task = self._dispatchers.get(tier)
+        if task is None or task.done():
+            self._dispatchers[tier] = asyncio.create_task(self._dispatch(tier))
+
+    async def _dispatch(self, tier: int):
+        """Hand out tokens to queued requests in (priority, arrival) order."""
+        bucket = self._buckets[tier]
+        waiters = self._waiters[tier]
+        while waiters:
+            wait = bucket.try_take()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            while waiters:
+                _, _, future = heapq.heappop(waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            else:
+                # Only cancelled waiters were left; return the token
+                bucket.tokens += 1
+
+    def penalize(self, tier: int, seconds: float):
+        """Pause a tier after Figma reported a rate limit."""
+        self._buckets[tier].pause(seconds)
+
+    def queue_length(self, tier: int) -> int:
+        """Number of requests waiting for a slot in a tier."""
+        return len(self._waiters[tier])
+
+
+_scheduler: Optional[FigmaScheduler] = None
+
+
+def get_scheduler() -> FigmaScheduler:
+    """Get the process-wide Figma request scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        config = get_config()
+        _scheduler = FigmaScheduler({
+            1: config.tier1_rpm,
+            2: config.tier2_rpm,
+            3: config.tier3_rpm,
+        })
+    return _scheduler
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(retry_at.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(config: FigmaConfig, attempt: int) -> float:
+    """Full-jitter exponential backoff delay for a retry attempt."""
+    return random.uniform(0, min(config.backoff_cap, config.backoff_base * 2 ** attempt))
+
+
+async def figma_send(
+    method: str,
+    endpoint: str,
+    params: Optional[dict] = None,
+    json_data: Optional[dict] = None,
+    api_version: str = "v1",
+    timeout: Optional[float] = None,
+    priority: Optional[Priority] = None,
+    stream: bool = False
+) -> httpx.Response:
+    """Send a scheduled request to Figma API and return the raw response.
+    
+    Waits for a slot in the endpoint's rate-limit tier, and retries 429s
+    (honoring Retry-After) and, for GETs, transient 5xx/network errors.
+    With ``stream=True`` the body is not read; the caller must close the
+    response (``await response.aclose()``).
+    """
+    config = get_config()
+    base_url = FIGMA_API_V2 if api_version == "v2" else FIGMA_API_BASE
+    url = f"{base_url}{endpoint}"
+    tier = endpoint_tier(endpoint)
+    lane = current_lane() if priority is None else None
+    priority = current_priority() if priority is None else priority
+    scheduler = get_scheduler()
+    retry_transient = method.upper() == "GET"
+    
+    client = get_http_client()
+    attempt = 0
+    while True:
+        await scheduler.acquire(tier, lane.priority if lane else priority, lane)
+        try:
+            request = client.build_request(
+                method=method,
+                url=url,
+                params=params,
+                json=json_data,
+                headers={"X-Figma-Token": config.api_key},
+                timeout=timeout or config.timeout
+            )
+            response = await client.send(request, stream=stream)
+        except httpx.TransportError:
+            if not retry_transient or attempt >= config.max_retries:
+                raise
+            await asyncio.sleep(_backoff(config, attempt))
+            attempt += 1
+            continue
+        
+        if attempt >= config.max_retries:
+            return response
+        if response.status_code == 429:
+            await response.aclose()
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _backoff(config, attempt)
+            # Pause the whole tier: other queued requests would hit the same limit
+            scheduler.penalize(tier, delay + random.uniform(0, config.backoff_base))
+        elif retry_transient and response.status_code in (500, 502, 503, 504):
+            await response.aclose()
+            await asyncio.sleep(_backoff(config, attempt))
+        else:
+            return response
+        attempt += 1
+
+
 async def figma_request(
     method: str,
     endpoint: str,
     params: Optional[dict] = None,
     json_data: Optional[dict] = None,
-    api_version: str = "v1"
+    api_version: str = "v1",
+    timeout: Optional[float] = None
 ) -> dict:
     """Make a request to Figma API.
     
@@ -48,33 +371,174 @@ async def figma_request(
         params: Query parameters
         json_data: JSON body for POST/PUT requests
         api_version: API version (v1 or v2)
+        timeout: Request timeout in seconds (defaults to config timeout)
     
     Returns:
         Response JSON as dict
     """
-    config = get_config()
-    base_url = FIGMA_API_V2 if api_version == "v2" else FIGMA_API_BASE
-    url = f"{base_url}{endpoint}"
+    if method.upper() != "GET":
+        return await _fetch_json(method, endpoint, params, json_data, api_version, timeout)
     
-    async with httpx.AsyncClient(timeout=config.timeout) as client:
-        response = await client.request(
-            method=method,
-            url=url,
-            params=params,
-            json=json_data,
-            headers={"X-Figma-Token": config.api_key}
+    return await _coalesced_get(endpoint, params, api_version, timeout, use_cache=True)
+
+
+_inflight: dict[tuple, tuple[asyncio.Task, Lane]] = {}
+
+
+async def _coalesced_get(
+    endpoint: str,
+    params: Optional[dict],
+    api_version: str,
+    timeout: Optional[float],
+    use_cache: bool
+) -> dict:
+    """Single-flight GET: identical in-flight requests share one task.
+    
+    The shared task is shielded so a cancelled caller doesn't cancel the
+    others, and runs in its own lane at the priority of its most urgent
+    caller.
+    """
+    key = request_key(endpoint, params, api_version)
+    if not use_cache:
+        key = ("nocache",) + key
+    shared = _inflight.get(key)
+    if shared is None:
+        if use_cache:
+            coro = _cached_get(key, endpoint, params, api_version, timeout)
+        else:
+            coro = _fetch_json("GET", endpoint, params, None, api_version, timeout)
+        shared = _inflight[key] = start_shared(coro)
+        shared[0].add_done_callback(lambda done: _inflight.pop(key, None))
+    task, lane = shared
+    join(lane)
+    return await asyncio.shield(task)
+
+
+async def _cached_get(
+    key: tuple,
+    endpoint: str,
+    params: Optional[dict],
+    api_version: str,
+    timeout: Optional[float]
+) -> dict:
+    """GET through the persistent cache when the endpoint is file-scoped."""
+    cache = get_response_cache()
+    file_key = cacheable_file_key(endpoint) if api_version == "v1" else None
+    version = None
+    if cache is not None and file_key:
+        # Requests pinned to a version are immutable; others use the current one
+        version = (params or {}).get("version") or await get_file_version(file_key)
+    if not version:
+        return await _fetch_json("GET", endpoint, params, None, api_version, timeout)
+    
+    data = await cache.get(key, version)
+    if data is not None:
+        return data
+    
+    data = await _fetch_json("GET", endpoint, params, None, api_version, timeout)
+    if not isinstance(data.get("error"), str):
+        await cache.put(key, version, data)
+    return data
+
+
+_response_cache: Optional[ResponseCache] = None
+_image_cache: Optional[ImageCache] = None
+_version_tracker: Optional[FileVersionTracker] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the persistent response cache (None when disabled)."""
+    global _response_cache
+    config = get_config()
+    if not config.cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            os.path.join(config.cache_dir, "responses"),
+            max_bytes=config.cache_max_mb * 1024 * 1024,
         )
-        
-        if response.status_code >= 400:
-            return {"error": f"HTTP {response.status_code}: {response.text}"}
-        
-        return response.json()
+    return _response_cache
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """Get the persistent rendered image cache (None when disabled)."""
+    global _image_cache
+    config = get_config()
+    if not config.cache_enabled:
+        return None
+    if _image_cache is None:
+        _image_cache = ImageCache(
+            os.path.join(config.cache_dir, "images"),
+            max_bytes=config.image_cache_max_mb * 1024 * 1024,
+        )
+    return _image_cache
+
+
+async def _probe_file_version(file_key: str) -> dict:
+    """Read a file's version from its metadata (tier 3, bypasses the cache)."""
+    data = await _coalesced_get(f"/files/{file_key}/meta", None, "v1", None, use_cache=False)
+    if isinstance(data.get("error"), str):
+        return data
+    meta = data.get("file") or {}
+    return {"version": meta.get("version"), "lastModified": meta.get("last_touched_at")}
+
+
+def get_version_tracker() -> FileVersionTracker:
+    """Get the process-wide file version tracker."""
+    global _version_tracker
+    if _version_tracker is None:
+        _version_tracker = FileVersionTracker(
+            _probe_file_version,
+            check_interval=get_config().version_check_interval,
+        )
+    return _version_tracker
+
+
+async def get_file_version(file_key: str) -> Optional[str]:
+    """Get the current version of a Figma file (re-checked periodically)."""
+    info = await get_version_tracker().get(file_key)
+    return info["version"] if info else None
+
+
+def request_key(endpoint: str, params: Optional[dict] = None, api_version: str = "v1") -> tuple:
+    """Build a hashable identity for a GET request (endpoint + sorted params)."""
+    items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+    return (api_version, endpoint, items)
+
+
+async def _fetch_json(
+    method: str,
+    endpoint: str,
+    params: Optional[dict],
+    json_data: Optional[dict],
+    api_version: str,
+    timeout: Optional[float]
+) -> dict:
+    """Send a request and decode the response into a dict."""
+    response = await figma_send(
+        method,
+        endpoint,
+        params=params,
+        json_data=json_data,
+        api_version=api_version,
+        timeout=timeout
+    )
+    
+    if response.status_code >= 400:
+        return {"error": f"HTTP {response.status_code}: {response.text}"}
+    
+    return response.json()
 
 
 # Convenience methods
-async def figma_get(endpoint: str, params: Optional[dict] = None, api_version: str = "v1") -> dict:
+async def figma_get(
+    endpoint: str,
+    params: Optional[dict] = None,
+    api_version: str = "v1",
+    timeout: Optional[float] = None
+) -> dict:
     """GET request to Figma API."""
-    return await figma_request("GET", endpoint, params=params, api_version=api_version)
+    return await figma_request("GET", endpoint, params=params, api_version=api_version, timeout=timeout)
 
 
 async def figma_post(endpoint: str, json_data: dict, api_version: str = "v1") -> dict:
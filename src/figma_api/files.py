@@ -1,9 +1,26 @@
 """Figma API - File Methods.
 
 Methods for working with Figma files and nodes.
+
+Whole-file documents of product files can be hundreds of megabytes, so
+``figma_stream_nodes`` parses ``/files`` and ``/files/{key}/nodes``
+responses incrementally (ijson) and keeps only the nodes a visitor picks,
+instead of building the full tree in memory.
 """
-from typing import Optional, List
-from .client import figma_get
+from typing import AsyncIterator, Callable, Optional, List
+
+import httpx
+import ijson
+
+from .client import (
+    figma_get,
+    figma_send,
+    get_file_version,
+    get_http_client,
+    get_image_cache,
+    FigmaAPIError,
+)
+from .batching import get_image_batcher, get_node_loader
 
 
 async def figma_get_file(
@@ -76,6 +93,24 @@ async def figma_get_file_nodes(
     return await figma_get(f"/files/{file_key}/nodes", params=params)
 
 
+async def figma_load_nodes(file_key: str, ids: List[str], depth: Optional[int] = None) -> dict:
+    """Get nodes through the node loader.
+    
+    Concurrent calls for the same file and depth are merged into one
+    ``/nodes`` request; nodes already cached for the current file version
+    are not fetched again.
+    
+    Args:
+        file_key: The file key
+        ids: Node IDs to retrieve
+        depth: Depth of node tree
+    
+    Returns:
+        Nodes data in the ``/nodes`` response shape, or the error response
+    """
+    return await get_node_loader().load_nodes(file_key, ids, depth=depth)
+
+
 async def figma_get_images(
     file_key: str,
     ids: List[str],
@@ -118,6 +153,50 @@ async def figma_get_images(
     return await figma_get(f"/images/{file_key}", params=params)
 
 
+async def figma_render_image(
+    file_key: str,
+    node_id: str,
+    scale: float = 2,
+    format: str = "png"
+) -> Optional[str]:
+    """Render one node through the image cache.
+    
+    A render cached for the file's current version is returned without
+    calling Figma; otherwise the node is rendered (batched with concurrent
+    renders of the same file, scale and format), downloaded from S3 and
+    cached.
+    
+    Args:
+        file_key: The file key
+        node_id: Node ID to render
+        scale: Scale factor (0.01-4)
+        format: Image format (png, jpg, svg, pdf)
+    
+    Returns:
+        Path of the cached image, the render URL when the image can't be
+        cached (cache disabled, unknown version, failed download), or None
+        if Figma didn't render the node
+    """
+    cache = get_image_cache()
+    version = await get_file_version(file_key) if cache is not None else None
+    key = cache.key(file_key, node_id, version, scale, format) if version else None
+    if key is not None:
+        path = await cache.get(key)
+        if path:
+            return path
+    
+    url = await get_image_batcher().render(file_key, node_id, scale=scale, format=format)
+    if not url or key is None:
+        return url
+    
+    try:
+        response = await get_http_client().get(url, timeout=30.0)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return url
+    return await cache.put(key, response.content) or url
+
+
 async def figma_get_image_fills(file_key: str) -> dict:
     """Get image fills in a Figma file.
     
@@ -140,3 +219,134 @@ async def figma_get_file_versions(file_key: str) -> dict:
         List of file versions with metadata
     """
     return await figma_get(f"/files/{file_key}/versions")
+
+
+# Streaming document parsing
+
+# Picks nodes while streaming: called with a node's own properties (nested
+# objects and children left out) and its ancestors' properties (root
+# first, only those parsed before the node's children). Both are live
+# parser state; copy anything kept beyond the loop iteration.
+NodeVisitor = Callable[[dict, list[dict]], bool]
+
+
+def text_under(frame_ids: set[str]) -> NodeVisitor:
+    """Visitor for TEXT nodes inside any of the given frames."""
+    def visit(node: dict, ancestors: list[dict]) -> bool:
+        return node.get("type") == "TEXT" and any(a.get("id") in frame_ids for a in ancestors)
+    return visit
+
+
+def of_type(node_type: str) -> NodeVisitor:
+    """Visitor for nodes of a type ("CANVAS" for pages)."""
+    def visit(node: dict, ancestors: list[dict]) -> bool:
+        return node.get("type") == node_type
+    return visit
+
+
+def name_contains(text: str) -> NodeVisitor:
+    """Visitor for nodes whose name contains a text (case-insensitive)."""
+    text = text.lower()
+    def visit(node: dict, ancestors: list[dict]) -> bool:
+        return text in (node.get("name") or "").lower() and bool(node.get("id"))
+    return visit
+
+
+def instances_of(component_id: str) -> NodeVisitor:
+    """Visitor for INSTANCE nodes of a component."""
+    def visit(node: dict, ancestors: list[dict]) -> bool:
+        return node.get("type") == "INSTANCE" and node.get("componentId") == component_id
+    return visit
+
+
+class _ResponseReader:
+    """File-like async reader over a streamed response body."""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""  # ijson probes the data type with read(0)
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+# Parser frames: a node, the children array of a node, something to skip
+# (nested property of a node) and anything else (response wrapper)
+_NODE, _CHILDREN, _SKIP, _WRAPPER = range(4)
+
+
+async def figma_stream_nodes(
+    file_key: str,
+    visitor: NodeVisitor,
+    ids: Optional[List[str]] = None,
+    depth: Optional[int] = None,
+    timeout: float = 300.0
+) -> AsyncIterator[tuple[dict, list[dict]]]:
+    """Stream a file (or some of its nodes) and yield the nodes a visitor picks.
+    
+    Memory stays bounded by tree depth and the picked nodes, whatever the
+    size of the response. Nodes are yielded when they end (children first),
+    so leaves such as TEXT nodes come in document order.
+    
+    Args:
+        file_key: The file key
+        visitor: Decides which nodes to yield
+        ids: Node IDs to stream instead of the whole file
+        depth: Depth of node tree
+        timeout: Request timeout in seconds
+    
+    Yields:
+        (node properties, ancestor properties) for each picked node
+    
+    Raises:
+        FigmaAPIError: If Figma returns an error response
+    """
+    endpoint = f"/files/{file_key}/nodes" if ids else f"/files/{file_key}"
+    params = {}
+    if ids:
+        params["ids"] = ",".join(ids)
+    if depth:
+        params["depth"] = depth
+    
+    response = await figma_send("GET", endpoint, params=params or None, timeout=timeout, stream=True)
+    try:
+        if response.status_code >= 400:
+            body = await response.aread()
+            raise FigmaAPIError(f"HTTP {response.status_code}: {body.decode(errors='replace')}")
+        
+        frames: list[list] = []  # [kind, last map key]
+        nodes: list[dict] = []   # Properties of the open nodes, root first
+        async for event, value in ijson.basic_parse_async(_ResponseReader(response), use_float=True):
+            top = frames[-1] if frames else None
+            if event == "map_key":
+                if top[0] in (_NODE, _WRAPPER):
+                    top[1] = value
+            elif event == "start_map":
+                if top is None:
+                    kind = _WRAPPER
+                elif top[0] == _CHILDREN or (top[0] == _WRAPPER and top[1] == "document"):
+                    kind = _NODE
+                    nodes.append({})
+                else:
+                    kind = _SKIP if top[0] in (_NODE, _SKIP) else _WRAPPER
+                frames.append([kind, None])
+            elif event == "start_array":
+                if top[0] == _NODE and top[1] == "children":
+                    kind = _CHILDREN
+                else:
+                    kind = _SKIP if top[0] in (_NODE, _SKIP, _CHILDREN) else _WRAPPER
+                frames.append([kind, None])
+            elif event in ("end_map", "end_array"):
+                kind, _ = frames.pop()
+                if kind == _NODE:
+                    node = nodes.pop()
+                    if visitor(node, nodes):
+                        yield node, nodes
+            elif top is not None and top[0] == _NODE and top[1] is not None:
+                nodes[-1][top[1]] = value
+    finally:
+        await response.aclose()
@@ -0,0 +1,104 @@
+"""Figma API - Request Priority Lanes.
+
+Every request is scheduled in a lane: interactive chat calls go ahead of
+background crawls and index rebuilds. The lane is taken from the caller's
+context (``request_priority``).
+
+Work shared by several callers (a coalesced GET, a version probe, a
+batch) must not run in whichever lane happened to start it, or a
+background caller would hold back an interactive one waiting on the same
+result. Such work runs in a fresh context with its own ``Lane``; every
+caller joining it raises the lane to its own priority, including requests
+already queued in the scheduler.
+"""
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional
+
+
+class Priority(IntEnum):
+    """Scheduling lane for a Figma request (lower value goes first)."""
+    INTERACTIVE = 0  # Chat tool calls a user is waiting for
+    BACKGROUND = 1   # Crawls, cache warming, index rebuilds
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "figma_priority", default=Priority.INTERACTIVE
+)
+_lane: contextvars.ContextVar[Optional["Lane"]] = contextvars.ContextVar("figma_lane", default=None)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run all Figma requests made inside the block in the given lane.
+
+    Example:
+        with request_priority(Priority.BACKGROUND):
+            await warm_caches()
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class Lane:
+    """Priority of shared work, raised to that of the most urgent caller."""
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self._queued: dict[asyncio.Future, Callable[[Priority], None]] = {}  # slot -> requeue
+        self._dependencies: list["Lane"] = []  # Shared work this work waits on
+
+    def raise_to(self, priority: Priority):
+        """Raise the lane (never lowers it), requeueing its waiting requests."""
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        for future, requeue in list(self._queued.items()):
+            if not future.done():
+                requeue(priority)
+        for lane in self._dependencies:
+            lane.raise_to(priority)
+
+    def watch(self, future: asyncio.Future, requeue: Callable[[Priority], None]):
+        """Track a request waiting for a scheduler slot in this lane."""
+        self._queued[future] = requeue
+        future.add_done_callback(lambda done: self._queued.pop(done, None))
+
+
+def current_priority() -> Priority:
+    """Priority of requests made in the current context."""
+    lane = _lane.get()
+    return lane.priority if lane is not None else _priority.get()
+
+
+def current_lane() -> Optional[Lane]:
+    """Lane of the shared work running in the current context, if any."""
+    return _lane.get()
+
+
+def start_shared(coro: Awaitable, lane: Optional[Lane] = None) -> tuple[asyncio.Task, Lane]:
+    """Start work shared by several callers in its own lane.
+
+    The task runs in a fresh context, so it inherits nothing from the
+    caller that happened to start it; callers (the first one included)
+    should ``join`` the lane before awaiting the task.
+    """
+    lane = lane or Lane(Priority.BACKGROUND)
+    context = contextvars.Context()
+    context.run(_lane.set, lane)
+    task = asyncio.get_running_loop().create_task(coro, context=context)
+    return task, lane
+
+
+def join(lane: Lane):
+    """Make shared work at least as urgent as the current caller."""
+    lane.raise_to(current_priority())
+    outer = _lane.get()
+    if outer is not None and outer is not lane:
+        # Shared work waiting on other shared work passes raises on
+        outer._dependencies.append(lane)
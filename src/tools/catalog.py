@@ -0,0 +1,190 @@
+"""In-memory component catalog.
+
+Indexes the component list of a Figma file (``/files/{key}/components``)
+by normalized name, containing frame, node id and page, so lookups don't
+rescan the full list on every tool call. One catalog is built per file
+version.
+"""
+import heapq
+from bisect import bisect_left
+from typing import Optional
+
+from .fuzzy import FuzzyIndex
+
+
+# Search tiers, best first
+TIER_EXACT_FRAME = 0
+TIER_EXACT_NAME = 1
+TIER_FRAME_PREFIX = 2
+TIER_NAME_PREFIX = 3
+TIER_FUZZY = 4
+TIER_CONTAINS = 5
+
+
+def _frame(component: dict) -> dict:
+    return component.get("containing_frame") or {}
+
+
+def compact(s: str) -> str:
+    """Lowercase and drop spaces, dashes and underscores ("Tab-Bar" -> "tabbar")."""
+    return s.lower().replace(" ", "").replace("-", "").replace("_", "")
+
+
+class ComponentCatalog:
+    """Component list of one file version with lookup indexes.
+
+    Query methods return components in their original list order, so
+    results match a linear scan over the list.
+    """
+
+    def __init__(self, components: list[dict], version: Optional[str] = None):
+        self.components = components
+        self.version = version
+        self._position: dict[str, int] = {}
+        self._by_node_id: dict[str, dict] = {}
+        self._by_frame: dict[str, list[dict]] = {}       # frame.lower().strip()
+        self._by_name: dict[str, list[dict]] = {}        # name.lower().strip()
+        self._by_page: dict[str, list[dict]] = {}
+        self._frame_members: dict[str, list[dict]] = {}  # raw frame name
+        self._names_lower: list[str] = []
+        self._frames_lower: list[str] = []
+        self._names_compact: list[str] = []
+        self._frames_compact: list[str] = []
+
+        for i, c in enumerate(components):
+            frame = _frame(c)
+            frame_name = frame.get("name", "")
+            name = c.get("name", "")
+            self._position[c["node_id"]] = i
+            self._by_node_id[c["node_id"]] = c
+            self._by_frame.setdefault(frame_name.lower().strip(), []).append(c)
+            self._by_name.setdefault(name.lower().strip(), []).append(c)
+            if frame.get("pageId"):
+                self._by_page.setdefault(frame["pageId"], []).append(c)
+            self._frame_members.setdefault(frame_name, []).append(c)
+            self._names_lower.append(name.lower())
+            self._frames_lower.append(frame_name.lower())
+            self._names_compact.append(compact(name))
+            self._frames_compact.append(compact(frame_name))
+
+        # Sorted (key, position) pairs for prefix lookups via bisect
+        self._name_prefix = sorted((n, i) for i, n in enumerate(self._names_lower))
+        self._frame_prefix = sorted((f, i) for i, f in enumerate(self._frames_lower))
+        self._fuzzy: Optional[FuzzyIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def get(self, node_id: str) -> Optional[dict]:
+        """Get a component by node id."""
+        return self._by_node_id.get(node_id)
+
+    def position(self, component: dict) -> int:
+        """Index of a component in the original list."""
+        return self._position[component["node_id"]]
+
+    def by_frame(self, name: str) -> list[dict]:
+        """Components whose containing frame equals ``name`` (case-insensitive)."""
+        return self._by_frame.get(name.lower().strip(), [])
+
+    def by_name(self, name: str) -> list[dict]:
+        """Components whose name equals ``name`` (case-insensitive)."""
+        return self._by_name.get(name.lower().strip(), [])
+
+    def by_page(self, page_id: str) -> list[dict]:
+        """Components on a page."""
+        return self._by_page.get(page_id, [])
+
+    def frame_members(self, frame_name: str) -> list[dict]:
+        """All components in a containing frame (exact frame name)."""
+        return self._frame_members.get(frame_name, [])
+
+    @staticmethod
+    def _prefix_positions(index: list[tuple[str, int]], prefix: str) -> list[int]:
+        start = bisect_left(index, (prefix, -1))
+        positions = []
+        for i in range(start, len(index)):
+            key, pos = index[i]
+            if not key.startswith(prefix):
+                break
+            positions.append(pos)
+        return positions
+
+    def frames_starting_with(self, prefix: str) -> list[dict]:
+        """Components whose lowercased frame name starts with ``prefix``."""
+        positions = self._prefix_positions(self._frame_prefix, prefix.lower())
+        return [self.components[i] for i in sorted(positions)]
+
+    def names_starting_with(self, prefix: str) -> list[dict]:
+        """Components whose lowercased name starts with ``prefix``."""
+        positions = self._prefix_positions(self._name_prefix, prefix.lower())
+        return [self.components[i] for i in sorted(positions)]
+
+    def names_containing(self, text: str) -> list[dict]:
+        """Components whose lowercased name contains ``text``."""
+        text = text.lower()
+        return [self.components[i] for i, n in enumerate(self._names_lower) if text in n]
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Ranked component search.
+        
+        Tiers: exact frame > exact name > frame prefix > name prefix >
+        fuzzy (ignoring spaces, dashes, underscores; queries over 3 chars) >
+        contains. Within a tier, components keep their list order.
+        
+        Exact and prefix tiers come from the indexes; the list is only
+        scanned for fuzzy/contains matches when those tiers don't fill
+        ``limit``. The top ``limit`` results are selected with a heap.
+        """
+        query_lower = query.lower().strip()
+        query_compact = compact(query)
+        tier_of: dict[int, int] = {}  # position -> best tier
+
+        def add(tier: int, positions):
+            for pos in positions:
+                if pos not in tier_of:
+                    tier_of[pos] = tier
+
+        add(TIER_EXACT_FRAME, (self._position[c["node_id"]] for c in self._by_frame.get(query_lower, ())))
+        add(TIER_EXACT_NAME, (self._position[c["node_id"]] for c in self._by_name.get(query_lower, ())))
+        add(TIER_FRAME_PREFIX, self._prefix_positions(self._frame_prefix, query_lower))
+        add(TIER_NAME_PREFIX, self._prefix_positions(self._name_prefix, query_lower))
+
+        if len(tier_of) < limit:
+            # Single pass for the substring tiers, stopping once enough
+            # fuzzy matches are found (contains matches can't outrank them)
+            fuzzy = len(query_compact) > 3
+            needed = limit - len(tier_of)
+            fuzzy_found = 0
+            frames_compact, names_compact = self._frames_compact, self._names_compact
+            frames_lower, names_lower = self._frames_lower, self._names_lower
+            for pos in range(len(self.components)):
+                if pos in tier_of:
+                    continue
+                if fuzzy and (query_compact in frames_compact[pos] or query_compact in names_compact[pos]):
+                    tier_of[pos] = TIER_FUZZY
+                    fuzzy_found += 1
+                    if fuzzy_found >= needed:
+                        break
+                elif query_lower in names_lower[pos] or query_lower in frames_lower[pos]:
+                    tier_of[pos] = TIER_CONTAINS
+
+        best = heapq.nsmallest(limit, ((tier, pos) for pos, tier in tier_of.items()))
+        return [self.components[pos] for _, pos in best]
+
+    def suggest(self, query: str) -> Optional[str]:
+        """Closest frame or component name for a misspelled query ("Chekbox").
+        
+        Frame names win ties over component names; variant names like
+        "Size=S, Type=Primary" are not indexed.
+        """
+        if self._fuzzy is None:
+            fuzzy = FuzzyIndex()
+            for frame_name in self._frame_members:
+                if frame_name:
+                    fuzzy.add(frame_name, priority=0)
+            for name in self._by_name:
+                if name and "=" not in name:
+                    fuzzy.add(self._by_name[name][0]["name"].strip(), priority=1)
+            self._fuzzy = fuzzy
+        return self._fuzzy.best(query)
@@ -2,15 +2,40 @@
 
 READ-ONLY tools for exploring Figma design system.
 """
-import httpx
+import asyncio
 import os
+import re
+from datetime import datetime, timezone
 from typing import Optional
 from dataclasses import dataclass
+import httpx
 from dotenv import load_dotenv
 
-load_dotenv()
+from src.figma_api.client import (
+    figma_get,
+    get_file_version,
+    request_priority,
+    Priority,
+    FigmaAPIError,
+)
+from src.figma_api.files import (
+    figma_load_nodes,
+    figma_render_image,
+    figma_stream_nodes,
+    instances_of,
+    name_contains,
+    of_type,
+)
+from .catalog import ComponentCatalog
+from .fuzzy import FuzzyIndex
+from .guides import GuideIndex
+from .pages import PageIndex
+from .passages import select_passages, split_passages
+from .fulltext import FullTextIndex
+from .vectors import VectorIndex
+from .snapshot import Snapshot
 
-FIGMA_API_BASE = "https://api.figma.com/v1"
+load_dotenv()
 
 # File keys from environment
 FIGMA_UI_KIT_KEY = os.getenv("FIGMA_UI_KIT_FILE_KEY", "fRi3HAgxLDuHW4MJQPf5r3")
@@ -40,30 +65,49 @@ def get_config() -> FigmaConfig:
     return FigmaConfig(api_key=api_key)
 
 
+def _is_error(data: dict) -> bool:
+    """Check whether a figma_api response is an error payload."""
+    # Successful Figma responses may carry "error": false, so check for a message
+    return isinstance(data.get("error"), str)
+
+
+def _raise_for_error(data: dict) -> dict:
+    """Raise FigmaAPIError if a figma_api response is an error payload."""
+    if _is_error(data):
+        raise FigmaAPIError(data["error"])
+    return data
+
+
 async def list_design_system_files() -> list[dict]:
     """List all files in the design system project."""
     config = get_config()
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/projects/{config.project_id}/files",
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        return resp.json().get("files", [])
+    data = await figma_get(f"/projects/{config.project_id}/files", timeout=30.0)
+    return _raise_for_error(data).get("files", [])
 
 
 async def list_components(file_key: str) -> list[dict]:
     """List all components in a Figma file."""
-    config = get_config()
+    data = await figma_get(f"/files/{file_key}/components", timeout=60.0)
+    return _raise_for_error(data).get("meta", {}).get("components", [])
+
+
+_catalogs: dict[str, ComponentCatalog] = {}
+
+
+async def get_component_catalog(file_key: str) -> ComponentCatalog:
+    """Get the indexed component catalog for the current version of a file.
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/components",
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        return resp.json().get("meta", {}).get("components", [])
+    The catalog is rebuilt only when the file version changes.
+    """
+    version = await get_file_version(file_key)
+    catalog = _catalogs.get(file_key)
+    if catalog is not None and version is not None and catalog.version == version:
+        return catalog
+    
+    catalog = ComponentCatalog(await list_components(file_key), version=version)
+    _catalogs[file_key] = catalog
+    return catalog
 
 
 def _extract_text_from_node(node: dict, texts: list[str], depth: int = 0):
@@ -83,84 +127,90 @@ def _extract_text_from_node(node: dict, texts: list[str], depth: int = 0):
         _extract_text_from_node(child, texts, depth + 1)
 
 
+_guide_indexes: dict[str, GuideIndex] = {}
+_guide_refreshes: dict[str, asyncio.Task] = {}
+_guide_texts: dict[tuple[str, str], tuple[Optional[str], Optional[str]]] = {}  # (file, node) -> (version, text)
+
+
+async def _build_guide_index(file_key: str, version: Optional[str]) -> GuideIndex:
+    """Build the guide index from the file tree (pages + top-level frames)."""
+    # This is the slow full-file fetch; it happens once per file version.
+    # Stream it and keep only the guide nodes.
+    guides: list[tuple[str, str, set]] = []  # (name, node id, ancestor ids), tree order
+    async for node, ancestors in figma_stream_nodes(file_key, name_contains("guide"), depth=2, timeout=120.0):
+        # Nodes end after their children: put each one before its guide descendants
+        at = len(guides)
+        while at and node["id"] in guides[at - 1][2]:
+            at -= 1
+        guides.insert(at, (node["name"], node["id"], {a.get("id") for a in ancestors}))
+    
+    index = GuideIndex(version)
+    for name, node_id, _ in guides:
+        index.add(name, node_id)
+    _guide_indexes[file_key] = index
+    return index
+
+
+async def _refresh_guide_index(file_key: str, version: Optional[str]):
+    """Rebuild a stale guide index in the background lane."""
+    with request_priority(Priority.BACKGROUND):
+        await _build_guide_index(file_key, version)
+
+
+async def get_guide_index(file_key: str) -> GuideIndex:
+    """Get the guide frame index for a file.
+    
+    Built once per file version. When the file changes, the previous index
+    keeps answering while a background task rebuilds it, since guide frame
+    ids rarely move between versions.
+    """
+    version = await get_file_version(file_key)
+    index = _guide_indexes.get(file_key)
+    if index is None:
+        return await _build_guide_index(file_key, version)
+    
+    if version is not None and index.version != version:
+        task = _guide_refreshes.get(file_key)
+        if task is None or task.done():
+            _guide_refreshes[file_key] = asyncio.create_task(_refresh_guide_index(file_key, version))
+    return index
+
+
 async def get_component_guide(file_key: str, component_name: str) -> Optional[str]:
     """Get the documentation/guide for a component.
     
     Looks for a frame named '{component_name} / Guide' and extracts all text from it.
+    The frame is found via the guide index; its text is cached per file version.
     """
-    config = get_config()
+    index = await get_guide_index(file_key)
+    guide_node_id = index.find(component_name)
     
-    # Build the guide frame name pattern
-    guide_name = f"{component_name} / Guide"
-    
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        # Get the file structure (this can be slow for large files)
-        # We use depth=3 to limit how deep we fetch
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}",
-            params={"depth": 2},  # Get top-level structure first
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        
-        # Find the guide frame node ID
-        guide_node_id = None
-        
-        # Normalize for comparison: remove spaces, lowercase
-        target_clean = component_name.lower().replace(" ", "")
-        
-        def find_guide_frame(node: dict):
-            nonlocal guide_node_id
-            name = node.get("name", "")
-            name_clean = name.lower().replace(" ", "")
-            
-            # Check for "Guide" and Component Name
-            # Matches: "Link Cell / Guide", "LinkCell / Guide", "Link Cell Guide"
-            if "guide" in name.lower() and target_clean in name_clean:
-                 guide_node_id = node.get("id")
-                 return True
-                 
-            for child in node.get("children", []):
-                if find_guide_frame(child):
-                    return True
-            return False
-        
-        # Search in the document
-        document = data.get("document", {})
-        find_guide_frame(document)
-        
-        if not guide_node_id:
-            return None
-        
-        # Now fetch the specific node with full depth
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/nodes",
-            params={"ids": guide_node_id},
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        nodes_data = resp.json()
-        
-        # Extract text from the guide frame
-        node_data = nodes_data.get("nodes", {}).get(guide_node_id, {}).get("document", {})
-        
-        texts = []
-        _extract_text_from_node(node_data, texts)
-        
-        if texts:
-            return "\n\n".join(texts)
-        
+    if not guide_node_id:
         return None
+    
+    version = await get_file_version(file_key)
+    cached = _guide_texts.get((file_key, guide_node_id))
+    if cached and version is not None and cached[0] == version:
+        return cached[1]
+    
+    nodes_data = await figma_load_nodes(file_key, [guide_node_id])
+    _raise_for_error(nodes_data)
+    
+    node_data = (nodes_data.get("nodes", {}).get(guide_node_id) or {}).get("document", {})
+    texts = []
+    _extract_text_from_node(node_data, texts)
+    
+    guide = "\n\n".join(texts) if texts else None
+    _guide_texts[(file_key, guide_node_id)] = (version, guide)
+    return guide
 
 
 async def get_component_info(file_key: str, component_name: str) -> Optional[dict]:
     """Get detailed info about a specific component."""
-    components = await list_components(file_key)
+    catalog = await get_component_catalog(file_key)
     
     # Find matching component (case-insensitive partial match)
-    name_lower = component_name.lower()
-    matches = [c for c in components if name_lower in c["name"].lower()]
+    matches = catalog.names_containing(component_name)
     
     if not matches:
         return None
@@ -172,82 +222,22 @@ async def get_component_info(file_key: str, component_name: str) -> Optional[dic
 async def search_components(query: str, file_key: Optional[str] = None) -> list[dict]:
     """Search for components across the design system.
     
-    Results are ranked: exact match > starts_with > contains
+    Results are ranked: exact frame > exact name > frame starts_with >
+    name starts_with > fuzzy (ignore spaces) > contains.
+    If nothing matches, the query is treated as a typo ("Buton") and
+    retried with the closest known frame/component name.
     """
     # Default to UI Kit if no file specified
     if not file_key:
         file_key = "fRi3HAgxLDuHW4MJQPf5r3"  # Bank 02 UI Kit
     
-    components = await list_components(file_key)
-    
-    query_lower = query.lower().strip()
-    
-    # Tier 1: Exact match on containing_frame name (best - this is the component group)
-    exact_frame = [
-        c for c in components 
-        if c.get("containing_frame", {}).get("name", "").lower().strip() == query_lower
-    ]
-    
-    # Tier 2: Exact match on component name
-    exact_name = [
-        c for c in components 
-        if c["name"].lower().strip() == query_lower
-        and c not in exact_frame
-    ]
-    
-    # Tier 3: Frame starts with query
-    starts_frame = [
-        c for c in components 
-        if c.get("containing_frame", {}).get("name", "").lower().startswith(query_lower)
-        and c not in exact_frame and c not in exact_name
-    ]
-    
-    # Tier 4: Name starts with query
-    starts_name = [
-        c for c in components 
-        if c["name"].lower().startswith(query_lower)
-        and c not in exact_frame and c not in exact_name and c not in starts_frame
-    ]
-    
-    # Tier 5: Fuzzy match (ignore spaces)
-    # Helper to clean string for fuzzy comparison
-    def clean(s): return s.lower().replace(" ", "").replace("-", "").replace("_", "")
-    query_clean = clean(query)
-    
-    fuzzy_matches = []
-    seen = set(c["node_id"] for c in exact_frame + exact_name + starts_frame + starts_name)
-    
-    if len(query_clean) > 3: # Only fuzzy search if query has substance
-        for c in components:
-            if c["node_id"] in seen:
-                continue
-                
-            frame = c.get("containing_frame", {}).get("name", "")
-            name = c["name"]
-            
-            # Check frame name fuzzy
-            if query_clean in clean(frame):
-                fuzzy_matches.append(c)
-                seen.add(c["node_id"])
-                continue
-                
-            # Check component name fuzzy
-            if query_clean in clean(name):
-                fuzzy_matches.append(c)
-                seen.add(c["node_id"])
-
-    # Tier 6: Standard Contains match (fallback)
-    contains = [
-        c for c in components 
-        if (query_lower in c["name"].lower() or 
-            query_lower in c.get("containing_frame", {}).get("name", "").lower())
-        and c["node_id"] not in seen
-    ]
-    
-    # Combine in priority order
-    results = exact_frame + exact_name + starts_frame + starts_name + fuzzy_matches + contains
-    
-    return results[:20]  # Limit results
+    catalog = await get_component_catalog(file_key)
+    results = catalog.search(query, limit=20)
+    if not results:
+        suggestion = catalog.suggest(query)
+        if suggestion:
+            results = catalog.search(suggestion, limit=20)
+    return results
 
 
 async def get_component_variants(file_key: str, component_name: str) -> list[dict]:
@@ -256,24 +246,18 @@ async def get_component_variants(file_key: str, component_name: str) -> list[dic
     Searches by containing_frame name, which is the parent frame 
     that groups all variants of a component in Figma.
     """
-    components = await list_components(file_key)
+    catalog = await get_component_catalog(file_key)
     
     name_lower = component_name.lower().strip()
     
     # Strategy 1: Find components where containing_frame matches exactly
-    frame_matches = [
-        c for c in components 
-        if c.get("containing_frame", {}).get("name", "").lower().strip() == name_lower
-    ]
+    frame_matches = catalog.by_frame(name_lower)
     
     if frame_matches:
         return frame_matches
     
     # Strategy 2: Find components where containing_frame starts with the name
-    frame_starts_with = [
-        c for c in components 
-        if c.get("containing_frame", {}).get("name", "").lower().startswith(name_lower)
-    ]
+    frame_starts_with = catalog.frames_starting_with(name_lower)
     
     if frame_starts_with:
         # Group by frame and return the one with most variants
@@ -289,103 +273,75 @@ async def get_component_variants(file_key: str, component_name: str) -> list[dic
         return frames[best_frame]
     
     # Strategy 3: Fallback to component name search (but prefer exact matches)
-    exact_name_matches = [
-        c for c in components 
-        if c["name"].lower().strip() == name_lower
-    ]
+    exact_name_matches = catalog.by_name(name_lower)
     
     if exact_name_matches:
         # Get all variants from the same frame as the exact match
         frame_name = exact_name_matches[0].get("containing_frame", {}).get("name", "")
         if frame_name:
-            return [c for c in components if c.get("containing_frame", {}).get("name") == frame_name]
+            return catalog.frame_members(frame_name)
         return exact_name_matches
     
     # Strategy 4: Partial name match (original behavior)
-    partial_matches = [c for c in components if name_lower in c["name"].lower()]
+    partial_matches = catalog.names_containing(name_lower)
     
     if partial_matches:
         frame_name = partial_matches[0].get("containing_frame", {}).get("name", "")
         if frame_name:
-            return [c for c in components if c.get("containing_frame", {}).get("name") == frame_name]
+            return catalog.frame_members(frame_name)
     
     return partial_matches
 
 
-    return partial_matches
-
-
 async def get_node_image(file_key: str, node_id: str) -> Optional[str]:
-    """Get the image URL for a specific node."""
-    config = get_config()
+    """Get the image of a specific node: a cached image path, or its render URL.
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/images/{file_key}",
-            params={"ids": node_id, "format": "png", "scale": 2},
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            return None
-            
-        data = resp.json()
-        images = data.get("images", {})
-        return images.get(node_id)
+    Returns None if the node can't be rendered right now (rate limited,
+    Figma errors or unreachable): a preview is never worth failing a tool.
+    """
+    try:
+        return await figma_render_image(file_key, node_id, scale=2, format="png")
+    except (FigmaAPIError, httpx.HTTPError):
+        return None
 
 
 async def get_node_data(file_key: str, node_id: str) -> Optional[dict]:
     """Get full data for a specific node to inspect properties."""
-    config = get_config()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/nodes",
-            params={"ids": node_id},
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            return None
-        return resp.json().get("nodes", {}).get(node_id, {}).get("document")
+    data = await figma_load_nodes(file_key, [node_id])
+    if _is_error(data):
+        return None
+    return (data.get("nodes", {}).get(node_id) or {}).get("document")
 
 
 async def get_file_variables(file_key: str) -> dict:
     """Get map of variable ID -> Name for the file."""
-    config = get_config()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/variables/local",
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            return {}
-        
-        # Build map id -> values
-        # Response structure: meta: { variables: [ { id, name, ... } ] }
-        variables = resp.json().get("meta", {}).get("variables", [])
-        return {v["id"]: v["name"] for v in variables}
+    data = await figma_get(f"/files/{file_key}/variables/local", timeout=30.0)
+    if _is_error(data):
+        return {}
+    
+    # Build map id -> values
+    # Response structure: meta: { variables: [ { id, name, ... } ] }
+    variables = data.get("meta", {}).get("variables", [])
+    return {v["id"]: v["name"] for v in variables}
 
 
 async def get_file_styles(file_key: str) -> dict:
     """Get map of style ID -> Name for the file."""
-    config = get_config()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/styles",
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            return {}
-        
-        # Build map id -> values
-        # Response structure: meta: { styles: [ { node_id, style_type, name, description, key } ] }
-        # NOTE: endpoint returns styles metadata. But node references style by 'node_id' or 'key'?
-        # Node uses 'styles' map: { "fill": style_id }. documentation says style_id corresponds to what?
-        # Usually it matches the style's node_id or key? Let's assume node_id based on common usage.
-        styles = resp.json().get("meta", {}).get("styles", [])
-        # Provide mapping for both ID and Key just in case
-        mapping = {s["node_id"]: s["name"] for s in styles}
-        # Also map key just in case some refs use keys
-        mapping.update({s["key"]: s["name"] for s in styles}) 
-        return mapping
+    data = await figma_get(f"/files/{file_key}/styles", timeout=30.0)
+    if _is_error(data):
+        return {}
+    
+    # Build map id -> values
+    # Response structure: meta: { styles: [ { node_id, style_type, name, description, key } ] }
+    # NOTE: endpoint returns styles metadata. But node references style by 'node_id' or 'key'?
+    # Node uses 'styles' map: { "fill": style_id }. documentation says style_id corresponds to what?
+    # Usually it matches the style's node_id or key? Let's assume node_id based on common usage.
+    styles = data.get("meta", {}).get("styles", [])
+    # Provide mapping for both ID and Key just in case
+    mapping = {s["node_id"]: s["name"] for s in styles}
+    # Also map key just in case some refs use keys
+    mapping.update({s["key"]: s["name"] for s in styles}) 
+    return mapping
 
 
 def _rgb_to_hex(r: float, g: float, b: float) -> str:
@@ -468,10 +424,26 @@ def _extract_tokens_recursive(node: dict, var_map: dict, style_map: dict, tokens
             _extract_tokens_recursive(child, var_map, style_map, tokens, raw_props, path + [node_name])
 
 
-async def get_component_details(file_key: str, query: str) -> dict:
+def _component_props(definitions: dict) -> dict:
+    """Property definitions with a readable summary (for code generation)."""
+    summary_lines = []
+    for prop_name, prop_def in definitions.items():
+        p_type = prop_def.get("type")
+        if p_type == "VARIANT":
+            opts = prop_def.get("variantOptions", [])
+            summary_lines.append(f"• {prop_name}: {', '.join(opts)}")
+        elif p_type == "BOOLEAN":
+            summary_lines.append(f"• {prop_name}: True/False")
+        elif p_type == "TEXT":
+            summary_lines.append(f"• {prop_name}: Text")
+    return {"definitions": definitions, "summary": "\n".join(summary_lines)}
+
+
+async def get_component_details(file_key: str, query: str, question: Optional[str] = None) -> dict:
     """Get full details about a component: search result, variants, and rule guide.
     
     This is a "super tool" that combines search, variants, guide, and property inspection.
+    With a ``question``, only the guide passages relevant to it are returned.
     """
     import datetime
     def log(msg):
@@ -480,6 +452,20 @@ async def get_component_details(file_key: str, query: str) -> dict:
 
     log(f"--- START get_component_details: {query} ---")
 
+    # Exact names are answered from the offline snapshot while it is current
+    entry = await _fresh_snapshot_entry(file_key, file_key, query)
+    if entry:
+        log(f"Answered from snapshot: {entry['name']}")
+        return await _details_from_snapshot(file_key, entry, question)
+
+    # 0. Correct typos ("Chekbox") so guide/cover lookups use the real name
+    catalog = await get_component_catalog(file_key)
+    if not catalog.search(query, limit=1):
+        suggestion = catalog.suggest(query)
+        if suggestion:
+            log(f"Corrected query '{query}' -> '{suggestion}'")
+            query = suggestion
+
     # 1. Search to find precise name/frame
     search_results = await search_components(query, file_key)
     log(f"Search results count: {len(search_results)}")
@@ -513,17 +499,23 @@ async def get_component_details(file_key: str, query: str) -> dict:
     if not target_name:
         target_name = query
 
-    # 3. Parallel fetch: Variants, Guide, Image, Node Props
-    variants = await get_component_variants(file_key, target_name)
-    guide = await get_component_guide(file_key, target_name)
-    
-    # Also try to get guide for the query itself if target_name didn't work
-    if not guide and target_name.lower() != query.lower():
-        guide = await get_component_guide(file_key, query)
+    page_id = best_match.get("containing_frame", {}).get("pageId")
 
-    # 3.5 Extract properties from target node (Component Set)
-    node_props = {}
-    if target_id:
+    # 3. Parallel fetch: Variants, Guide, Image, Node Props
+    # Independent chains run together; variants and guide are required,
+    # so if one of them fails the other chains are cancelled.
+    async def fetch_guide() -> Optional[str]:
+        guide = await get_component_guide(file_key, target_name)
+        # Also try to get guide for the query itself if target_name didn't work
+        if not guide and target_name.lower() != query.lower():
+            guide = await get_component_guide(file_key, query)
+        return guide
+
+    async def fetch_props() -> dict:
+        # 3.5 Extract properties from target node (Component Set)
+        node_props = {}
+        if not target_id:
+            return node_props
         node_data = await get_node_data(file_key, target_id)
         log(f"Got node_data for target_id {target_id}: {node_data is not None}")
         
@@ -531,43 +523,51 @@ async def get_component_details(file_key: str, query: str) -> dict:
             # Extract component properties (for code generation)
             comp_props = node_data.get("componentPropertyDefinitions", {})
             if comp_props:
-                node_props["definitions"] = comp_props
-                
-                # Create readable summary
-                summary_lines = []
-                for prop_name, prop_def in comp_props.items():
-                    p_type = prop_def.get("type")
-                    if p_type == "VARIANT":
-                        opts = prop_def.get("variantOptions", [])
-                        summary_lines.append(f"• {prop_name}: {', '.join(opts)}")
-                    elif p_type == "BOOLEAN":
-                        summary_lines.append(f"• {prop_name}: True/False")
-                    elif p_type == "TEXT":
-                        summary_lines.append(f"• {prop_name}: Text")
-                
-                node_props["summary"] = "\n".join(summary_lines)
-                log(f"Extracted props summary with {len(summary_lines)} lines")
-
-    # 4. Find the best "Cover" image (Top-level frame named same as component)
-    image_url = None
-    page_id = best_match.get("containing_frame", {}).get("pageId")
-    
-    log(f"Trying to find cover image. PageID: {page_id}")
-
-    
-    if page_id:
-        # Try to find a top-level frame that exactly matches the component name
-        cover_node_id = await find_top_level_frame(file_key, page_id, target_name)
-        log(f"find_top_level_frame result: {cover_node_id}")
-        
-        if cover_node_id:
-            image_url = await get_node_image(file_key, cover_node_id)
-            log(f"Got image URL from cover: {image_url is not None}")
+                node_props = _component_props(comp_props)
+                log(f"Extracted props summary with {len(node_props['summary'].splitlines())} lines")
+        return node_props
+
+    async def fetch_image() -> tuple[Optional[str], str]:
+        # 4. Find the best "Cover" image (Top-level frame named same as component)
+        log(f"Trying to find cover image. PageID: {page_id}")
+        if page_id:
+            # Try to find a top-level frame that exactly matches the component name
+            cover_node_id = await find_top_level_frame(file_key, page_id, target_name)
+            log(f"find_top_level_frame result: {cover_node_id}")
             
-    # Fallback to Component Set or direct ID if no cover found
-    if not image_url and target_id:
-        log(f"Fallback to target_id: {target_id}")
-        image_url = await get_node_image(file_key, target_id)
+            if cover_node_id:
+                image_url = await get_node_image(file_key, cover_node_id)
+                log(f"Got image URL from cover: {image_url is not None}")
+                if image_url:
+                    return image_url, "cover"
+                
+        # Fallback to Component Set or direct ID if no cover found
+        if target_id:
+            log(f"Fallback to target_id: {target_id}")
+            return await get_node_image(file_key, target_id), "target_id"
+        return None, "target_id"
+
+    async def optional(coro, default):
+        """Run a non-essential step; its failure only drops that part of the answer."""
+        try:
+            return await coro
+        except Exception as e:
+            log(f"Optional step failed: {e!r}")
+            return default
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            variants_task = tg.create_task(get_component_variants(file_key, target_name))
+            guide_task = tg.create_task(fetch_guide())
+            props_task = tg.create_task(optional(fetch_props(), {}))
+            image_task = tg.create_task(optional(fetch_image(), (None, "target_id")))
+    except BaseExceptionGroup as eg:
+        raise eg.exceptions[0]
+
+    variants = variants_task.result()
+    guide = guide_task.result()
+    node_props = props_task.result()
+    image_url, image_found_via = image_task.result()
         
     # Log properties count
     log(f"Props extracted: definitions={len(node_props.get('definitions', {}))}, summary_len={len(node_props.get('summary', ''))}")
@@ -576,6 +576,8 @@ async def get_component_details(file_key: str, query: str) -> dict:
     figma_link = None
     if target_id:
         figma_link = generate_figma_link(file_key, target_id)
+    
+    guide, shown, total = select_passages(guide, question, subject=target_name)
         
     return {
         "found_name": target_name,
@@ -586,6 +588,7 @@ async def get_component_details(file_key: str, query: str) -> dict:
         "variants": [], 
         "variants_count": len(variants),
         "guide": guide,
+        "guide_passages": f"{shown} of {total}",
         "image_url": image_url,
         "figma_link": figma_link,
         "props": node_props,
@@ -593,11 +596,35 @@ async def get_component_details(file_key: str, query: str) -> dict:
             "page_id": page_id,
             "target_id": target_id,
             "best_match_frame": best_match.get("containing_frame"),
-            "image_found_via": "cover" if page_id and image_url and image_url != (await get_node_image(file_key, target_id) if target_id else None) else "target_id",
+            "image_found_via": image_found_via,
             "props_count": len(node_props.get("definitions", {}))
         }
     }
 
+_page_indexes: dict[tuple[str, str], PageIndex] = {}
+
+
+async def get_page_index(file_key: str, page_id: str) -> Optional[PageIndex]:
+    """Get the name index of a page for the current file version.
+    
+    Returns None if the page can't be fetched.
+    """
+    version = await get_file_version(file_key)
+    index = _page_indexes.get((file_key, page_id))
+    if index is not None and version is not None and index.version == version:
+        return index
+    
+    # Depth 3 covers Page -> Section -> Frame
+    data = await figma_load_nodes(file_key, [page_id], depth=3)
+    if _is_error(data):
+        return None
+    
+    page_node = (data.get("nodes", {}).get(page_id) or {}).get("document", {})
+    index = PageIndex.from_page(page_node, page_id, version=version)
+    _page_indexes[(file_key, page_id)] = index
+    return index
+
+
 async def find_top_level_frame(file_key: str, page_id: str, name: str) -> Optional[str]:
     """Find a top-level frame (or inside Section) that matches the name."""
     import datetime
@@ -605,53 +632,20 @@ async def find_top_level_frame(file_key: str, page_id: str, name: str) -> Option
         with open("figma_debug.log", "a") as f:
             f.write(f"[{datetime.datetime.now()}] [find_top_level] {msg}\n")
 
-    config = get_config()
-    target_clean = name.lower().replace(" ", "")
-    log(f"Searching for '{name}' (clean: {target_clean}) in page {page_id}")
-    
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Depth 3 covers Page -> Section -> Frame
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}/nodes",
-            params={"ids": page_id, "depth": 3},
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            log(f"Error fetching page nodes: {resp.status_code}")
-            return None
-            
-        data = resp.json()
-        page_node = data.get("nodes", {}).get(page_id, {}).get("document", {})
-        
-        found_id = None
-        
-        def search_recursive(node, depth=0):
-            nonlocal found_id
-            if found_id: return
-            
-            node_name = node.get("name", "")
-            node_type = node.get("type", "")
-            clean_name = node_name.lower().replace(" ", "")
-            node_id = node.get("id")
-            
-            # log(f"[{depth}] Checking {node_type}: {node_name} ({node_id})")
-            
-            # Check match (Frame, Component, Component Set)
-            if clean_name == target_clean and node_type in ["FRAME", "COMPONENT_SET", "COMPONENT", "SECTION"]:
-                log(f"FOUND MATCH! {node_name} ({node_id})")
-                found_id = node["id"]
-                return
-
-            if "children" in node:
-                for child in node["children"]:
-                    search_recursive(child, depth + 1)
-                    
-        search_recursive(page_node)
-        
-        if not found_id:
-             log("No match found after recursive search.")
-             
-        return found_id
+    log(f"Searching for '{name}' in page {page_id}")
+    
+    index = await get_page_index(file_key, page_id)
+    if index is None:
+        log("Error fetching page nodes")
+        return None
+    
+    found_id = index.find(name)
+    if found_id:
+        log(f"FOUND MATCH! {name} ({found_id})")
+    else:
+        log("No match found in page index.")
+         
+    return found_id
 
 
 def parse_figma_url(url: str) -> dict:
@@ -692,66 +686,33 @@ def parse_figma_url(url: str) -> dict:
 
 async def find_component_usages(file_key: str, component_node_id: str) -> dict:
     """Scan a file to find usages (instances) of a component."""
-    config = get_config()
-    
-    # Fetch the WHOLE file (can be heavy!)
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{file_key}",
-            headers={"X-Figma-Token": config.api_key}
-        )
-        if resp.status_code != 200:
-            return {"error": f"Ошибка загрузки файла: {resp.status_code}"}
+    # Stream the WHOLE file: only matching instances are kept in memory
+    usages = []
+    try:
+        async for node, ancestors in figma_stream_nodes(file_key, instances_of(component_node_id)):
+            # Context is the innermost frame, section or page around the instance
+            frames = [a.get("name", "Unknown") for a in ancestors if a.get("type") in ["FRAME", "SECTION", "CANVAS"]]
+            usages.append({
+                "name": node.get("name"),
+                "id": node.get("id"),
+                "context": frames[-1] if frames else "Root"
+            })
+    except FigmaAPIError as e:
+        return {"error": f"Ошибка загрузки файла: {e}"}
+    
+    # Group stats
+    grouped = {}
+    for u in usages:
+        ctx = u["context"]
+        if ctx not in grouped:
+            grouped[ctx] = 0
+        grouped[ctx] += 1
         
-        data = resp.json()
-        document = data.get("document", {})
-        
-        usages = []
-        
-        def _scan(node, path):
-            if node.get("type") == "INSTANCE" and node.get("componentId") == component_node_id:
-                # Found usage!
-                # Context is the frame name (path[-1] usually)
-                context = path[-1] if path else "Root"
-                usages.append({
-                    "name": node.get("name"),
-                    "id": node.get("id"),
-                    "context": context
-                })
-            
-            # Recurse
-            node_name = node.get("name", "Unknown")
-            # Don't add 'Group' or hidden frames to path logic if we want "Screen Name"?
-            # Let's just track full path
-            new_path = path
-            if node.get("type") in ["FRAME", "SECTION", "CANVAS"]:
-                 new_path = path + [node_name]
-                 
-            for child in node.get("children", []):
-                _scan(child, new_path)
-                
-        _scan(document, [])
-        
-        # Group stats
-        grouped = {}
-        for u in usages:
-            ctx = u["context"]
-            if ctx not in grouped:
-                grouped[ctx] = 0
-            grouped[ctx] += 1
-            
-        return {
-            "total_count": len(usages),
-            "contexts": grouped,
-            "usage_samples": usages[:5] 
-        }
-
-
-        return {
-            "total_count": len(usages),
-            "contexts": grouped,
-            "usage_samples": usages[:5] 
-        }
+    return {
+        "total_count": len(usages),
+        "contexts": grouped,
+        "usage_samples": usages[:5] 
+    }
 
 
 async def analyze_figma_url(url: str) -> dict:
@@ -837,44 +798,65 @@ def get_file_key(name: str) -> str:
 # PATTERNS TOOLS
 # =============================================================================
 
+_patterns: Optional[tuple[Optional[str], list[dict]]] = None  # (file version, pages)
+
+
 async def list_patterns() -> list[dict]:
     """List all patterns (pages) from the Bank Patterns file.
     
     Each page in the Patterns file is a separate pattern topic.
     Returns list of pages with their IDs.
     """
-    config = get_config()
+    global _patterns
+    version = await get_file_version(FIGMA_PATTERNS_KEY)
+    if _patterns is not None and version is not None and _patterns[0] == version:
+        return _patterns[1]
+    
+    pages = []
+    async for node, _ in figma_stream_nodes(FIGMA_PATTERNS_KEY, of_type("CANVAS"), depth=1, timeout=60.0):  # Just get pages
+        pages.append({
+            "name": node.get("name"),
+            "id": node.get("id"),
+            "type": "pattern"
+        })
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{FIGMA_PATTERNS_KEY}",
-            params={"depth": 1},  # Just get pages
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        
-        pages = []
-        document = data.get("document", {})
-        for child in document.get("children", []):
-            if child.get("type") == "CANVAS":
-                pages.append({
-                    "name": child.get("name"),
-                    "id": child.get("id"),
-                    "type": "pattern"
-                })
-        
-        return pages
+    _patterns = (version, pages)
+    return pages
 
 
 async def search_patterns(query: str) -> list[dict]:
     """Search for patterns by name.
     
     Searches across all pattern pages in the Bank Patterns file.
-    Results are ranked: exact match > starts_with > contains.
+    Results are ranked: exact match > starts_with > contains,
+    falling back to typo-tolerant matching on page names.
     """
     patterns = await list_patterns()
-    
+    results = _rank_patterns(patterns, query)
+    if not results:
+        suggestion = _pattern_fuzzy_index(patterns).best(query)
+        if suggestion:
+            results = _rank_patterns(patterns, suggestion)
+    return results
+
+
+_pattern_fuzzy: tuple[tuple, Optional[FuzzyIndex]] = ((), None)
+
+
+def _pattern_fuzzy_index(patterns: list[dict]) -> FuzzyIndex:
+    """Fuzzy index over pattern page names (rebuilt when the pages change)."""
+    global _pattern_fuzzy
+    names = tuple(p["name"] for p in patterns)
+    if _pattern_fuzzy[0] != names or _pattern_fuzzy[1] is None:
+        index = FuzzyIndex()
+        for name in names:
+            index.add(name)
+        _pattern_fuzzy = (names, index)
+    return _pattern_fuzzy[1]
+
+
+def _rank_patterns(patterns: list[dict], query: str) -> list[dict]:
+    """Rank pattern pages by name: exact > starts_with > contains."""
     query_lower = query.lower().strip()
     
     # Tier 1: Exact match
@@ -892,14 +874,127 @@ async def search_patterns(query: str) -> list[dict]:
     return exact + starts + contains
 
 
-async def get_pattern_info(pattern_name: str) -> dict:
+async def _pattern_content(page_id: str, page_name: str) -> dict:
+    """Guide text, guide frame, frame to render and examples of a pattern page."""
+    # 2. Get page content to find guide frame
+    nodes_data = await figma_load_nodes(FIGMA_PATTERNS_KEY, [page_id], depth=2)
+    _raise_for_error(nodes_data)
+    
+    page_node = (nodes_data.get("nodes", {}).get(page_id) or {}).get("document", {})
+    
+    # Look for guide frame (named same as page or "Guide")
+    guide_frame_id = None
+    guide_text = None
+    examples = []
+    all_frames = []
+    
+    for child in page_node.get("children", []):
+        child_name = child.get("name", "").lower()
+        child_type = child.get("type", "")
+        
+        if child_type == "FRAME" or child_type == "SECTION":
+            # Store all frames for fallback text extraction
+            # Sort key: x position (to read left-to-right)
+            x_pos = child.get("absoluteBoundingBox", {}).get("x", 0)
+            all_frames.append((x_pos, child))
+            
+            # Check for explicit guide frame
+            if "guide" in child_name or child_name == page_name.lower():
+                guide_frame_id = child.get("id")
+            elif "guide" not in child_name:
+                examples.append({
+                    "name": child.get("name"),
+                    "id": child.get("id")
+                })
+    
+    # 3. Extract text
+    if guide_frame_id:
+        # Case A: Found explicit guide frame
+        guide_data = await figma_load_nodes(FIGMA_PATTERNS_KEY, [guide_frame_id])
+        _raise_for_error(guide_data)
+        guide_node = (guide_data.get("nodes", {}).get(guide_frame_id) or {}).get("document", {})
+        
+        texts = []
+        _extract_text_from_node(guide_node, texts)
+        if texts:
+            guide_text = "\n\n".join(texts)
+            
+    else:
+        # Case B: No explicit guide frame -> Aggregate text from ALL frames
+        # Sort frames left-to-right
+        all_frames.sort(key=lambda x: x[0])
+        
+        # Limit to first 5 frames to avoid too much noise, or just take all?
+        # Let's take all frames that look like text content (e.g. not named "Example")
+        # For now, let's take up to 10 frames
+        sorted_frames = [f[1] for f in all_frames[:10]]
+        
+        # We need to fetch full content for these frames
+        frame_ids = [f["id"] for f in sorted_frames]
+        if frame_ids:
+            frames_data = await figma_load_nodes(FIGMA_PATTERNS_KEY, frame_ids)
+            if not _is_error(frames_data):
+                nodes_data = frames_data.get("nodes", {})
+                all_texts = []
+                
+                for fid in frame_ids:
+                    f_node = (nodes_data.get(fid) or {}).get("document", {})
+                    f_name = f_node.get("name", "")
+                    f_texts = []
+                    _extract_text_from_node(f_node, f_texts)
+                    
+                    if f_texts:
+                        # Add frame name as header if it has text
+                        section_text = f"### {f_name}\n" + "\n".join(f_texts)
+                        all_texts.append(section_text)
+                
+                if all_texts:
+                    guide_text = "\n\n".join(all_texts)
+    
+    # Frame to render: the guide, else the first frame from the sorted list
+    render_frame_id = guide_frame_id
+    if not render_frame_id and all_frames:
+         # Sort again just to be sure
+         all_frames.sort(key=lambda x: x[0])
+         render_frame_id = all_frames[0][1]["id"]
+         
+    
+    return {
+        "guide": guide_text,
+        "guide_frame_id": guide_frame_id,
+        "render_frame_id": render_frame_id,
+        "examples": [e["name"] for e in examples[:10]],
+    }
+
+
+async def get_pattern_info(pattern_name: str, question: Optional[str] = None) -> dict:
     """Get detailed info about a pattern.
     
     Patterns are pages in the Bank Patterns file.
     This function fetches the guide (if exists as a frame named like the page),
-    renders an image, and returns with a Figma link.
+    renders an image, and returns with a Figma link. With a ``question``,
+    only the guide passages relevant to it are returned.
     """
-    config = get_config()
+    # Exact names are answered from the offline snapshot while it is current
+    entry = await _fresh_snapshot_entry("patterns", FIGMA_PATTERNS_KEY, pattern_name)
+    if entry:
+        guide_text, shown, total = select_passages(entry.get("guide"), question, subject=entry["name"])
+        related = _rank_patterns(
+            [{"name": e["name"]} for e in _snapshot.entries["patterns"]], pattern_name
+        )
+        image_url = None
+        if entry.get("cover_node_id"):
+            image_url = await get_node_image(FIGMA_PATTERNS_KEY, entry["cover_node_id"])
+        return {
+            "name": entry["name"],
+            "type": "pattern",
+            "guide": guide_text,
+            "guide_passages": f"{shown} of {total}",
+            "examples": entry.get("examples", []),
+            "image_url": image_url,
+            "figma_link": generate_figma_link(FIGMA_PATTERNS_KEY, entry["node_id"]),
+            "related_patterns": [p["name"] for p in related[1:5]]
+        }
     
     # 1. Find the pattern page
     patterns = await search_patterns(pattern_name)
@@ -911,120 +1006,31 @@ async def get_pattern_info(pattern_name: str) -> dict:
     page_id = best_match["id"]
     page_name = best_match["name"]
     
-    # 2. Get page content to find guide frame
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        resp = await client.get(
-            f"{FIGMA_API_BASE}/files/{FIGMA_PATTERNS_KEY}/nodes",
-            params={"ids": page_id, "depth": 2},
-            headers={"X-Figma-Token": config.api_key}
-        )
-        resp.raise_for_status()
-        nodes_data = resp.json()
-        
-        page_node = nodes_data.get("nodes", {}).get(page_id, {}).get("document", {})
-        
-        # Look for guide frame (named same as page or "Guide")
-        guide_frame_id = None
-        guide_text = None
-        examples = []
-        all_frames = []
-        
-        for child in page_node.get("children", []):
-            child_name = child.get("name", "").lower()
-            child_type = child.get("type", "")
-            
-            if child_type == "FRAME" or child_type == "SECTION":
-                # Store all frames for fallback text extraction
-                # Sort key: x position (to read left-to-right)
-                x_pos = child.get("absoluteBoundingBox", {}).get("x", 0)
-                all_frames.append((x_pos, child))
-                
-                # Check for explicit guide frame
-                if "guide" in child_name or child_name == page_name.lower():
-                    guide_frame_id = child.get("id")
-                elif "guide" not in child_name:
-                    examples.append({
-                        "name": child.get("name"),
-                        "id": child.get("id")
-                    })
-        
-        # 3. Extract text
-        if guide_frame_id:
-            # Case A: Found explicit guide frame
-            resp = await client.get(
-                f"{FIGMA_API_BASE}/files/{FIGMA_PATTERNS_KEY}/nodes",
-                params={"ids": guide_frame_id},
-                headers={"X-Figma-Token": config.api_key}
-            )
-            resp.raise_for_status()
-            guide_data = resp.json()
-            guide_node = guide_data.get("nodes", {}).get(guide_frame_id, {}).get("document", {})
-            
-            texts = []
-            _extract_text_from_node(guide_node, texts)
-            if texts:
-                guide_text = "\n\n".join(texts)
-                
-        else:
-            # Case B: No explicit guide frame -> Aggregate text from ALL frames
-            # Sort frames left-to-right
-            all_frames.sort(key=lambda x: x[0])
-            
-            # Limit to first 5 frames to avoid too much noise, or just take all?
-            # Let's take all frames that look like text content (e.g. not named "Example")
-            # For now, let's take up to 10 frames
-            sorted_frames = [f[1] for f in all_frames[:10]]
-            
-            # We need to fetch full content for these frames
-            frame_ids = [f["id"] for f in sorted_frames]
-            if frame_ids:
-                resp = await client.get(
-                    f"{FIGMA_API_BASE}/files/{FIGMA_PATTERNS_KEY}/nodes",
-                    params={"ids": ",".join(frame_ids)},
-                    headers={"X-Figma-Token": config.api_key}
-                )
-                if resp.status_code == 200:
-                    nodes_data = resp.json().get("nodes", {})
-                    all_texts = []
-                    
-                    for fid in frame_ids:
-                        f_node = nodes_data.get(fid, {}).get("document", {})
-                        f_name = f_node.get("name", "")
-                        f_texts = []
-                        _extract_text_from_node(f_node, f_texts)
-                        
-                        if f_texts:
-                            # Add frame name as header if it has text
-                            section_text = f"### {f_name}\n" + "\n".join(f_texts)
-                            all_texts.append(section_text)
-                    
-                    if all_texts:
-                        guide_text = "\n\n".join(all_texts)
-        
-        # 4. Get image of the pattern page (first meaningful frame)
-        image_url = None
-        # Use first frame from sorted list if available
-        render_frame_id = guide_frame_id
-        if not render_frame_id and all_frames:
-             # Sort again just to be sure
-             all_frames.sort(key=lambda x: x[0])
-             render_frame_id = all_frames[0][1]["id"]
-             
-        if render_frame_id:
-            image_url = await get_node_image(FIGMA_PATTERNS_KEY, render_frame_id)
-        
-        # 5. Generate Figma link
-        figma_link = generate_figma_link(FIGMA_PATTERNS_KEY, page_id)
-        
-        return {
-            "name": page_name,
-            "type": "pattern",
-            "guide": guide_text,
-            "examples": [e["name"] for e in examples[:10]],
-            "image_url": image_url,
-            "figma_link": figma_link,
-            "related_patterns": [p["name"] for p in patterns[1:5]] if len(patterns) > 1 else []
-        }
+    # 2-3. Find the guide frame and extract its text
+    content = await _pattern_content(page_id, page_name)
+    guide_text = content["guide"]
+    
+    # 4. Get image of the pattern page (first meaningful frame)
+    image_url = None
+    render_frame_id = content["render_frame_id"]
+    if render_frame_id:
+        image_url = await get_node_image(FIGMA_PATTERNS_KEY, render_frame_id)
+    
+    # 5. Generate Figma link
+    figma_link = generate_figma_link(FIGMA_PATTERNS_KEY, page_id)
+    
+    guide_text, shown, total = select_passages(guide_text, question, subject=page_name)
+    
+    return {
+        "name": page_name,
+        "type": "pattern",
+        "guide": guide_text,
+        "guide_passages": f"{shown} of {total}",
+        "examples": content["examples"],
+        "image_url": image_url,
+        "figma_link": figma_link,
+        "related_patterns": [p["name"] for p in patterns[1:5]] if len(patterns) > 1 else []
+    }
 
 
 async def get_variant_image(component_name: str, description: str) -> dict:
@@ -1082,12 +1088,246 @@ async def get_variant_image(component_name: str, description: str) -> dict:
 
 
 
-async def search_design_system(query: str) -> list[dict]:
+# =============================================================================
+# FULL-TEXT SEARCH
+# =============================================================================
+
+FULLTEXT_INDEX_PATH = os.getenv("FULLTEXT_INDEX_PATH", ".cache/fulltext/index.json")
+
+# Source name used in search results for each document kind
+_SOURCE_NAMES = {"component": "ui-kit", "organism": "organisms", "pattern": "patterns"}
+
+_fulltext: Optional[FullTextIndex] = None
+_fulltext_refresh: Optional[asyncio.Task] = None
+
+
+def fulltext_sources() -> dict[str, str]:
+    """Files covered by full-text search: file key -> document kind."""
+    return {
+        FIGMA_UI_KIT_KEY: "component",
+        FILE_KEYS["organisms"]: "organism",
+        FIGMA_PATTERNS_KEY: "pattern",
+    }
+
+
+def _guide_title(name: str) -> str:
+    """Component name of a guide frame ("Link Cell / Guide" -> "Link Cell")."""
+    title = re.sub(r"\s*[/\-—|:]?\s*guide\s*[/\-—|:]?\s*", " ", name, flags=re.IGNORECASE).strip()
+    return title or name
+
+
+async def _node_documents(file_key: str, node_ids: list[str], batch_size: int, depth: Optional[int] = None) -> dict[str, dict]:
+    """Node documents by id, fetched in batches of ``batch_size`` ids."""
+    documents = {}
+    
+    async def fetch(batch: list[str]):
+        params = {"ids": ",".join(batch)}
+        if depth is not None:
+            params["depth"] = depth
+        data = await figma_get(f"/files/{file_key}/nodes", params=params, timeout=120.0)
+        _raise_for_error(data)
+        for node_id in batch:
+            document = (data.get("nodes", {}).get(node_id) or {}).get("document")
+            if document:
+                documents[node_id] = document
+    
+    await asyncio.gather(*(
+        fetch(node_ids[i:i + batch_size]) for i in range(0, len(node_ids), batch_size)
+    ))
+    return documents
+
+
+async def _node_texts(file_key: str, node_ids: list[str], batch_size: int) -> dict[str, str]:
+    """All text inside each node, fetched in batches of ``batch_size`` ids."""
+    documents = await _node_documents(file_key, node_ids, batch_size)
+    texts = {}
+    for node_id, node in documents.items():
+        parts = []
+        _extract_text_from_node(node, parts)
+        if parts:
+            texts[node_id] = "\n\n".join(parts)
+    return texts
+
+
+async def build_fulltext_documents(file_key: str) -> tuple[Optional[str], list[dict]]:
+    """Full-text documents of one file: its guide frames, or pages for patterns.
+    
+    Returns:
+        (file version, documents)
+    """
+    kind = fulltext_sources()[file_key]
+    version = await get_file_version(file_key)
+    if kind == "pattern":
+        frames = [(p["name"], p["id"]) for p in await list_patterns()]
+        batch_size = 5  # Whole pages are large
+    else:
+        index = await get_guide_index(file_key)
+        frames = [(_guide_title(name), node_id) for name, node_id in index.frames()]
+        batch_size = 20
+    
+    texts = await _node_texts(file_key, [node_id for _, node_id in frames], batch_size)
+    documents = [
+        {"file_key": file_key, "kind": kind, "name": name, "node_id": node_id, "text": texts[node_id]}
+        for name, node_id in frames
+        if node_id in texts
+    ]
+    return version, documents
+
+
+async def build_fulltext_index(
+    index: Optional[FullTextIndex] = None,
+    file_keys: Optional[list[str]] = None
+) -> FullTextIndex:
+    """Build the full-text index, or rebuild some files of an existing one."""
+    index = index or FullTextIndex([])
+    for file_key in file_keys or list(fulltext_sources()):
+        version, documents = await build_fulltext_documents(file_key)
+        index = index.replace_file(file_key, version, documents)
+    return index
+
+
+async def _refresh_fulltext(file_keys: list[str]):
+    """Rebuild changed files of the full-text index in the background lane."""
+    global _fulltext
+    try:
+        with request_priority(Priority.BACKGROUND):
+            index = await build_fulltext_index(_fulltext, file_keys)
+        _fulltext = index
+        await asyncio.to_thread(index.save, FULLTEXT_INDEX_PATH)
+    except Exception as e:
+        print(f"Full-text index refresh failed: {e}")
+
+
+async def get_fulltext_index() -> FullTextIndex:
+    """Get the full-text index.
+    
+    Loaded from ``FULLTEXT_INDEX_PATH`` on first use. Files whose version
+    differs from the one they were indexed at (or that are missing) are
+    rebuilt in the background while the current index keeps answering.
+    """
+    global _fulltext, _fulltext_refresh
+    if _fulltext is None:
+        try:
+            _fulltext = await asyncio.to_thread(FullTextIndex.load, FULLTEXT_INDEX_PATH)
+        except (OSError, ValueError):
+            _fulltext = FullTextIndex([])
+    
+    file_keys = list(fulltext_sources())
+    versions = await asyncio.gather(*(get_file_version(key) for key in file_keys))
+    stale = [
+        key for key, version in zip(file_keys, versions)
+        if version is not None and _fulltext.versions.get(key) != version
+    ]
+    if stale and (_fulltext_refresh is None or _fulltext_refresh.done()):
+        _fulltext_refresh = asyncio.create_task(_refresh_fulltext(stale))
+    return _fulltext
+
+
+# =============================================================================
+# SIMILARITY SEARCH
+# =============================================================================
+
+_vector_index: tuple[Optional[tuple], Optional[asyncio.Task]] = (None, None)  # (sources key, build task)
+
+# Longest passage text kept as a result snippet
+_SNIPPET_CHARS = 300
+
+
+def _build_vector_index(catalogs: dict[str, ComponentCatalog], fulltext: FullTextIndex) -> VectorIndex:
+    """Vector index over component and frame names, guide passages and pattern pages."""
+    kinds = fulltext_sources()
+    texts, items = [], []
+    
+    def add(text: str, item: dict):
+        texts.append(text)
+        items.append(item)
+    
+    for file_key, catalog in catalogs.items():
+        seen_frames = set()
+        for c in catalog.components:
+            frame = c.get("containing_frame") or {}
+            frame_id = frame.get("nodeId")
+            if frame.get("name") and frame_id not in seen_frames:
+                seen_frames.add(frame_id)
+                add(frame["name"], {"kind": "frame", "type": kinds[file_key], "name": frame["name"],
+                                    "file_key": file_key, "node_id": frame_id})
+            if "=" not in c["name"]:
+                add(c["name"], {"kind": "component", "type": kinds[file_key], "name": c["name"],
+                                "file_key": file_key, "node_id": c["node_id"]})
+    
+    for doc in fulltext.documents:
+        base = {"type": doc["kind"], "name": doc["name"], "file_key": doc["file_key"], "node_id": doc["node_id"]}
+        if doc["kind"] == "pattern":
+            add(f"{doc['name']}\n{doc['text'][:2000]}", {**base, "kind": "pattern"})
+        for passage in split_passages(doc["text"]):
+            text = passage.render()
+            add(f"{doc['name']}\n{text}", {**base, "kind": "passage", "snippet": text[:_SNIPPET_CHARS]})
+    
+    return VectorIndex(texts, items)
+
+
+async def get_vector_index() -> VectorIndex:
+    """Get the similarity index, rebuilt when a catalog or the full-text index changes."""
+    global _vector_index
+    catalog_keys = [FIGMA_UI_KIT_KEY, FILE_KEYS["organisms"]]
+    catalog_list, fulltext = await asyncio.gather(
+        asyncio.gather(*(get_component_catalog(key) for key in catalog_keys)),
+        get_fulltext_index()
+    )
+    catalogs = dict(zip(catalog_keys, catalog_list))
+    key = (
+        tuple((file_key, id(c), c.version) for file_key, c in catalogs.items()),
+        id(fulltext),
+    )
+    
+    cached_key, task = _vector_index
+    if task is None or cached_key != key:
+        # Building is CPU-bound; keep it off the event loop
+        task = asyncio.ensure_future(asyncio.to_thread(_build_vector_index, catalogs, fulltext))
+        _vector_index = (key, task)
+    return await asyncio.shield(task)
+
+
+async def search_similar(queries: list[str], limit: int = 10) -> list[list[dict]]:
+    """Similarity search for a batch of queries (descriptions in the user's own words).
+    
+    Returns:
+        Per query, items best first: type, name, file_key, node_id, source,
+        score, matched ("component", "frame", "passage", "pattern") and a
+        snippet for passages
+    """
+    index = await get_vector_index()
+    batches = index.search_batch(queries, limit)
+    return [
+        [
+            {
+                "type": hit["type"],
+                "name": hit["name"],
+                "file_key": hit["file_key"],
+                "node_id": hit["node_id"],
+                "source": _SOURCE_NAMES[hit["type"]],
+                "score": hit["score"],
+                "matched": hit["kind"],
+                **({"snippet": hit["snippet"]} if "snippet" in hit else {}),
+            }
+            for hit in hits
+        ]
+        for hits in batches
+    ]
+
+
+async def search_design_system(query: str, mode: str = "keyword") -> list[dict]:
     """Universal search across components, organisms, and patterns.
     
-    Searches UI Kit, Organisms, and Bank Patterns files.
+    Searches UI Kit, Organisms, and Bank Patterns files by name, plus the
+    text of their guides via the full-text index (with snippets).
+    With ``mode="similar"``, ranks names, guide passages and pattern pages
+    by vector similarity instead, for descriptions that share no keywords.
     Returns results with type indicator.
     """
+    if mode == "similar":
+        return (await search_similar([query]))[0]
+    
     import asyncio
     
     # Get organisms file key
@@ -1097,9 +1337,10 @@ async def search_design_system(query: str) -> list[dict]:
     components_task = search_components(query, FIGMA_UI_KIT_KEY)
     organisms_task = search_components(query, organisms_key)
     patterns_task = search_patterns(query)
+    fulltext_task = get_fulltext_index()
     
-    components, organisms, patterns = await asyncio.gather(
-        components_task, organisms_task, patterns_task
+    components, organisms, patterns, fulltext = await asyncio.gather(
+        components_task, organisms_task, patterns_task, fulltext_task
     )
     
     results = []
@@ -1134,5 +1375,210 @@ async def search_design_system(query: str) -> list[dict]:
             "source": "patterns"
         })
     
+    # Add guide content matches (or their snippets to name matches)
+    for hit in fulltext.search(query, limit=5):
+        source = _SOURCE_NAMES[hit["kind"]]
+        existing = next(
+            (r for r in results if r["source"] == source and r["name"] == hit["name"]), None
+        )
+        if existing:
+            existing["snippet"] = hit["snippet"]
+            continue
+        results.append({
+            "type": hit["kind"],
+            "name": hit["name"],
+            "file_key": hit["file_key"],
+            "node_id": hit["node_id"],
+            "source": source,
+            "snippet": hit["snippet"]
+        })
+    
     return results
 
+
+
+# =============================================================================
+# OFFLINE SNAPSHOT
+# =============================================================================
+
+# Bundled snapshot (built with scripts/build_snapshot.py) and the copy the
+# background refresh keeps up to date
+SNAPSHOT_PATH = os.getenv(
+    "SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "design_system_index.json")
+)
+SNAPSHOT_CACHE_PATH = os.getenv("SNAPSHOT_CACHE_PATH", ".cache/snapshot/design_system_index.json")
+
+_snapshot = Snapshot()
+_snapshot_refresh: Optional[asyncio.Task] = None
+
+
+def snapshot_sources() -> dict[str, str]:
+    """Files covered by the snapshot: file key -> snapshot kind."""
+    return {
+        FIGMA_UI_KIT_KEY: "components",
+        FILE_KEYS["organisms"]: "organisms",
+        FIGMA_PATTERNS_KEY: "patterns",
+    }
+
+
+def load_snapshot() -> Snapshot:
+    """Load the refreshed snapshot if there is one, else the bundled one."""
+    global _snapshot
+    for path in (SNAPSHOT_CACHE_PATH, SNAPSHOT_PATH):
+        try:
+            _snapshot = Snapshot.load(path)
+            break
+        except (OSError, ValueError):
+            continue
+    return _snapshot
+
+
+def get_snapshot() -> Snapshot:
+    """Get the loaded snapshot."""
+    return _snapshot
+
+
+async def _component_snapshot_entries(file_key: str) -> list[dict]:
+    """Snapshot entries for the component sets of a file."""
+    catalog, guides = await asyncio.gather(get_component_catalog(file_key), get_guide_index(file_key))
+    
+    frames = {}  # frame name -> containing frame
+    for c in catalog.components:
+        frame = c.get("containing_frame") or {}
+        if frame.get("name") and frame.get("nodeId"):
+            frames.setdefault(frame["name"], frame)
+    
+    guide_ids = {name: guides.find(name) for name in frames}
+    nodes, guide_texts = await asyncio.gather(
+        _node_documents(file_key, [f["nodeId"] for f in frames.values()], batch_size=20, depth=1),
+        _node_texts(file_key, sorted({i for i in guide_ids.values() if i}), batch_size=20),
+    )
+    covers = await asyncio.gather(*(
+        find_top_level_frame(file_key, frame["pageId"], name) if frame.get("pageId") else asyncio.sleep(0)
+        for name, frame in frames.items()
+    ))
+    
+    entries = []
+    for (name, frame), cover_id in zip(frames.items(), covers):
+        guide_id = guide_ids[name]
+        node = nodes.get(frame["nodeId"]) or {}
+        entries.append({
+            "name": name,
+            "file_key": file_key,
+            "node_id": frame["nodeId"],
+            "page_id": frame.get("pageId"),
+            "cover_node_id": cover_id,
+            "guide_node_id": guide_id,
+            "guide": guide_texts.get(guide_id),
+            "props": node.get("componentPropertyDefinitions") or {},
+            "variants_count": len(catalog.frame_members(name)),
+        })
+    return entries
+
+
+async def _pattern_snapshot_entries() -> list[dict]:
+    """Snapshot entries for the pattern pages."""
+    pages = await list_patterns()
+    contents = await asyncio.gather(*(_pattern_content(p["id"], p["name"]) for p in pages))
+    return [
+        {
+            "name": page["name"],
+            "file_key": FIGMA_PATTERNS_KEY,
+            "node_id": page["id"],
+            "page_id": page["id"],
+            "cover_node_id": content["render_frame_id"],
+            "guide_node_id": content["guide_frame_id"],
+            "guide": content["guide"],
+            "examples": content["examples"],
+        }
+        for page, content in zip(pages, contents)
+    ]
+
+
+async def build_snapshot(snapshot: Optional[Snapshot] = None, file_keys: Optional[list[str]] = None) -> Snapshot:
+    """Build the snapshot, or rebuild some files of an existing one."""
+    snapshot = snapshot or Snapshot()
+    sources = snapshot_sources()
+    for file_key in file_keys or list(sources):
+        kind = sources[file_key]
+        version = await get_file_version(file_key)
+        if kind == "patterns":
+            entries = await _pattern_snapshot_entries()
+        else:
+            entries = await _component_snapshot_entries(file_key)
+        snapshot = snapshot.replace(kind, file_key, version, entries)
+    snapshot.built_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return snapshot
+
+
+async def refresh_snapshot():
+    """Rebuild the snapshot files whose Figma version changed (background lane)."""
+    global _snapshot
+    try:
+        with request_priority(Priority.BACKGROUND):
+            file_keys = list(snapshot_sources())
+            versions = await asyncio.gather(*(get_file_version(key) for key in file_keys))
+            stale = [
+                key for key, version in zip(file_keys, versions)
+                if version is not None and _snapshot.version(key) != version
+            ]
+            if not stale:
+                return
+            print(f"🔄 Refreshing snapshot for {len(stale)} file(s)")
+            snapshot = await build_snapshot(_snapshot, stale)
+        _snapshot = snapshot
+        await asyncio.to_thread(snapshot.save, SNAPSHOT_CACHE_PATH)
+    except Exception as e:
+        print(f"Snapshot refresh failed: {e}")
+
+
+def start_snapshot_refresh():
+    """Check for newer file versions in the background (one refresh at a time)."""
+    global _snapshot_refresh
+    if _snapshot_refresh is None or _snapshot_refresh.done():
+        _snapshot_refresh = asyncio.create_task(refresh_snapshot())
+
+
+async def _fresh_snapshot_entry(scope: str, file_key: str, name: str) -> Optional[dict]:
+    """Snapshot entry by exact name, if it was built from the file's current version.
+    
+    A stale entry starts a background refresh and is not used; the caller
+    falls back to the live lookup. When the version can't be checked (Figma
+    unreachable), the snapshot is served as is.
+    """
+    entry = _snapshot.find(scope, name)
+    if entry is None:
+        return None
+    try:
+        version = await get_file_version(file_key)
+    except httpx.HTTPError:
+        return entry
+    if version is not None and version != _snapshot.version(file_key):
+        start_snapshot_refresh()
+        return None
+    return entry
+
+
+async def _details_from_snapshot(file_key: str, entry: dict, question: Optional[str]) -> dict:
+    """get_component_details result for a snapshot entry (no Figma calls but the preview)."""
+    image_url = await get_node_image(file_key, entry.get("cover_node_id") or entry["node_id"])
+    guide, shown, total = select_passages(entry.get("guide"), question, subject=entry["name"])
+    return {
+        "found_name": entry["name"],
+        "search_matches": [],
+        "variants": [],
+        "variants_count": entry.get("variants_count", 0),
+        "guide": guide,
+        "guide_passages": f"{shown} of {total}",
+        "image_url": image_url,
+        "figma_link": generate_figma_link(file_key, entry["node_id"]),
+        "props": _component_props(entry["props"]) if entry.get("props") else {},
+        "_debug_info": {
+            "source": "snapshot",
+            "snapshot_version": _snapshot.version(file_key),
+            "page_id": entry.get("page_id"),
+            "target_id": entry["node_id"],
+            "image_found_via": "cover" if entry.get("cover_node_id") else "target_id",
+            "props_count": len(entry.get("props") or {})
+        }
+    }
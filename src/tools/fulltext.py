@@ -0,0 +1,98 @@
+"""Full-text index over design system guides.
+
+An inverted index with BM25 ranking over the text of guide frames
+(UI kit, organisms) and pattern pages, so content questions ("высота
+модальных окон") find the guide that talks about it even when no title
+contains the words. Tokenizing and BM25 scoring are shared with passage
+retrieval (``ranking.py``).
+
+The index is built offline (``scripts/build_fulltext_index.py``) or in
+the background, saved as JSON with the file version of every source, and
+rebuilt per file when that version changes.
+"""
+import heapq
+import json
+import os
+from typing import Optional
+
+from .ranking import BM25, WORD, stem, tokenize
+
+
+class FullTextIndex:
+    """BM25 inverted index over guide documents.
+
+    A document is a dict with "file_key", "kind" (component, organism,
+    pattern), "name", "node_id" and "text". ``versions`` maps each indexed
+    file key to the file version its documents were built from.
+    """
+
+    def __init__(self, documents: list[dict], versions: Optional[dict[str, str]] = None):
+        self.documents = documents
+        self.versions = dict(versions or {})
+        self._bm25 = BM25([tokenize(f"{doc['name']}\n{doc['text']}") for doc in documents])
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Best matching documents for a query.
+
+        Returns:
+            Documents (without text) with "score" and a "snippet" around
+            the best matching line, best first
+        """
+        terms = set(tokenize(query))
+        scores = self._bm25.scores(terms)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in best:
+            doc = self.documents[doc_id]
+            result = {k: v for k, v in doc.items() if k != "text"}
+            result["score"] = round(score, 3)
+            result["snippet"] = snippet(doc["text"], terms)
+            results.append(result)
+        return results
+
+    def replace_file(self, file_key: str, version: Optional[str], documents: list[dict]) -> "FullTextIndex":
+        """New index with one file's documents rebuilt."""
+        kept = [doc for doc in self.documents if doc["file_key"] != file_key]
+        versions = {**self.versions, file_key: version}
+        return FullTextIndex(kept + documents, versions)
+
+    def save(self, path: str):
+        """Write the index (documents and versions) to a JSON file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"versions": self.versions, "documents": self.documents}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FullTextIndex":
+        """Read an index saved with ``save`` (postings are rebuilt in memory)."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("documents", []), data.get("versions", {}))
+
+
+def snippet(text: str, terms: set[str], width: int = 200) -> str:
+    """The line of ``text`` with most query terms, cut to about ``width`` characters."""
+    best_line, best_hits = "", 0
+    for line in text.splitlines():
+        hits = len(terms.intersection(tokenize(line)))
+        if hits > best_hits:
+            best_line, best_hits = line.strip(), hits
+    if not best_line:
+        best_line = text.strip().split("\n", 1)[0]
+    if len(best_line) <= width:
+        return best_line
+
+    # Center the cut on the first matching word
+    start = 0
+    for match in WORD.finditer(best_line.lower()):
+        if stem(match.group().replace("ё", "е")) in terms:
+            start = max(match.start() - width // 3, 0)
+            break
+    cut = best_line[start:start + width].strip()
+    return ("…" if start > 0 else "") + cut + ("…" if start + width < len(best_line) else "")
@@ -0,0 +1,123 @@
+"""Typo-tolerant name lookup.
+
+SymSpell-style index: every indexed term is stored under all strings
+obtained by deleting up to ``max_distance`` characters, so a lookup only
+generates the deletes of the query and verifies the few candidates with a
+real edit distance. No pairwise scan over the vocabulary is needed.
+"""
+from bisect import insort
+from typing import Optional
+
+
+def normalize(text: str) -> str:
+    """Lowercase, fold "ё" and drop spaces, dashes, underscores and slashes."""
+    text = text.lower().replace("ё", "е")
+    for ch in " -_/":
+        text = text.replace(ch, "")
+    return text
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or ``max_distance + 1`` if larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        curr = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                curr[j] = min(curr[j], prev2[j - 2] + 1)
+            row_min = min(row_min, curr[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, curr
+    return min(prev[-1], max_distance + 1)
+
+
+def _deletes(term: str, max_distance: int) -> set[str]:
+    """All strings obtained by deleting up to ``max_distance`` characters."""
+    result = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {s[:i] + s[i + 1:] for s in frontier for i in range(len(s))}
+        result |= frontier
+    return result
+
+
+class FuzzyIndex:
+    """Maps misspelled names to indexed names within a small edit distance.
+
+    Whole names and their individual words (4+ letters) are indexed, so
+    "навигацыя" finds "Навигация по экранам". Results are ranked by
+    distance, then whole-name matches, then ``priority``, then length.
+    """
+
+    def __init__(self, max_distance: int = 2, max_term_length: int = 32):
+        self.max_distance = max_distance
+        self.max_term_length = max_term_length
+        self._terms: dict[str, list[tuple[int, int, str]]] = {}  # term -> sorted [(rank, len, value)]
+        self._deletes: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, name: str, priority: int = 0):
+        """Index a name (and its words); lookups return the original ``name``."""
+        self._add_term(normalize(name), name, priority * 2)
+        words = name.split()
+        if len(words) > 1:
+            for word in words:
+                if len(word) >= 4:
+                    self._add_term(normalize(word), name, priority * 2 + 1)
+
+    def _add_term(self, term: str, value: str, rank: int):
+        if not term or len(term) > self.max_term_length:
+            return
+        values = self._terms.get(term)
+        if values is None:
+            self._terms[term] = values = []
+            for deleted in _deletes(term, self.max_distance):
+                self._deletes.setdefault(deleted, set()).add(term)
+        entry = (rank, len(value), value)
+        if entry not in values:
+            insort(values, entry)
+
+    def lookup(self, query: str, limit: int = 5) -> list[tuple[int, str]]:
+        """Find indexed names close to ``query``.
+
+        Short queries (4 chars or less) only allow one edit.
+
+        Returns:
+            List of (distance, name), best first
+        """
+        term = normalize(query)
+        if not term or len(term) > self.max_term_length:
+            return []
+        max_distance = 1 if len(term) <= 4 else self.max_distance
+
+        candidates = set()
+        for deleted in _deletes(term, max_distance):
+            candidates.update(self._deletes.get(deleted, ()))
+
+        best: dict[str, tuple[int, int, int]] = {}
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            # Values are kept sorted, so only the first few can make the cut
+            for rank, length, value in self._terms[candidate][:limit]:
+                key = (distance, rank, length)
+                if value not in best or key < best[value]:
+                    best[value] = key
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))
+        return [(key[0], value) for value, key in ranked[:limit]]
+
+    def best(self, query: str) -> Optional[str]:
+        """Closest indexed name, or None."""
+        matches = self.lookup(query, limit=1)
+        return matches[0][1] if matches else None
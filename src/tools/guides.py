@@ -0,0 +1,58 @@
+"""Guide frame index.
+
+Component documentation lives in frames named like "Button / Guide".
+The index maps component names to those frames' node ids, built once per
+file version from the file tree at depth=2, so a guide lookup doesn't
+download and walk the whole file.
+"""
+from typing import Optional
+
+
+def _clean(name: str) -> str:
+    return name.lower().replace(" ", "")
+
+
+def _guide_key(name: str) -> str:
+    """Component name a guide frame documents ("Link Cell / Guide" -> "linkcell")."""
+    return _clean(name).replace("guide", "").strip("/-—|:")
+
+
+class GuideIndex:
+    """Guide frames of one file version."""
+
+    def __init__(self, version: Optional[str] = None):
+        self.version = version
+        self._guides: list[tuple[str, str]] = []  # (clean name, node id), tree order
+        self._names: list[str] = []                # original names, tree order
+        self._by_key: dict[str, str] = {}          # component key -> node id
+
+    def __len__(self) -> int:
+        return len(self._guides)
+
+    def add(self, name: str, node_id: str):
+        """Register a guide frame."""
+        self._guides.append((_clean(name), node_id))
+        self._names.append(name)
+        self._by_key.setdefault(_guide_key(name), node_id)
+
+    def frames(self) -> list[tuple[str, str]]:
+        """All guide frames as (name, node id), in tree order."""
+        return [(name, node_id) for name, (_, node_id) in zip(self._names, self._guides)]
+
+    def find(self, component_name: str) -> Optional[str]:
+        """Guide frame id for a component.
+
+        An exact name match ("Button / Guide" for "Button") wins; otherwise
+        the first guide whose name contains the component name is used
+        (matches "Link Cell / Guide", "LinkCell / Guide", "Link Cell Guide").
+        """
+        target_clean = _clean(component_name)
+        if not target_clean:
+            return None
+        exact = self._by_key.get(target_clean)
+        if exact:
+            return exact
+        for name_clean, node_id in self._guides:
+            if target_clean in name_clean:
+                return node_id
+        return None
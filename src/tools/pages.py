@@ -0,0 +1,44 @@
+"""Per-page name index.
+
+Maps normalized node names on a page (fetched at depth=3: Page -> Section
+-> Frame) to the ids of matching frames, component sets, components and
+sections, so cover lookups are a dictionary hit after the first fetch of
+a page.
+"""
+from typing import Optional
+
+
+# Node types that can serve as a component cover
+COVER_TYPES = ("FRAME", "COMPONENT_SET", "COMPONENT", "SECTION")
+
+
+def _clean(name: str) -> str:
+    return name.lower().replace(" ", "")
+
+
+class PageIndex:
+    """Name -> node id index of one page at one file version."""
+
+    def __init__(self, page_id: str, version: Optional[str] = None):
+        self.page_id = page_id
+        self.version = version
+        self._by_name: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    @classmethod
+    def from_page(cls, page_node: dict, page_id: str, version: Optional[str] = None) -> "PageIndex":
+        """Index a page subtree; the first node in depth-first order wins a name."""
+        index = cls(page_id, version)
+        stack = [page_node]
+        while stack:
+            node = stack.pop()
+            if node.get("type") in COVER_TYPES and node.get("id"):
+                index._by_name.setdefault(_clean(node.get("name", "")), node["id"])
+            stack.extend(reversed(node.get("children", [])))
+        return index
+
+    def find(self, name: str) -> Optional[str]:
+        """Id of the cover-type node whose name matches (ignoring case and spaces)."""
+        return self._by_name.get(_clean(name))
@@ -0,0 +1,135 @@
+"""Passage retrieval inside guide texts.
+
+Guide texts are split into passages (one per text node; pattern texts also
+carry their "### Frame" header) and ranked against a question with the
+BM25 scorer shared with the full-text index (``ranking.py``), so a tool
+can return only the paragraphs that answer it ("Есть что-то про высоту
+модалок?") instead of the whole guide.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from .ranking import BM25, tokenize
+
+
+# Stems are cut to their first letters: inside one guide that merges forms
+# the stemmer leaves apart ("модалок"/"модальные")
+_STEM_LENGTH = 5
+# Short lines without a sentence ending are headings for what follows
+_HEADING_LENGTH = 40
+
+
+def stems(text: str) -> list[str]:
+    """Ranking terms of a text."""
+    return tokenize(text, prefix_length=_STEM_LENGTH)
+
+
+@dataclass
+class Passage:
+    """A paragraph of a guide, with the heading it appears under."""
+    text: str
+    heading: Optional[str] = None
+
+    def render(self) -> str:
+        return f"{self.heading}\n{self.text}" if self.heading else self.text
+
+
+def _is_heading(text: str) -> bool:
+    return len(text) < _HEADING_LENGTH and "\n" not in text and not text.endswith((".", "!", "?", ":", ";"))
+
+
+def split_passages(text: str) -> list[Passage]:
+    """Split a guide into passages.
+
+    Blocks are separated by blank lines (one per text node). A block
+    starting with "### Frame" is a pattern section whose lines are separate
+    text nodes under that header. Short heading-like text nodes ("Размеры")
+    become the heading of the passages after them; a heading with nothing
+    under it is kept as a passage of its own.
+    """
+    passages = []
+    heading = None
+    pending = None  # Heading line not followed by a passage yet
+
+    def flush():
+        if pending is not None:
+            passages.append(Passage(pending[0], pending[1]))
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        section = None
+        lines = [block]
+        if block.startswith("### "):
+            header, _, rest = block.partition("\n")
+            flush()
+            pending = None
+            section = heading = header[4:].strip()
+            lines = [line.strip() for line in rest.splitlines() if line.strip()]
+
+        for line in lines:
+            if _is_heading(line):
+                flush()
+                pending = (line, section)
+                heading = f"{section} / {line}" if section else line
+                continue
+            pending = None
+            passages.append(Passage(line, heading))
+    flush()
+    return passages
+
+
+class PassageIndex:
+    """BM25 index over the passages of one guide."""
+
+    def __init__(self, passages: list[Passage]):
+        self.passages = passages
+        self._bm25 = BM25([stems(p.render()) for p in passages])
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def scores(self, question: str, exclude: str = "") -> list[float]:
+        """BM25 score of every passage for a question, ignoring the words of ``exclude``."""
+        scores = self._bm25.scores(set(stems(question)) - set(stems(exclude)))
+        return [scores.get(i, 0.0) for i in range(len(self.passages))]
+
+    def top(self, question: str, limit: int = 3, exclude: str = "") -> list[Passage]:
+        """Best ``limit`` passages for a question, in guide order (empty if none match)."""
+        scores = self.scores(question, exclude)
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: -scores[i])[:limit]
+        return [self.passages[i] for i in sorted(ranked)]
+
+
+@lru_cache(maxsize=256)
+def passage_index(text: str) -> PassageIndex:
+    """Passage index of a guide text (cached, so each guide version is split once)."""
+    return PassageIndex(split_passages(text))
+
+
+def select_passages(
+    text: Optional[str],
+    question: Optional[str],
+    subject: str = "",
+    limit: int = 3
+) -> tuple[Optional[str], int, int]:
+    """Relevant part of a guide for a question.
+
+    Words of ``subject`` (the component or pattern name) are ignored: every
+    passage of its guide is about it, so they don't tell passages apart.
+
+    Returns:
+        (text, passages shown, passages in the guide). The whole text is
+        returned when there is no question or no passage matches it.
+    """
+    if not text:
+        return text, 0, 0
+    index = passage_index(text)
+    total = len(index)
+    passages = index.top(question, limit, exclude=subject) if question else []
+    if not passages:
+        return text, total, total
+    return "\n\n".join(p.render() for p in passages), len(passages), total
@@ -0,0 +1,108 @@
+"""Text ranking shared by guide search and passage retrieval.
+
+One tokenizer (light Russian/English suffix stripping, a simplified
+Snowball stemmer) and one BM25 scorer, used by the full-text guide index
+(``fulltext.py``) and by passage selection inside a guide
+(``passages.py``), so both rank text the same way.
+"""
+import math
+import re
+from typing import Optional
+
+
+# Russian endings, longest first (a simplified Snowball stemmer):
+# adjective, participle, verb and noun endings. Fleeting vowels
+# ("модалок"/"модальные") are not handled.
+_RU_ENDINGS = sorted({
+    "ейшими", "ейшего", "ейшему", "ейшей", "ейший", "ейшая", "ейшее", "ейшие",
+    "ими", "ыми", "его", "ого", "ему", "ому", "иях", "иям", "иями", "ями", "ами",
+    "ией", "ием", "ии", "ию", "ость", "ости", "остью", "остей",
+    "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых",
+    "ую", "юю", "ая", "яя", "ою", "ею", "ях", "ах", "ям", "ам", "ов", "ев", "ью", "ия", "ья",
+    "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует", "уют", "ить",
+    "ыть", "ишь", "ят", "ит", "ыт", "ен", "ил", "ыл",
+    "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+}, key=len, reverse=True)
+_EN_ENDINGS = ["ations", "ation", "ings", "ing", "ness", "ies", "ed", "es", "ly", "s"]
+_MIN_STEM = 3
+
+# Function words, and question words that say nothing about the content
+# ("расскажи про ...", "есть что-то про ...")
+STOPWORDS = {
+    "и", "в", "во", "на", "с", "со", "по", "к", "ко", "о", "об", "от", "до", "из", "за",
+    "для", "не", "ни", "но", "а", "или", "что", "как", "это", "все", "так", "же", "ли",
+    "бы", "у", "при", "про", "есть", "если", "то", "его", "ее", "их", "мы", "вы", "он",
+    "она", "они", "там", "тут", "где", "чем", "нет", "мне", "нам", "вам", "можно",
+    "нужно", "надо", "какие", "какой", "какая", "когда", "чтобы", "расскажи", "покажи",
+    "подробнее", "гайд", "гайде",
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "is", "are", "be",
+    "with", "it", "this", "that", "by", "as", "at", "what", "how", "about", "there",
+    "can", "use", "tell", "show", "guide",
+}
+
+WORD = re.compile(r"[a-zа-яё0-9]+", re.IGNORECASE)
+_CYRILLIC = re.compile(r"[а-я]")
+
+
+def stem(word: str) -> str:
+    """Stem a lowercase Russian or English word."""
+    if _CYRILLIC.search(word):
+        for suffix in ("ся", "сь"):
+            if word.endswith(suffix) and len(word) - 2 >= _MIN_STEM:
+                word = word[:-2]
+                break
+        for ending in _RU_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+                return word[:-len(ending)]
+        return word
+    for ending in _EN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)] + ("y" if ending == "ies" else "")
+    return word
+
+
+def tokenize(text: str, prefix_length: Optional[int] = None) -> list[str]:
+    """Stemmed terms of a text, without stopwords and numbers.
+
+    ``prefix_length`` further cuts stems to their first letters, trading
+    precision for recall (inside one guide, "модалок" and "модальные" are
+    the same thing).
+    """
+    words = WORD.findall(text.lower().replace("ё", "е"))
+    terms = [stem(w) for w in words if w not in STOPWORDS and not w.isdigit()]
+    return [t[:prefix_length] for t in terms] if prefix_length else terms
+
+
+class BM25:
+    """BM25 scorer over tokenized documents."""
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, documents: list[list[str]]):
+        self._postings: dict[str, list[tuple[int, int]]] = {}  # term -> [(doc, tf)]
+        self._lengths = [len(terms) for terms in documents]
+        for doc_id, terms in enumerate(documents):
+            counts: dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def scores(self, terms: set[str]) -> dict[int, float]:
+        """Score of every document containing any of the terms."""
+        n = len(self._lengths)
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
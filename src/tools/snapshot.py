@@ -0,0 +1,96 @@
+"""Offline design system snapshot.
+
+``design_system_index.json`` holds what the tools need to answer common
+questions without calling Figma: per component, organism and pattern its
+node id, page id, guide text, property definitions and cover frame id,
+plus the version of every source file. The app loads it at startup and a
+background refresh rebuilds the files whose version changed.
+
+Format 1 (the original file) only lists names; it still loads, with
+entries that carry no data, so nothing is answered from it until
+``scripts/build_snapshot.py`` has been run (or the background refresh has
+rebuilt every file). Entries are only used while their file's version
+matches the live one.
+"""
+import json
+import os
+from typing import Optional
+
+from .fuzzy import normalize
+
+
+SNAPSHOT_FORMAT = 2
+KINDS = ("components", "organisms", "patterns")
+
+
+class Snapshot:
+    """Loaded snapshot with name lookups."""
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.format = data.get("format", 1)
+        self.built_at = data.get("built_at")
+        self.files: dict[str, dict] = data.get("files", {})  # file_key -> {"kind", "version"}
+        self.entries: dict[str, list[dict]] = {}
+        self._by_name: dict[tuple[str, str], dict] = {}  # (file key or kind, normalized name) -> entry
+        for kind in KINDS:
+            entries = [e if isinstance(e, dict) else {"name": e} for e in data.get(kind, [])]
+            self.entries[kind] = entries
+            for entry in entries:
+                if not entry.get("node_id"):
+                    continue
+                self._by_name.setdefault((entry.get("file_key") or kind, normalize(entry["name"])), entry)
+                self._by_name.setdefault((kind, normalize(entry["name"])), entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    def detailed(self) -> int:
+        """Number of entries with data (0 for a names-only snapshot)."""
+        return sum(1 for entries in self.entries.values() for e in entries if e.get("node_id"))
+
+    def names(self) -> dict[str, list[str]]:
+        """Names per kind (for the intent router)."""
+        return {kind: [e["name"] for e in entries] for kind, entries in self.entries.items()}
+
+    def version(self, file_key: str) -> Optional[str]:
+        """File version the snapshot entries of a file were built from."""
+        return (self.files.get(file_key) or {}).get("version")
+
+    def find(self, scope: str, name: str) -> Optional[dict]:
+        """Entry with data by exact (normalized) name.
+
+        Args:
+            scope: File key, or a kind ("components", "organisms", "patterns")
+            name: Component or pattern name
+        """
+        return self._by_name.get((scope, normalize(name)))
+
+    def replace(self, kind: str, file_key: str, version: Optional[str], entries: list[dict]) -> "Snapshot":
+        """New snapshot with one file's entries rebuilt."""
+        data = self.to_dict()
+        data[kind] = [e for e in data[kind] if e.get("file_key") != file_key and e.get("node_id")] + entries
+        data["files"] = {**self.files, file_key: {"kind": kind, "version": version}}
+        data["format"] = SNAPSHOT_FORMAT
+        return Snapshot(data)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": self.format,
+            "built_at": self.built_at,
+            "files": self.files,
+            **{kind: self.entries[kind] for kind in KINDS},
+        }
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: str):
+        """Write the snapshot atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,141 @@
+"""Local vector similarity search.
+
+Texts are embedded as TF-IDF vectors over hashed character n-grams
+(3-4 letters within word boundaries), so "модалка" is close to
+"модальное окно" and typos still overlap, without any external model or
+network. Vectors are L2-normalized and stored column-compressed in NumPy
+arrays (a dense matrix over 2^20 hash buckets would not fit in memory);
+a batch of queries is scored against all rows at once with one
+``bincount``, and top-k is picked with ``argpartition``.
+"""
+import math
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+
+NGRAM_SIZES = (3, 4)
+HASH_BITS = 20
+
+
+def ngrams(text: str) -> list[str]:
+    """Character n-grams of each word, padded with spaces at word boundaries."""
+    grams = []
+    for word in text.lower().replace("ё", "е").split():
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            grams.extend(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return grams
+
+
+class VectorIndex:
+    """Cosine-similarity index over hashed char n-gram TF-IDF vectors.
+
+    ``items`` are dicts describing what each text is (kind, name, ids);
+    search results are those dicts with a "score". Hashing uses Python's
+    ``hash``, so an index is only valid within the process that built it.
+    """
+
+    def __init__(self, texts: list[str], items: list[dict], hash_bits: int = HASH_BITS):
+        if len(texts) != len(items):
+            raise ValueError("texts and items must have the same length")
+        self.items = items
+        self._mask = (1 << hash_bits) - 1
+        self._n = len(texts)
+
+        # Sparse term frequencies as (row, bucket) pairs
+        rows, buckets, counts = [], [], []
+        for row, text in enumerate(texts):
+            tf = self._term_counts(text)
+            rows.append(np.full(len(tf), row, dtype=np.int32))
+            buckets.extend(tf.keys())
+            counts.extend(tf.values())
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        buckets = np.asarray(buckets, dtype=np.int64)
+        values = 1.0 + np.log(np.asarray(counts, dtype=np.float32))  # Sublinear tf
+
+        # Smoothed idf per bucket
+        df = np.bincount(buckets, minlength=self._mask + 1).astype(np.float32)
+        self._idf = (np.log((1.0 + self._n) / (1.0 + df)) + 1.0).astype(np.float32)
+        values *= self._idf[buckets]
+
+        # L2-normalize rows
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=self._n))
+        norms[norms == 0] = 1.0
+        values /= norms[rows].astype(np.float32)
+
+        # Column-compressed layout: rows of each bucket are contiguous
+        order = np.argsort(buckets, kind="stable")
+        self._rows = rows[order]
+        self._values = values[order]
+        self._col_ptr = np.zeros(self._mask + 2, dtype=np.int64)
+        np.cumsum(np.bincount(buckets, minlength=self._mask + 1), out=self._col_ptr[1:])
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _term_counts(self, text: str) -> Counter:
+        """Occurrences of each hash bucket in a text."""
+        return Counter(hash(gram) & self._mask for gram in ngrams(text))
+
+    def _query_vector(self, text: str) -> dict[int, float]:
+        tf = self._term_counts(text)
+        weights = {b: (1.0 + math.log(c)) * float(self._idf[b]) for b, c in tf.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {b: w / norm for b, w in weights.items()}
+
+    def scores(self, queries: list[str]) -> np.ndarray:
+        """Cosine similarity of each query to every row, shape (queries, rows)."""
+        segments_rows, segments_weights = [], []
+        for qi, query in enumerate(queries):
+            for bucket, weight in self._query_vector(query).items():
+                start, end = self._col_ptr[bucket], self._col_ptr[bucket + 1]
+                if start == end:
+                    continue
+                segments_rows.append(self._rows[start:end] + qi * self._n)
+                segments_weights.append(self._values[start:end] * weight)
+        if not segments_rows:
+            return np.zeros((len(queries), self._n), dtype=np.float64)
+        flat = np.bincount(
+            np.concatenate(segments_rows),
+            weights=np.concatenate(segments_weights),
+            minlength=len(queries) * self._n
+        )
+        return flat.reshape(len(queries), self._n)
+
+    def search_batch(
+        self,
+        queries: list[str],
+        limit: int = 10,
+        min_score: float = 0.1,
+        kinds: Optional[set[str]] = None
+    ) -> list[list[dict]]:
+        """Top ``limit`` items per query with cosine similarity >= ``min_score``."""
+        if not self._n or not queries:
+            return [[] for _ in queries]
+        matrix = self.scores(queries)
+        if kinds is not None:
+            allowed = np.array([item.get("kind") in kinds for item in self.items])
+            matrix[:, ~allowed] = 0.0
+
+        results = []
+        k = min(limit, self._n)
+        for row in matrix:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top], kind="stable")]
+            results.append([
+                {**self.items[i], "score": round(float(row[i]), 3)}
+                for i in top if row[i] >= min_score
+            ])
+        return results
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_score: float = 0.1,
+        kinds: Optional[set[str]] = None
+    ) -> list[dict]:
+        """Top ``limit`` items for one query."""
+        return self.search_batch([query], limit, min_score, kinds)[0]
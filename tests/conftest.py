@@ -0,0 +1,189 @@
+"""Shared fixtures: a Figma API client backed by an in-process transport."""
+from typing import Optional, Sequence
+
+import httpx
+import pytest
+
+from src.figma_api import batching, client
+
+
+@pytest.fixture
+def figma(monkeypatch):
+    """Route Figma requests to a handler set with ``figma.handler = ...``.
+
+    Rate limits are lifted, caching and retries are off, and every
+    process-wide singleton starts fresh. Requests made are recorded in
+    ``figma.requests``.
+    """
+    monkeypatch.setenv("FIGMA_API_KEY", "test-token")
+    monkeypatch.setenv("FIGMA_CACHE", "0")
+    monkeypatch.setenv("FIGMA_MAX_RETRIES", "0")
+    monkeypatch.setenv("FIGMA_BATCH_WINDOW_MS", "5")
+    for tier in (1, 2, 3):
+        monkeypatch.setenv(f"FIGMA_RATE_TIER{tier}_RPM", "100000")
+    for name in ("_config", "_http_client", "_scheduler", "_response_cache", "_image_cache", "_version_tracker"):
+        monkeypatch.setattr(client, name, None)
+    monkeypatch.setattr(client, "_inflight", {})
+    monkeypatch.setattr(batching, "_image_batcher", None)
+    monkeypatch.setattr(batching, "_node_loader", None)
+
+    class Figma:
+        handler = None
+        requests: list[httpx.Request] = []
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        Figma.requests.append(request)
+        return Figma.handler(request)
+
+    client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+    yield Figma
+
+
+def _cut(node: dict, depth: Optional[int]) -> dict:
+    """Copy of a node with ``depth`` levels of children (all when None)."""
+    if depth is None:
+        return node
+    node = dict(node)
+    if depth <= 0:
+        node.pop("children", None)
+    elif "children" in node:
+        node["children"] = [_cut(child, depth - 1) for child in node["children"]]
+    return node
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("children", []):
+        yield from _walk(child)
+
+
+class FigmaFiles:
+    """In-memory Figma: file trees and component lists served like the REST API.
+
+    Ids in ``invalid_ids`` make ``/nodes`` and ``/images`` requests fail
+    with 400, like malformed ids do on Figma.
+    """
+
+    def __init__(self):
+        self.files: dict[str, dict] = {}
+        self.invalid_ids: set[str] = set()
+
+    def add(self, file_key: str, document: dict, components: Sequence[dict] = (), version: str = "1"):
+        self.files[file_key] = {"document": document, "components": list(components), "version": version}
+
+    def set_version(self, file_key: str, version: str):
+        self.files[file_key]["version"] = version
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "s3.test":
+            return httpx.Response(200, content=f"PNG {request.url.path}".encode())
+        parts = request.url.path.split("/")[2:]  # Drop "", "v1"
+        params = request.url.params
+        file = self.files.get(parts[1]) if len(parts) > 1 else None
+        if file is None:
+            return httpx.Response(404, text="Not found")
+        ids = params["ids"].split(",") if "ids" in params else []
+        if self.invalid_ids.intersection(ids):
+            return httpx.Response(400, text="Invalid node ids")
+        nodes = {node["id"]: node for node in _walk(file["document"])}
+        depth = int(params["depth"]) if "depth" in params else None
+        head = {"name": parts[1], "version": file["version"]}
+
+        if parts[0] == "images":
+            return httpx.Response(200, json={
+                "images": {i: f"https://s3.test/{parts[1]}/{i}.png" if i in nodes else None for i in ids},
+            })
+        if parts[2:] == []:
+            return httpx.Response(200, json={**head, "document": _cut(file["document"], depth)})
+        if parts[2:] == ["meta"]:
+            return httpx.Response(200, json={"file": {"version": file["version"], "last_touched_at": "2026-01-01"}})
+        if parts[2:] == ["components"]:
+            return httpx.Response(200, json={"meta": {"components": file["components"]}})
+        if parts[2:] == ["nodes"]:
+            return httpx.Response(200, json={**head, "nodes": {
+                i: {"document": _cut(nodes[i], depth)} if i in nodes else None for i in ids
+            }})
+        return httpx.Response(404, text="Not found")
+
+
+def text(node_id: str, characters: str) -> dict:
+    return {"id": node_id, "type": "TEXT", "name": characters[:20], "characters": characters}
+
+
+def component(node_id: str, name: str, frame_id: Optional[str], frame_name: Optional[str], page_id: str) -> dict:
+    """Entry of the ``/components`` list (no frame for components placed on the page)."""
+    frame = {"name": frame_name, "nodeId": frame_id} if frame_id else {}
+    return {"node_id": node_id, "name": name, "containing_frame": {**frame, "pageId": page_id}}
+
+
+# A small UI kit: two pages, each with a cover frame, a component set and
+# its guide frame
+UI_KIT = {"id": "0:0", "type": "DOCUMENT", "name": "Document", "children": [
+    {"id": "1:0", "type": "CANVAS", "name": "Buttons", "children": [
+        {"id": "1:1", "type": "FRAME", "name": "Button", "children": []},
+        {"id": "1:10", "type": "COMPONENT_SET", "name": "Button", "componentPropertyDefinitions": {
+            "Size": {"type": "VARIANT", "variantOptions": ["S", "M"], "defaultValue": "M"},
+            "Disabled": {"type": "BOOLEAN", "defaultValue": False},
+        }, "children": [
+            {"id": "1:11", "type": "COMPONENT", "name": "Size=S"},
+            {"id": "1:12", "type": "COMPONENT", "name": "Size=M"},
+        ]},
+        {"id": "1:20", "type": "FRAME", "name": "Button / Guide", "children": [
+            text("1:21", "Use one primary button per screen."),
+            {"id": "1:22", "type": "FRAME", "name": "Rules", "children": [
+                text("1:23", "Keep button labels short."),
+            ]},
+        ]},
+    ]},
+    {"id": "2:0", "type": "CANVAS", "name": "Inputs", "children": [
+        {"id": "2:1", "type": "SECTION", "name": "Forms", "children": [
+            {"id": "2:2", "type": "FRAME", "name": "Checkbox", "children": []},
+        ]},
+        {"id": "2:10", "type": "COMPONENT_SET", "name": "Checkbox", "children": [
+            {"id": "2:11", "type": "COMPONENT", "name": "State=On"},
+            {"id": "2:12", "type": "COMPONENT", "name": "State=Off"},
+        ]},
+        {"id": "2:20", "type": "FRAME", "name": "Checkbox / Guide", "children": [
+            text("2:21", "Checkboxes select several options."),
+        ]},
+        {"id": "2:30", "type": "COMPONENT", "name": "Link Cell"},
+    ]},
+]}
+
+UI_KIT_COMPONENTS = [
+    component("1:11", "Size=S", "1:10", "Button", "1:0"),
+    component("1:12", "Size=M", "1:10", "Button", "1:0"),
+    component("2:11", "State=On", "2:10", "Checkbox", "2:0"),
+    component("2:12", "State=Off", "2:10", "Checkbox", "2:0"),
+    component("2:30", "Link Cell", None, None, "2:0"),
+]
+
+
+@pytest.fixture
+def files(figma):
+    """In-memory Figma files; the UI kit is served under ``FIGMA_UI_KIT_KEY``."""
+    from tools import figma_tools
+
+    server = FigmaFiles()
+    server.add(figma_tools.FIGMA_UI_KIT_KEY, UI_KIT, UI_KIT_COMPONENTS)
+    figma.handler = server
+    return server
+
+
+@pytest.fixture
+def tools(files, monkeypatch, tmp_path):
+    """The figma_tools module with its per-process indexes reset."""
+    from tools import figma_tools
+    from tools.snapshot import Snapshot
+
+    monkeypatch.chdir(tmp_path)  # Tools write figma_debug.log to the cwd
+    for name in ("_catalogs", "_guide_indexes", "_guide_refreshes", "_guide_texts", "_page_indexes"):
+        monkeypatch.setattr(figma_tools, name, {})
+    monkeypatch.setattr(figma_tools, "_patterns", None)
+    monkeypatch.setattr(figma_tools, "_pattern_fuzzy", ((), None))
+    monkeypatch.setattr(figma_tools, "_fulltext", None)
+    monkeypatch.setattr(figma_tools, "_fulltext_refresh", None)
+    monkeypatch.setattr(figma_tools, "_vector_index", (None, None))
+    monkeypatch.setattr(figma_tools, "_snapshot", Snapshot())
+    monkeypatch.setattr(figma_tools, "_snapshot_refresh", None)
+    return figma_tools
@@ -0,0 +1,113 @@
+"""Request batching: id splitting, dedup and image render batches."""
+import asyncio
+from urllib.parse import quote
+
+import httpx
+import pytest
+
+from src.figma_api.batching import Batcher, ImageRenderBatcher, split_ids
+from src.figma_api.client import FigmaAPIError
+
+
+class RecordingBatcher(Batcher):
+    """Echoes ids back and records each batch."""
+
+    def __init__(self, **kwargs):
+        super().__init__(window=0.005, **kwargs)
+        self.batches = []
+
+    async def fetch(self, group, ids):
+        self.batches.append((group, list(ids)))
+        if "fail" in ids:
+            raise RuntimeError("batch failed")
+        return {i: f"{group}:{i}" for i in ids if i != "missing"}
+
+
+def test_split_ids_fits_encoded_length():
+    ids = [f"{i}:{i * 7}" for i in range(500)]
+    chunks = split_ids(ids, max_length=200)
+    assert [i for chunk in chunks for i in chunk] == ids
+    assert all(len(quote(",".join(chunk), safe="")) <= 200 for chunk in chunks)
+
+
+def test_split_ids_keeps_oversized_id_alone():
+    assert split_ids(["a" * 50, "b"], max_length=10) == [["a" * 50], ["b"]]
+
+
+def test_batcher_is_abstract():
+    with pytest.raises(TypeError):
+        Batcher()
+
+
+async def test_concurrent_loads_share_one_batch():
+    batcher = RecordingBatcher()
+    results = await asyncio.gather(
+        batcher.load("f", "1:1"), batcher.load("f", "1:2"), batcher.load("f", "1:1"), batcher.load("g", "1:1")
+    )
+    assert results == ["f:1:1", "f:1:2", "f:1:1", "g:1:1"]
+    assert sorted(batcher.batches) == [("f", ["1:1", "1:2"]), ("g", ["1:1"])]
+    assert batcher.stats() == {"requests": 4, "batches": 2, "ids": 3}
+
+
+async def test_batch_is_split_by_length():
+    batcher = RecordingBatcher(max_ids_length=len("1%3A1%2C1%3A2"))  # Two ids per batch
+    await batcher.load_many("f", ["1:1", "1:2", "1:3", "1:4"])
+    assert [ids for _, ids in batcher.batches] == [["1:1", "1:2"], ["1:3", "1:4"]]
+
+
+async def test_missing_ids_and_failures():
+    batcher = RecordingBatcher()
+    assert await batcher.load("f", "missing") is None
+    with pytest.raises(RuntimeError):
+        await asyncio.gather(batcher.load("f", "1:1"), batcher.load("f", "fail"))
+
+
+async def test_image_batch_splits_on_bad_id(figma):
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        if "bad" in ids:
+            return httpx.Response(400, text="Invalid node id")
+        return httpx.Response(200, json={"images": {i: f"https://s3/{i}.png" for i in ids}})
+    figma.handler = handler
+
+    result = await ImageRenderBatcher().fetch(("KEY", 2, "png"), ["1:1", "bad", "1:2"])
+    assert result == {"1:1": "https://s3/1:1.png", "1:2": "https://s3/1:2.png"}
+    assert len(figma.requests) == 4
+
+
+async def test_image_batch_raises_server_errors(figma):
+    figma.handler = lambda request: httpx.Response(503, text="Unavailable")
+    with pytest.raises(FigmaAPIError, match="HTTP 503"):
+        await ImageRenderBatcher().fetch(("KEY", 2, "png"), ["1:1", "1:2"])
+    assert len(figma.requests) == 1
+
+
+async def test_tools_answer_without_previews_when_renders_fail(tools, files, figma):
+    def handler(request):
+        if request.url.path.startswith("/v1/images/"):
+            return httpx.Response(429, headers={"Retry-After": "0"}, text="Rate limited")
+        return files(request)
+    figma.handler = handler
+
+    assert await tools.get_node_image(tools.FIGMA_UI_KIT_KEY, "1:1") is None
+    result = await tools.get_variant_image("Button", "size s")
+    assert result == {"variant_name": "Size=S", "image_url": None, "description_match_score": 2}
+
+
+async def test_unreachable_renders_mean_no_preview(tools, files, figma):
+    def handler(request):
+        if request.url.path.startswith("/v1/images/"):
+            raise httpx.ConnectError("Connection refused", request=request)
+        return files(request)
+    figma.handler = handler
+
+    assert await tools.get_node_image(tools.FIGMA_UI_KIT_KEY, "1:1") is None
+
+
+async def test_invalid_ids_fail_their_batch_instead_of_hanging():
+    batcher = RecordingBatcher()
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.load("f", None), batcher.load("f", "1:1"), return_exceptions=True), timeout=1
+    )
+    assert all(isinstance(result, TypeError) for result in results)
+    assert await batcher.load("f", "1:1") == "f:1:1"  # Later batches are unaffected
@@ -0,0 +1,66 @@
+"""Component catalog indexes and their per-version reuse."""
+from tools.catalog import ComponentCatalog
+
+from conftest import UI_KIT_COMPONENTS, component
+
+
+def _ids(components: list[dict]) -> list[str]:
+    return [c["node_id"] for c in components]
+
+
+def test_indexes():
+    catalog = ComponentCatalog(UI_KIT_COMPONENTS, version="1")
+    assert len(catalog) == 5
+    assert catalog.get("2:11")["name"] == "State=On"
+    assert catalog.get("9:9") is None
+    assert catalog.position(catalog.get("2:11")) == 2
+    assert _ids(catalog.by_frame(" button ")) == ["1:11", "1:12"]
+    assert _ids(catalog.by_name("LINK CELL")) == ["2:30"]
+    assert _ids(catalog.by_page("2:0")) == ["2:11", "2:12", "2:30"]
+    assert _ids(catalog.frame_members("Checkbox")) == ["2:11", "2:12"]
+    assert catalog.frame_members("checkbox") == []
+
+
+def test_prefix_and_substring_lookups_keep_list_order():
+    components = [
+        component("1:1", "Tab", "1:0", "Tab Bar", "0:1"),
+        component("1:2", "Table Row", "1:5", "Table", "0:1"),
+        component("1:3", "Tab Item", "1:0", "Tab Bar", "0:1"),
+        component("1:4", "Stable", "1:6", "Misc", "0:1"),
+    ]
+    catalog = ComponentCatalog(components)
+    assert _ids(catalog.names_starting_with("TAB")) == ["1:1", "1:2", "1:3"]
+    assert _ids(catalog.frames_starting_with("tab b")) == ["1:1", "1:3"]
+    assert _ids(catalog.names_containing("table")) == ["1:2", "1:4"]
+    assert catalog.names_starting_with("zzz") == []
+
+
+async def test_catalog_is_reused_while_the_version_holds(tools, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+    catalog = await tools.get_component_catalog(key)
+    assert catalog.version == "1" and len(catalog) == 5
+    assert await tools.get_component_catalog(key) is catalog
+    await tools.search_components("Button", key)
+    await tools.get_component_variants(key, "Checkbox")
+    assert await tools.get_component_info(key, "link") == catalog.get("2:30")
+    assert sum(r.url.path.endswith("/components") for r in figma.requests) == 1
+
+
+async def test_catalog_is_rebuilt_for_a_new_version(tools, files, figma):
+    from src.figma_api import client
+
+    key = tools.FIGMA_UI_KIT_KEY
+    first = await tools.get_component_catalog(key)
+    files.set_version(key, "2")
+    client.get_version_tracker().invalidate(key)
+    second = await tools.get_component_catalog(key)
+    assert second is not first and second.version == "2"
+    assert sum(r.url.path.endswith("/components") for r in figma.requests) == 2
+
+
+async def test_component_variants(tools):
+    key = tools.FIGMA_UI_KIT_KEY
+    assert _ids(await tools.get_component_variants(key, "button")) == ["1:11", "1:12"]
+    assert _ids(await tools.get_component_variants(key, "Check")) == ["2:11", "2:12"]
+    assert _ids(await tools.get_component_variants(key, "State=On")) == ["2:11", "2:12"]
+    assert await tools.get_component_variants(key, "Slider") == []
@@ -0,0 +1,59 @@
+"""Single-flight coalescing of identical in-flight GETs."""
+import asyncio
+
+import httpx
+
+from src.figma_api.client import figma_get
+
+
+def _slow(payload: dict, delay: float = 0.05):
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=payload)
+    return handler
+
+
+async def test_identical_gets_share_one_request(figma):
+    figma.handler = _slow({"name": "Kit"})
+    results = await asyncio.gather(*(figma_get("/files/KEY/comments") for _ in range(5)))
+    assert len(figma.requests) == 1
+    assert all(result is results[0] for result in results)
+
+
+async def test_params_are_part_of_the_identity(figma):
+    figma.handler = _slow({"name": "Kit"})
+    await asyncio.gather(
+        figma_get("/files/KEY/comments", params={"as_md": True}),
+        figma_get("/files/KEY/comments", params={"as_md": True}),
+        figma_get("/files/KEY/comments"),
+        figma_get("/files/OTHER/comments"),
+    )
+    assert len(figma.requests) == 3
+
+
+async def test_finished_requests_are_not_reused(figma):
+    figma.handler = _slow({"name": "Kit"}, delay=0)
+    await figma_get("/files/KEY/comments")
+    await figma_get("/files/KEY/comments")
+    assert len(figma.requests) == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_others(figma):
+    figma.handler = _slow({"name": "Kit"})
+    first = asyncio.create_task(figma_get("/files/KEY/comments"))
+    second = asyncio.create_task(figma_get("/files/KEY/comments"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == {"name": "Kit"}
+    assert first.cancelled()
+    assert len(figma.requests) == 1
+
+
+async def test_errors_are_shared(figma):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(403, text="Forbidden")
+    figma.handler = handler
+    results = await asyncio.gather(figma_get("/files/KEY/comments"), figma_get("/files/KEY/comments"))
+    assert [r["error"] for r in results] == ["HTTP 403: Forbidden"] * 2
+    assert len(figma.requests) == 1
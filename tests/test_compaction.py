@@ -0,0 +1,72 @@
+"""Tool-result compaction."""
+from agent.compaction import TOOL_BUDGETS, compact_result, dedupe_lines, encode_props, estimate_tokens
+
+
+DEFINITIONS = {
+    "Size": {"type": "VARIANT", "variantOptions": ["S", "M", "L"], "defaultValue": "M"},
+    "Disabled#12:0": {"type": "BOOLEAN", "defaultValue": False},
+    "Label#12:1": {"type": "TEXT", "defaultValue": "Кнопка"},
+    "Icon#12:2": {"type": "INSTANCE_SWAP", "defaultValue": "1:23"},
+    "Slot#12:3": {"type": "SLOT"},
+}
+
+
+def test_encode_props_keeps_defaults():
+    assert encode_props(DEFINITIONS).splitlines() == [
+        "Size: S|M|L = M",
+        "Disabled: bool = false",
+        'Label: text = "Кнопка"',
+        "Icon: instance = 1:23",
+    ]
+
+
+def test_encode_props_without_defaults():
+    assert encode_props({"Size": {"type": "VARIANT", "variantOptions": ["S", "M"]}}) == "Size: S|M"
+
+
+def test_dedupe_lines():
+    assert dedupe_lines("Title\n\n\n\nRule\nTitle\nRule\n\nEnd") == "Title\n\nRule\n\nEnd"
+
+
+def test_strips_debug_fields_and_encodes_props():
+    result = {
+        "found_name": "Button",
+        "props": {"definitions": DEFINITIONS, "summary": "Size: S|M|L"},
+        "_debug_info": {"page_id": "0:1"},
+    }
+    compacted, report = compact_result("get_design_component_details", result)
+    assert "_debug_info" not in compacted
+    assert compacted["props"].startswith("Size: S|M|L = M")
+    assert report.tokens_after < report.tokens_before
+    assert report.saved == report.tokens_before - report.tokens_after
+
+
+def test_debug_mode_keeps_debug_fields():
+    compacted, _ = compact_result("get_design_component_details", {"_debug_info": {"page_id": "0:1"}}, debug=True)
+    assert compacted == {"_debug_info": {"page_id": "0:1"}}
+
+
+def test_fits_the_tool_budget():
+    result = {
+        "name": "Валидация",
+        "guide": "\n".join(f"Правило {i}: " + "текст " * 30 for i in range(100)),
+        "examples": [f"Example {i}" for i in range(200)],
+    }
+    compacted, report = compact_result("get_design_pattern_info", result)
+    assert report.tokens_after <= TOOL_BUDGETS["get_design_pattern_info"]
+    assert compacted["name"] == "Валидация"
+    assert compacted["guide"].endswith("…")
+    assert compacted["examples"][0] == "Example 0"
+
+
+def test_does_not_modify_the_result():
+    result = {"guide": "x" * 20000, "_debug_info": {}}
+    compact_result("get_design_component_details", result)
+    assert len(result["guide"]) == 20000 and "_debug_info" in result
+
+
+def test_small_results_are_unchanged():
+    result = {"count": 2, "items": ["Button", "Input"]}
+    compacted, report = compact_result("search_design_system_tool", result)
+    assert compacted == result
+    assert report.tokens_after == estimate_tokens(result)
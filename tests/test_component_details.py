@@ -0,0 +1,72 @@
+"""get_component_details: one concurrent plan over search, variants, guide, props and cover."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.figma_api.client import FigmaAPIError
+
+
+async def test_full_result(tools):
+    key = tools.FIGMA_UI_KIT_KEY
+    result = await tools.get_component_details(key, "Button")
+    assert result["found_name"] == "Button"
+    assert result["variants_count"] == 2
+    assert result["guide"].startswith("Use one primary button per screen.")
+    assert result["image_url"] == f"https://s3.test/{key}/1:1.png"
+    assert result["figma_link"] == tools.generate_figma_link(key, "1:10")
+    assert set(result["props"]["definitions"]) == {"Size", "Disabled"}
+    assert result["_debug_info"]["image_found_via"] == "cover"
+    assert result["_debug_info"]["page_id"] == "1:0"
+
+
+async def test_typos_are_corrected(tools):
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Chekbox")
+    assert result["found_name"] == "Checkbox"
+    assert result["guide"] == "Checkboxes select several options."
+
+
+async def test_unknown_component(tools):
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Slider")
+    assert "error" in result
+
+
+async def test_independent_steps_run_together(tools, files, figma):
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return files(request)
+    figma.handler = handler
+
+    await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Button")
+    assert peak >= 3
+    # The cover is rendered once
+    assert sum(r.url.path.startswith("/v1/images/") for r in figma.requests) == 1
+
+
+async def test_optional_step_failure_keeps_the_answer(tools, files, figma):
+    def handler(request):
+        if request.url.path.startswith("/v1/images/"):
+            return httpx.Response(503, text="Service unavailable")
+        return files(request)
+    figma.handler = handler
+
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Button")
+    assert result["image_url"] is None
+    assert result["guide"].startswith("Use one primary button per screen.")
+
+
+async def test_required_step_failure_raises(tools, files, figma):
+    def handler(request):
+        if request.url.path == f"/v1/files/{tools.FIGMA_UI_KIT_KEY}":
+            return httpx.Response(500, text="Internal error")  # The guide index fetch
+        return files(request)
+    figma.handler = handler
+
+    with pytest.raises(FigmaAPIError):
+        await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Button")
@@ -0,0 +1,74 @@
+"""Figma rate-limit scheduler: token buckets and priority lanes."""
+import asyncio
+import time
+
+from src.figma_api.client import FigmaScheduler, TokenBucket, endpoint_tier
+from src.figma_api.priority import Lane, Priority
+
+
+def test_bucket_hands_out_capacity_then_waits():
+    bucket = TokenBucket(rate_per_minute=120, capacity=2)
+    assert bucket.try_take() == 0
+    assert bucket.try_take() == 0
+    wait = bucket.try_take()
+    assert 0 < wait <= 0.5  # One token every 0.5s
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)
+    assert bucket.try_take() == 0
+    bucket.updated -= 1.0  # A second has passed
+    assert bucket.try_take() == 0
+
+
+def test_paused_bucket_blocks_then_allows_one_probe():
+    bucket = TokenBucket(rate_per_minute=600)
+    bucket.pause(5)
+    assert bucket.try_take() > 4
+    bucket.blocked_until = bucket.updated = time.monotonic()  # The pause is over
+    assert bucket.try_take() == 0
+    assert bucket.try_take() > 0
+
+
+def test_endpoint_tiers():
+    assert endpoint_tier("/files/abc") == 1
+    assert endpoint_tier("/files/abc/nodes") == 1
+    assert endpoint_tier("/images/abc") == 1
+    assert endpoint_tier("/files/abc/meta") == 3
+    assert endpoint_tier("/files/abc/components") == 3
+    assert endpoint_tier("/files/abc/comments") == 2
+
+
+async def test_interactive_requests_go_first():
+    scheduler = FigmaScheduler({1: 600})  # A token every 0.1s
+    scheduler._buckets[1].tokens = 0
+    order = []
+
+    async def request(name: str, priority: Priority):
+        await scheduler.acquire(1, priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(request("bg1", Priority.BACKGROUND)),
+             asyncio.create_task(request("bg2", Priority.BACKGROUND))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(request("chat", Priority.INTERACTIVE)))
+    await asyncio.gather(*tasks)
+    assert order == ["chat", "bg1", "bg2"]
+
+
+async def test_raised_lane_requeues_waiting_request():
+    scheduler = FigmaScheduler({1: 600})
+    scheduler._buckets[1].tokens = 0
+    order = []
+    lane = Lane(Priority.BACKGROUND)
+
+    async def request(name: str, priority: Priority, lane=None):
+        await scheduler.acquire(1, priority, lane)
+        order.append(name)
+
+    tasks = [asyncio.create_task(request("bg", Priority.BACKGROUND)),
+             asyncio.create_task(request("shared", Priority.BACKGROUND, lane))]
+    await asyncio.sleep(0)
+    lane.raise_to(Priority.INTERACTIVE)
+    await asyncio.gather(*tasks)
+    assert order == ["shared", "bg"]
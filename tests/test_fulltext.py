@@ -0,0 +1,88 @@
+"""Full-text guide index and its use in search_design_system."""
+import pytest
+
+from tools.fulltext import FullTextIndex, snippet
+from tools.ranking import tokenize
+
+
+def _doc(name: str, text: str, file_key: str = "KIT", kind: str = "component") -> dict:
+    return {"file_key": file_key, "kind": kind, "name": name, "node_id": f"{name}:1", "text": text}
+
+
+DOCUMENTS = [
+    _doc("Modal", "Модальное окно прерывает сценарий.\nВысота модального окна не больше 80% экрана."),
+    _doc("Button", "Одна основная кнопка на экран.\nВысота кнопки 48 px."),
+    _doc("Валидация", "Ошибки показываются под полем после отправки формы.", file_key="PATTERNS", kind="pattern"),
+]
+
+
+def test_search_ranks_and_adds_snippets():
+    index = FullTextIndex(DOCUMENTS, {"KIT": "1", "PATTERNS": "3"})
+    results = index.search("высота модальных окон")
+    assert [r["name"] for r in results] == ["Modal", "Button"]
+    assert results[0]["snippet"] == "Высота модального окна не больше 80% экрана."
+    assert results[0]["score"] > results[1]["score"]
+    assert "text" not in results[0]
+    assert [r["name"] for r in index.search("ошибки формы")] == ["Валидация"]
+    assert index.search("таблица") == []
+
+
+def test_snippet_is_cut_around_the_match():
+    line = "Вступление. " * 40 + "Высота модального окна зависит от контента. " + "Хвост. " * 40
+    cut = snippet(line, set(tokenize("высота")), width=100)
+    assert cut.startswith("…") and cut.endswith("…")
+    assert "Высота модального окна" in cut
+    assert snippet("Первая строка\nВторая", set(tokenize("таблица"))) == "Первая строка"
+
+
+def test_replace_file_keeps_other_files():
+    index = FullTextIndex(DOCUMENTS, {"KIT": "1", "PATTERNS": "3"})
+    replaced = index.replace_file("KIT", "2", [_doc("Chip", "Чипы фильтруют список.")])
+    assert [d["name"] for d in replaced.documents] == ["Валидация", "Chip"]
+    assert replaced.versions == {"KIT": "2", "PATTERNS": "3"}
+    assert [r["name"] for r in replaced.search("фильтр")] == ["Chip"]
+    assert len(index) == 3  # The original index is unchanged
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "fulltext" / "index.json"
+    FullTextIndex(DOCUMENTS, {"KIT": "1"}).save(str(path))
+    loaded = FullTextIndex.load(str(path))
+    assert loaded.versions == {"KIT": "1"}
+    assert [r["name"] for r in loaded.search("кнопка")] == ["Button"]
+
+
+@pytest.fixture
+def design_system(tools, files):
+    """The UI kit plus empty organisms and patterns files."""
+    files.add(tools.FILE_KEYS["organisms"], {"id": "0:0", "type": "DOCUMENT", "children": []})
+    files.add(tools.FIGMA_PATTERNS_KEY, {"id": "0:0", "type": "DOCUMENT", "children": [
+        {"id": "5:0", "type": "CANVAS", "name": "Формы", "children": [
+            {"id": "5:1", "type": "TEXT", "name": "t", "characters": "Чекбоксы в формах выравниваются по левому краю."},
+        ]},
+    ]})
+    return tools
+
+
+async def test_documents_are_built_from_guide_frames(design_system):
+    tools = design_system
+    version, documents = await tools.build_fulltext_documents(tools.FIGMA_UI_KIT_KEY)
+    assert version == "1"
+    assert [(d["name"], d["node_id"]) for d in documents] == [("Button", "1:20"), ("Checkbox", "2:20")]
+    assert documents[1]["text"] == "Checkboxes select several options."
+    version, documents = await tools.build_fulltext_documents(tools.FIGMA_PATTERNS_KEY)
+    assert [(d["name"], d["kind"]) for d in documents] == [("Формы", "pattern")]
+
+
+async def test_search_design_system_merges_guide_matches(design_system, monkeypatch):
+    tools = design_system
+    monkeypatch.setattr(tools, "_fulltext", await tools.build_fulltext_index())
+
+    results = await tools.search_design_system("чекбоксы")
+    assert [(r["name"], r["source"]) for r in results] == [("Формы", "patterns")]
+    assert results[0]["snippet"] == "Чекбоксы в формах выравниваются по левому краю."
+
+    results = await tools.search_design_system("Checkbox")
+    checkbox = next(r for r in results if r["name"] == "Checkbox")
+    assert checkbox["source"] == "ui-kit" and checkbox["snippet"] == "Checkboxes select several options."
+    assert tools._fulltext_refresh is None  # Every file is indexed at its current version
@@ -0,0 +1,78 @@
+"""Typo-tolerant name lookup."""
+import pytest
+
+from tools.catalog import ComponentCatalog
+from tools.fuzzy import FuzzyIndex, edit_distance, normalize
+
+from conftest import UI_KIT_COMPONENTS
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("button", "button", 0),
+    ("buton", "button", 1),
+    ("chekbox", "checkbox", 1),
+    ("chcekbox", "checkbox", 1),  # Transposition
+    ("btn", "button", 3),         # Capped at max_distance + 1
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, max_distance=2) == distance
+
+
+def test_normalize():
+    assert normalize("Tab-Bar / Ёлка_1") == "tabbarелка1"
+
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex()
+    for name in ("Button", "Checkbox", "Link Cell", "Навигация по экранам"):
+        index.add(name)
+    index.add("Buttons", priority=1)
+    return index
+
+
+def test_lookup_ranks_by_distance_then_priority(index):
+    assert index.lookup("Buton") == [(1, "Button"), (2, "Buttons")]
+    assert index.best("Chekbox") == "Checkbox"
+    assert index.best("linkcel") == "Link Cell"
+
+
+def test_words_of_longer_names_are_indexed(index):
+    assert index.best("навигацыя") == "Навигация по экранам"
+    assert index.best("экранм") == "Навигация по экранам"
+
+
+def test_short_queries_allow_one_edit():
+    index = FuzzyIndex()
+    index.add("Chip")
+    index.add("Tabs")
+    assert index.best("Chp") == "Chip"
+    assert index.best("Tbs") == "Tabs"
+    assert index.best("Cp") is None
+
+
+def test_no_match(index):
+    assert index.lookup("Slider") == []
+    assert index.best("") is None
+
+
+def test_catalog_suggests_frames_over_variant_names():
+    catalog = ComponentCatalog(UI_KIT_COMPONENTS)
+    assert catalog.suggest("Chekbox") == "Checkbox"
+    assert catalog.suggest("Link Cel") == "Link Cell"
+    assert catalog.suggest("State=Onn") is None  # Variant names are not indexed
+
+
+async def test_search_components_retries_a_typo(tools):
+    results = await tools.search_components("Buton", tools.FIGMA_UI_KIT_KEY)
+    assert [c["node_id"] for c in results] == ["1:11", "1:12"]
+
+
+async def test_search_patterns_retries_a_typo(tools, files):
+    files.add(tools.FIGMA_PATTERNS_KEY, {"id": "0:0", "type": "DOCUMENT", "children": [
+        {"id": "1:0", "type": "CANVAS", "name": "Валидация"},
+        {"id": "2:0", "type": "CANVAS", "name": "Пустые состояния"},
+    ]})
+    assert [p["id"] for p in await tools.search_patterns("валидацыя")] == ["1:0"]
+    assert [p["id"] for p in await tools.search_patterns("пустые")] == ["2:0"]
+    assert await tools.search_patterns("Таблицы") == []
@@ -0,0 +1,74 @@
+"""Guide frame index and guide text lookups."""
+import asyncio
+
+from src.figma_api import client
+from tools.guides import GuideIndex
+
+
+def test_find():
+    index = GuideIndex("1")
+    index.add("Link Cell / Guide", "1:1")
+    index.add("Button Group / Guide", "1:2")
+    index.add("Button / Guide", "1:3")
+    assert index.find("Button") == "1:3"           # Exact wins over the earlier "Button Group"
+    assert index.find("link cell") == "1:1"
+    assert index.find("LinkCell") == "1:1"
+    assert index.find("Group") == "1:2"            # Falls back to containment
+    assert index.find("Slider") is None
+    assert index.find("  ") is None
+    assert index.frames() == [("Link Cell / Guide", "1:1"), ("Button Group / Guide", "1:2"), ("Button / Guide", "1:3")]
+    assert len(index) == 3
+
+
+async def test_index_is_built_from_one_shallow_file_fetch(tools, figma):
+    index = await tools.get_guide_index(tools.FIGMA_UI_KIT_KEY)
+    assert index.frames() == [("Button / Guide", "1:20"), ("Checkbox / Guide", "2:20")]
+    [request] = [r for r in figma.requests if not r.url.path.endswith("/meta")]
+    assert request.url.path == f"/v1/files/{tools.FIGMA_UI_KIT_KEY}"
+    assert request.url.params["depth"] == "2"
+
+
+async def test_index_keeps_tree_order(tools, files):
+    files.add("GUIDES", {"id": "0:0", "type": "DOCUMENT", "children": [
+        {"id": "1:0", "type": "CANVAS", "name": "Guidelines", "children": [
+            {"id": "1:1", "type": "FRAME", "name": "Modal / Guide"},
+        ]},
+        {"id": "2:0", "type": "CANVAS", "name": "Inputs", "children": [
+            {"id": "2:1", "type": "FRAME", "name": "Input / Guide"},
+        ]},
+    ]})
+    index = await tools.get_guide_index("GUIDES")
+    assert [node_id for _, node_id in index.frames()] == ["1:0", "1:1", "2:1"]
+
+
+async def test_index_is_refreshed_in_the_background(tools, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+    first = await tools.get_guide_index(key)
+    assert await tools.get_guide_index(key) is first
+
+    files.set_version(key, "2")
+    client.get_version_tracker().invalidate(key)
+    assert await tools.get_guide_index(key) is first  # The stale index keeps answering
+    await tools._guide_refreshes[key]
+    refreshed = await tools.get_guide_index(key)
+    assert refreshed is not first and refreshed.version == "2"
+    assert sum(r.url.path == f"/v1/files/{key}" for r in figma.requests) == 2
+
+
+async def test_guide_text_is_cached_per_version(tools, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+    guide = await tools.get_component_guide(key, "Button")
+    assert guide == "Use one primary button per screen.\n\nKeep button labels short."
+    assert await tools.get_component_guide(key, "button") == guide
+    assert sum(r.url.path.endswith("/nodes") for r in figma.requests) == 1
+
+    files.set_version(key, "2")
+    client.get_version_tracker().invalidate(key)
+    assert await tools.get_component_guide(key, "Button") == guide
+    assert sum(r.url.path.endswith("/nodes") for r in figma.requests) == 2
+    await asyncio.gather(*tools._guide_refreshes.values())
+
+
+async def test_missing_guide(tools, figma):
+    assert await tools.get_component_guide(tools.FIGMA_UI_KIT_KEY, "Slider") is None
+    assert not any(r.url.path.endswith("/nodes") for r in figma.requests)
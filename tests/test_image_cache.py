@@ -0,0 +1,78 @@
+"""Content-addressed rendered image cache."""
+import os
+
+from src.figma_api import client
+from src.figma_api.cache import ImageCache
+from src.figma_api.files import figma_render_image
+
+
+def _key(node_id: str, version: str = "1") -> tuple:
+    return ImageCache.key("KIT", node_id, version, 2, "png")
+
+
+async def test_identical_images_are_stored_once(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+    first = await cache.put(_key("1:1"), b"png-1")
+    assert await cache.put(_key("1:1", version="2"), b"png-1") == first
+    assert await cache.get(_key("1:1", version="2")) == first
+    assert open(first, "rb").read() == b"png-1"
+    assert await cache.get(_key("1:2")) is None
+    stats = cache.stats()
+    assert (stats["images"], stats["refs"], stats["bytes"]) == (1, 2, 5)
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+async def test_eviction_drops_images_and_their_refs(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10)
+    await cache.put(_key("1:1"), b"aaaa")
+    await cache.put(_key("1:1", version="2"), b"aaaa")
+    await cache.put(_key("1:2"), b"bbbb")
+    await cache.get(_key("1:1"))  # Now the most recently used
+    await cache.put(_key("1:3"), b"cccc")
+
+    assert await cache.get(_key("1:2")) is None
+    assert await cache.get(_key("1:1", version="2")) is not None
+    stats = cache.stats()
+    assert (stats["images"], stats["refs"], stats["evictions"]) == (2, 3, 1)
+    assert len(os.listdir(tmp_path / "blobs")) == 2
+    assert len(os.listdir(tmp_path / "refs")) == 3
+
+
+async def test_oversized_images_are_not_stored(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=3)
+    assert await cache.put(_key("1:1"), b"aaaa") is None
+    assert cache.stats()["images"] == 0
+
+
+async def test_cache_survives_a_restart(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+    path = await cache.put(_key("1:1"), b"png-1")
+    (tmp_path / "refs" / "orphan").write_text("missing.png")
+    reopened = ImageCache(str(tmp_path), max_bytes=1000)
+    assert await reopened.get(_key("1:1")) == path
+    assert reopened.stats()["refs"] == 1
+    assert not (tmp_path / "refs" / "orphan").exists()
+
+
+async def test_clear(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+    await cache.put(_key("1:1"), b"png-1")
+    cache.clear()
+    assert await cache.get(_key("1:1")) is None
+    assert cache.stats()["bytes"] == 0
+
+
+async def test_renders_are_served_from_the_cache(files, figma, monkeypatch, tmp_path):
+    monkeypatch.setenv("FIGMA_CACHE", "1")
+    monkeypatch.setenv("FIGMA_CACHE_DIR", str(tmp_path))
+    files.add("KIT", {"id": "0:0", "type": "DOCUMENT", "children": [{"id": "1:1", "type": "FRAME"}]})
+
+    path = await figma_render_image("KIT", "1:1")
+    assert open(path, "rb").read() == b"PNG /KIT/1:1.png"
+    assert await figma_render_image("KIT", "1:1") == path
+    assert [r.url.host for r in figma.requests if not r.url.path.endswith("/meta")] == ["api.figma.com", "s3.test"]
+
+    files.set_version("KIT", "2")
+    client.get_version_tracker().invalidate("KIT")
+    assert await figma_render_image("KIT", "1:1") == path  # Same bytes, same image
+    assert client.get_image_cache().stats()["refs"] == 2
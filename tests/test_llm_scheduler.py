@@ -0,0 +1,87 @@
+"""Gemini call scheduler: concurrency, fairness and rate-limit pauses."""
+import asyncio
+import time
+
+from agent.scheduler import LLMScheduler, is_rate_limit, retry_delay
+
+
+def _scheduler(**kwargs) -> LLMScheduler:
+    return LLMScheduler(**{"max_concurrent": 4, "rpm": 10000, "tpm": 10_000_000, **kwargs})
+
+
+async def test_concurrency_limit():
+    scheduler = _scheduler(max_concurrent=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with scheduler.slot("user", 10):
+            peak = max(peak, scheduler.active)
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+    assert scheduler.active == 0
+
+
+async def test_users_are_served_round_robin():
+    scheduler = _scheduler(max_concurrent=1)
+    order = []
+
+    async def call(user: str, name: str):
+        async with scheduler.slot(user, 10):
+            order.append(name)
+
+    holder = scheduler.slot("other", 10)
+    await holder.__aenter__()
+    tasks = [asyncio.create_task(call("a", "a1")),
+             asyncio.create_task(call("a", "a2")),
+             asyncio.create_task(call("b", "b1"))]
+    await asyncio.sleep(0.01)
+    assert scheduler.queue_length() == 3
+    await holder.__aexit__(None, None, None)
+    await asyncio.gather(*tasks)
+    assert order == ["a1", "b1", "a2"]
+
+
+async def test_penalize_pauses_admission():
+    scheduler = _scheduler()
+    scheduler.penalize(0.2)
+    started = time.monotonic()
+    async with scheduler.slot("user", 10):
+        pass
+    assert time.monotonic() - started >= 0.19
+
+
+async def test_used_tokens_correct_the_estimate():
+    scheduler = _scheduler(tpm=6000)
+    async with scheduler.slot("user", 100) as usage:
+        usage["used_tokens"] = 1100
+    assert scheduler._tokens.available < 6000 - 1000
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = _scheduler(max_concurrent=1)
+    async with scheduler.slot("a", 10):
+        waiter = asyncio.create_task(scheduler.slot("b", 10).__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queue_length() == 0
+    async with scheduler.slot("c", 10):
+        assert scheduler.active == 1
+
+
+def test_retry_delay_uses_server_hint():
+    error = Exception("429 RESOURCE_EXHAUSTED {'retryDelay': '7s'}")
+    assert 7 <= retry_delay(error, attempt=0) < 8
+
+
+def test_retry_delay_backs_off():
+    assert 0 <= retry_delay(Exception("boom"), attempt=3, base=1.0, cap=5.0) <= 5.0
+
+
+def test_is_rate_limit():
+    assert is_rate_limit(Exception("429 Too Many Requests"))
+    assert is_rate_limit(Exception("RESOURCE_EXHAUSTED"))
+    assert not is_rate_limit(Exception("500 INTERNAL"))
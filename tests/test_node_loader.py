@@ -0,0 +1,46 @@
+"""Node loader: concurrent node fetches merged into one /nodes request."""
+import asyncio
+
+import httpx
+
+from src.figma_api.files import figma_load_nodes
+
+
+async def test_node_loader_merges_concurrent_requests(figma):
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        return httpx.Response(200, json={
+            "name": "Kit", "version": "7",
+            "nodes": {i: {"document": {"id": i, "type": "FRAME"}} for i in ids},
+        })
+    figma.handler = handler
+
+    first, second = await asyncio.gather(
+        figma_load_nodes("KEY", ["1:1", "1:2"]), figma_load_nodes("KEY", ["1:2", "1:3"])
+    )
+    assert len(figma.requests) == 1
+    assert sorted(figma.requests[0].url.params["ids"].split(",")) == ["1:1", "1:2", "1:3"]
+    assert set(first["nodes"]) == {"1:1", "1:2"} and first["version"] == "7"
+    assert second["nodes"]["1:3"]["document"]["id"] == "1:3"
+
+
+async def test_node_loader_passes_errors_through(figma):
+    figma.handler = lambda request: httpx.Response(403, text="Forbidden")
+    data = await figma_load_nodes("KEY", ["1:1"])
+    assert data["error"].startswith("HTTP 403")
+
+
+async def test_bad_id_only_fails_its_own_callers(files, figma):
+    files.add("KEY", {"id": "0:0", "type": "DOCUMENT", "children": [
+        {"id": "1:1", "type": "FRAME", "name": "Button"},
+        {"id": "1:2", "type": "FRAME", "name": "Checkbox"},
+    ]})
+    files.invalid_ids.add("bad")
+
+    good, bad, missing = await asyncio.gather(
+        figma_load_nodes("KEY", ["1:1", "1:2"]), figma_load_nodes("KEY", ["bad"]), figma_load_nodes("KEY", ["9:9"])
+    )
+    assert {i: n["document"]["name"] for i, n in good["nodes"].items()} == {"1:1": "Button", "1:2": "Checkbox"}
+    assert bad["error"].startswith("HTTP 400")
+    assert missing["nodes"] == {"9:9": None}
+    assert len([r for r in figma.requests if r.url.path.endswith("/nodes")]) == 5  # The batch, then each id
@@ -0,0 +1,46 @@
+"""Per-page name index for cover lookups."""
+import httpx
+
+from src.figma_api import client
+from tools.pages import PageIndex
+
+from conftest import UI_KIT
+
+
+def test_from_page():
+    page = UI_KIT["children"][1]
+    index = PageIndex.from_page(page, "2:0", version="1")
+    assert index.find("Checkbox") == "2:2"     # Inside a section, before the component set
+    assert index.find("forms") == "2:1"        # Sections are covers too
+    assert index.find("linkcell") == "2:30"
+    assert index.find("State=On") == "2:11"
+    assert index.find("Checkboxes select") is None  # TEXT nodes are not indexed
+    assert index.version == "1"
+
+
+async def test_page_is_fetched_once_per_version(tools, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+
+    def page_fetches():
+        return [r for r in figma.requests if r.url.path.endswith("/nodes")]
+
+    assert await tools.find_top_level_frame(key, "1:0", "Button") == "1:1"
+    assert await tools.find_top_level_frame(key, "1:0", "button / guide") == "1:20"
+    assert await tools.find_top_level_frame(key, "1:0", "Slider") is None
+    [request] = page_fetches()
+    assert request.url.params["ids"] == "1:0" and request.url.params["depth"] == "3"
+
+    files.set_version(key, "2")
+    client.get_version_tracker().invalidate(key)
+    assert await tools.find_top_level_frame(key, "1:0", "Button") == "1:1"
+    assert len(page_fetches()) == 2
+
+
+async def test_page_errors_are_not_cached(tools, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+    figma.handler = lambda request: (
+        httpx.Response(500, text="Internal error") if request.url.path.endswith("/nodes") else files(request)
+    )
+    assert await tools.find_top_level_frame(key, "1:0", "Button") is None
+    figma.handler = files
+    assert await tools.find_top_level_frame(key, "1:0", "Button") == "1:1"
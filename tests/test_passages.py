@@ -0,0 +1,59 @@
+"""Passage retrieval inside guide texts."""
+from tools.passages import Passage, PassageIndex, select_passages, split_passages
+
+
+GUIDE = "\n\n".join([
+    "Модальное окно прерывает сценарий пользователя.",
+    "Размеры",
+    "Высота модалки зависит от контента, но не больше 80% экрана.",
+    "Ширина модального окна фиксирована: 560 px.",
+    "Кнопки",
+    "Основная кнопка стоит справа.",
+])
+
+
+def test_split_passages_attaches_headings():
+    assert split_passages(GUIDE) == [
+        Passage("Модальное окно прерывает сценарий пользователя."),
+        Passage("Высота модалки зависит от контента, но не больше 80% экрана.", "Размеры"),
+        Passage("Ширина модального окна фиксирована: 560 px.", "Размеры"),
+        Passage("Основная кнопка стоит справа.", "Кнопки"),
+    ]
+
+
+def test_split_passages_pattern_sections():
+    text = "### Ошибки\nПоказывайте ошибку под полем.\nВсегда\nТекст ошибки отвечает на вопрос «что делать»."
+    assert split_passages(text) == [
+        Passage("Показывайте ошибку под полем.", "Ошибки"),
+        Passage("Текст ошибки отвечает на вопрос «что делать».", "Ошибки / Всегда"),
+    ]
+
+
+def test_heading_without_passages_is_kept():
+    assert split_passages("Intro text here.\n\nРазмеры") == [Passage("Intro text here."), Passage("Размеры")]
+
+
+def test_top_passages_come_in_guide_order():
+    index = PassageIndex(split_passages(GUIDE))
+    assert len(index) == 4
+    top = index.top("Какая высота и ширина у модалок?", limit=2, exclude="Модальное окно")
+    assert [p.text[:6] for p in top] == ["Высота", "Ширина"]
+    assert index.top("дизайн токены") == []
+
+
+def test_select_passages():
+    text, shown, total = select_passages(GUIDE, "Есть что-то про высоту модалок?", subject="Модальное окно")
+    assert text == "Размеры\nВысота модалки зависит от контента, но не больше 80% экрана."
+    assert (shown, total) == (1, 4)
+
+
+def test_select_passages_falls_back_to_the_whole_guide():
+    assert select_passages(GUIDE, None) == (GUIDE, 4, 4)
+    assert select_passages(GUIDE, "дизайн токены") == (GUIDE, 4, 4)
+    assert select_passages(None, "высота") == (None, 0, 0)
+
+
+async def test_component_details_answer_the_question(tools):
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Button", question="How long can labels be?")
+    assert result["guide"] == "Keep button labels short."
+    assert result["guide_passages"] == "1 of 2"
@@ -0,0 +1,93 @@
+"""Prompt prefix caching with the in-memory backend."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+from agent.prompt_cache import LocalCacheBackend, PromptCache
+
+
+async def lookup_component(name: str) -> dict:
+    """Look up a component.
+
+    Args:
+        name: Component name
+    """
+    return {"name": name}
+
+
+def _cache(backend, tmp_path, **kwargs) -> PromptCache:
+    return PromptCache(
+        backend,
+        "gemini-2.5-flash",
+        kwargs.pop("system_instruction", "You are a design system assistant."),
+        [lookup_component],
+        state_path=str(tmp_path / "prompt_cache.json"),
+        **kwargs
+    )
+
+
+async def test_concurrent_calls_create_the_cache_once(tmp_path):
+    backend = LocalCacheBackend()
+    cache = _cache(backend, tmp_path)
+    configs = await asyncio.gather(*(cache.generation_config() for _ in range(5)))
+    assert backend.calls["create"] == 1
+    assert {config.cached_content for config in configs} == {cache.name}
+    assert configs[0].system_instruction is None and configs[0].tools is None
+    resolved = backend.resolve(cache.name)
+    assert resolved.system_instruction == cache.system_instruction
+
+
+async def test_restart_reuses_the_cache(tmp_path):
+    backend = LocalCacheBackend()
+    name = await _cache(backend, tmp_path).ensure()
+    restarted = _cache(backend, tmp_path)
+    assert await restarted.ensure() == name
+    assert backend.calls["create"] == 1
+    assert backend.calls["get"] == 1
+
+
+async def test_changed_prompt_creates_a_new_cache(tmp_path):
+    backend = LocalCacheBackend()
+    name = await _cache(backend, tmp_path).ensure()
+    changed = _cache(backend, tmp_path, system_instruction="Answer in English.")
+    assert await changed.ensure() != name
+    assert backend.calls["create"] == 2
+
+
+async def test_refreshes_before_expiry(tmp_path):
+    backend = LocalCacheBackend()
+    cache = _cache(backend, tmp_path, ttl=3600, refresh_margin=300)
+    name = await cache.ensure()
+    cache._expires_at -= 3400  # Less than the refresh margin left
+    assert await cache.ensure() == name
+    assert backend.calls == {"create": 1, "update": 1, "get": 0}
+
+
+async def test_recreates_after_invalidate(tmp_path):
+    backend = LocalCacheBackend()
+    cache = _cache(backend, tmp_path)
+    first = await cache.ensure()
+    cache.invalidate()
+    assert await cache.ensure() != first
+    assert backend.calls["create"] == 2
+
+
+async def test_sends_inline_without_backend(tmp_path):
+    config = await _cache(None, tmp_path).generation_config()
+    assert config.cached_content is None
+    assert config.system_instruction == "You are a design system assistant."
+
+
+async def test_failed_upload_falls_back_inline(tmp_path):
+    class FailingBackend(LocalCacheBackend):
+        async def create(self, model, config):
+            self.calls["create"] += 1
+            raise RuntimeError("400 INVALID_ARGUMENT: content too small to cache")
+
+    backend = FailingBackend()
+    cache = _cache(backend, tmp_path)
+    assert (await cache.generation_config()).cached_content is None
+    assert (await cache.generation_config()).cached_content is None
+    assert backend.calls["create"] == 1  # Not retried until retry_after
@@ -0,0 +1,47 @@
+"""Tokenizer and BM25 scorer shared by full-text search and passages."""
+import pytest
+
+from tools.ranking import BM25, stem, tokenize
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("модальные", "модальн"),
+    ("модального", "модальн"),
+    ("валидации", "валидац"),
+    ("валидацию", "валидац"),
+    ("отображается", "отображает"),
+    ("buttons", "button"),
+    ("categories", "category"),
+    ("loading", "load"),
+    ("ui", "ui"),
+])
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+def test_tokenize_drops_stopwords_and_numbers():
+    assert tokenize("Расскажи про высоту модальных окон: 560 px") == ["высот", "модальн", "окон", "px"]
+    assert tokenize("What is the Ёлка?") == ["елк"]
+
+
+def test_tokenize_prefix_length():
+    assert tokenize("модалок модальные", prefix_length=5) == ["модал", "модал"]
+
+
+def test_bm25_prefers_rarer_and_denser_matches():
+    bm25 = BM25([
+        ["кнопк", "размер"],
+        ["кнопк", "цвет", "цвет"],
+        ["кнопк", "цвет", "текст", "иконк", "отступ", "размер"],
+    ])
+    assert len(bm25) == 3
+    scores = bm25.scores({"цвет"})
+    assert set(scores) == {1, 2}
+    assert scores[1] > scores[2]
+    # A term in every document still counts, but less than a rare one
+    both = bm25.scores({"кнопк", "размер"})
+    assert both[0] > both[2] > both[1] > 0
+
+
+def test_bm25_empty():
+    assert BM25([]).scores({"кнопк"}) == {}
@@ -0,0 +1,112 @@
+"""Version-aware persistent response cache."""
+import asyncio
+
+import httpx
+
+from src.figma_api import client
+from src.figma_api.cache import FileVersionTracker, ResponseCache, cacheable_file_key
+from src.figma_api.client import figma_get, request_key
+
+
+def _key(node_id: str) -> tuple:
+    return request_key("/files/KEY/nodes", {"ids": node_id})
+
+
+async def test_hits_only_for_the_stored_version(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+    await cache.put(_key("1:1"), "v1", {"name": "Button"})
+    assert await cache.get(_key("1:1"), "v1") == {"name": "Button"}
+    assert await cache.get(_key("1:1"), "v2") is None
+    # The stale entry is dropped, not kept for the old version
+    assert await cache.get(_key("1:1"), "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale"], stats["entries"]) == (1, 1, 0)
+
+
+async def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+    await cache.put(_key("1:1"), "v1", "x" * 100)
+    size = cache.stats()["bytes"]
+    cache.max_bytes = size * 3
+    await cache.put(_key("1:2"), "v1", "x" * 100)
+    await cache.put(_key("1:3"), "v1", "x" * 100)
+    await cache.get(_key("1:1"), "v1")  # Now the most recently used
+    await cache.put(_key("1:4"), "v1", "x" * 100)
+
+    assert await cache.get(_key("1:2"), "v1") is None
+    for node_id in ("1:1", "1:3", "1:4"):
+        assert await cache.get(_key(node_id), "v1") == "x" * 100
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+async def test_oversized_responses_are_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=50)
+    await cache.put(_key("1:1"), "v1", "x" * 100)
+    assert cache.stats()["entries"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_entries_survive_a_restart(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+    await cache.put(_key("1:1"), "v1", {"name": "Button"})
+    reopened = ResponseCache(str(tmp_path), max_bytes=10_000)
+    assert reopened.stats()["bytes"] == cache.stats()["bytes"]
+    assert await reopened.get(_key("1:1"), "v1") == {"name": "Button"}
+
+
+def test_cacheable_endpoints():
+    assert cacheable_file_key("/files/KEY") == "KEY"
+    assert cacheable_file_key("/files/KEY/nodes") == "KEY"
+    assert cacheable_file_key("/files/KEY/components") == "KEY"
+    assert cacheable_file_key("/files/KEY/comments") is None
+    assert cacheable_file_key("/files/KEY/meta") is None
+    assert cacheable_file_key("/images/KEY") is None
+
+
+async def test_version_probes_are_shared_and_reused():
+    probes = []
+
+    async def probe(file_key):
+        probes.append(file_key)
+        await asyncio.sleep(0.01)
+        return {"version": "7", "lastModified": "2026-01-01T00:00:00Z"}
+
+    tracker = FileVersionTracker(probe, check_interval=60)
+    results = await asyncio.gather(tracker.get("KEY"), tracker.get("KEY"))
+    assert results[0] == {"version": "7", "lastModified": "2026-01-01T00:00:00Z"}
+    await tracker.get("KEY")
+    assert probes == ["KEY"]
+    tracker.invalidate("KEY")
+    await tracker.get("KEY")
+    assert probes == ["KEY", "KEY"]
+
+
+async def test_failed_probe_means_unknown_version():
+    async def probe(file_key):
+        return {"error": "HTTP 404: Not found"}
+    assert await FileVersionTracker(probe).get("KEY") is None
+
+
+async def test_file_responses_are_cached_per_version(figma, monkeypatch, tmp_path):
+    monkeypatch.setenv("FIGMA_CACHE", "1")
+    monkeypatch.setenv("FIGMA_CACHE_DIR", str(tmp_path))
+    version = {"current": "1"}
+
+    def handler(request):
+        if request.url.path.endswith("/meta"):
+            return httpx.Response(200, json={"file": {"version": version["current"]}})
+        return httpx.Response(200, json={"meta": {"components": [], "version": version["current"]}})
+    figma.handler = handler
+
+    def fetches():
+        return [r for r in figma.requests if r.url.path.endswith("/components")]
+
+    first = await figma_get("/files/KEY/components")
+    assert await figma_get("/files/KEY/components") == first
+    assert len(fetches()) == 1
+
+    version["current"] = "2"
+    client.get_version_tracker().invalidate("KEY")
+    assert (await figma_get("/files/KEY/components"))["meta"]["version"] == "2"
+    assert len(fetches()) == 2
@@ -0,0 +1,76 @@
+"""Deterministic intent router and its answer templates."""
+import pytest
+
+from agent.router import DETAILS, VARIANTS, IntentRouter, Route, render
+
+
+@pytest.fixture
+def router():
+    return IntentRouter({
+        "components": ["Button", "Link Cell", "Checkbox", "Modal"],
+        "organisms": ["Bank Card"],
+        "patterns": ["Валидация", "Modal"],
+    })
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Расскажи про Button", Route("components", "Button", DETAILS)),
+    ("Какие варианты у Checkbox?", Route("components", "Checkbox", VARIANTS)),
+    ("tell me about link cell", Route("components", "Link Cell", DETAILS)),
+    ("Bank Card", Route("organisms", "Bank Card", DETAILS)),
+    ("расскажи про валидацию", Route("patterns", "Валидация", DETAILS)),
+    ("Chekbox", Route("components", "Checkbox", DETAILS)),
+    ("паттерн Modal", Route("patterns", "Modal", DETAILS)),
+    ("компонент Modal", Route("components", "Modal", DETAILS)),
+])
+def test_routes_lookups(router, message, expected):
+    assert router.route(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "Modal",                                # Both a component and a pattern
+    "Расскажи про Foo",                     # Unknown name
+    "Какие варианты у паттерна Валидация",  # Patterns have no variants
+    "Как сделать форму с валидацией, чтобы ошибки показывались под полем после отправки?",
+    "",
+])
+def test_leaves_the_rest_to_the_model(router, message):
+    assert router.route(message) is None
+
+
+def test_renders_component_details():
+    result = {
+        "found_name": "Button",
+        "guide": "Use one primary button per screen.",
+        "props": {"summary": "Size: S|M|L"},
+        "figma_link": "https://www.figma.com/design/KEY?node-id=1-2",
+    }
+    answer = render(Route("components", "Button", DETAILS), result)
+    assert answer.startswith("### Button")
+    assert "Use one primary button per screen." in answer
+    assert "Size: S|M|L" in answer
+    assert "node-id=1-2" in answer
+
+
+def test_renders_variants():
+    result = {"found_name": "Button", "props": {"summary": "Size: S|M|L"}, "variants_count": 12}
+    answer = render(Route("components", "Button", VARIANTS), result)
+    assert "Size: S|M|L" in answer and "12" in answer
+
+
+@pytest.mark.parametrize("route, result", [
+    (Route("components", "Button", DETAILS), {"error": "Not found"}),
+    (Route("components", "Button", DETAILS), {"found_name": "Checkbox", "guide": "…"}),
+    (Route("components", "Button", DETAILS), {"found_name": "Button"}),
+    (Route("components", "Button", VARIANTS), {"found_name": "Button", "guide": "…"}),
+    (Route("patterns", "Валидация", DETAILS), {"name": "Формы", "guide": "…"}),
+])
+def test_falls_back_when_result_does_not_answer(route, result):
+    assert render(route, result) is None
+
+
+def test_long_guides_are_trimmed():
+    guide = "\n".join(f"Rule {i}: " + "x" * 60 for i in range(200))
+    answer = render(Route("patterns", "Валидация", DETAILS), {"name": "Валидация", "guide": guide})
+    assert len(answer) < len(guide)
+    assert answer.endswith("…")
@@ -0,0 +1,51 @@
+"""Ranked component search matches the legacy tiered scan."""
+import pytest
+
+from scripts.bench_search import QUERIES, legacy_search, make_components
+from tools.catalog import ComponentCatalog
+
+from conftest import component
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    components = make_components(3000, seed=7)
+    return components, ComponentCatalog(components)
+
+
+@pytest.mark.parametrize("query", QUERIES + ["Size=S, Type=Ghost", "Tab-Bar", "icon_button", "  Modal  "])
+def test_matches_the_legacy_ranking(synthetic, query):
+    components, catalog = synthetic
+    expected = legacy_search(components, query)
+    assert [c["node_id"] for c in catalog.search(query)] == [c["node_id"] for c in expected]
+
+
+def test_tiers():
+    components = [
+        component("1:1", "Big Button", "1:0", "Controls", "0:1"),             # fuzzy
+        component("1:2", "Icon-Button", "1:5", "Icons", "0:1"),               # fuzzy
+        component("1:3", "Button Small", "1:6", "Misc", "0:1"),               # name prefix
+        component("1:4", "Primary", "1:7", "Button Group", "0:1"),            # frame prefix
+        component("1:5", "button", "1:8", "Misc", "0:1"),                     # exact name
+        component("1:6", "Size=S", "1:9", "Button", "0:1"),                   # exact frame
+    ]
+    catalog = ComponentCatalog(components)
+    assert [c["node_id"] for c in catalog.search("Button")] == ["1:6", "1:5", "1:4", "1:3", "1:1", "1:2"]
+    assert [c["node_id"] for c in catalog.search("iconbutton")] == ["1:2"]
+
+
+def test_short_queries_skip_the_fuzzy_tier():
+    components = [
+        component("1:1", "Stab", "1:0", "Misc", "0:1"),                       # contains
+        component("1:2", "Ta-b", "1:5", "Misc", "0:1"),                       # fuzzy only
+        component("1:3", "Tab Item", "1:6", "Tabs", "0:1"),                   # prefix
+    ]
+    catalog = ComponentCatalog(components)
+    assert [c["node_id"] for c in catalog.search("tab")] == ["1:3", "1:1"]
+
+
+def test_limit_keeps_the_best_tiers():
+    components = [component(f"1:{i}", f"Row {i}", "1:0", "Table", "0:1") for i in range(30)]
+    components.append(component("2:1", "Size=S", "2:0", "Row", "0:1"))
+    results = ComponentCatalog(components).search("row", limit=5)
+    assert [c["node_id"] for c in results] == ["2:1", "1:0", "1:1", "1:2", "1:3"]
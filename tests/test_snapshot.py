@@ -0,0 +1,128 @@
+"""Offline design system snapshot."""
+import httpx
+import pytest
+
+from src.figma_api import client
+from tools.snapshot import SNAPSHOT_FORMAT, Snapshot
+
+
+BUTTON = {
+    "name": "Button",
+    "file_key": "KIT",
+    "node_id": "1:10",
+    "page_id": "1:0",
+    "cover_node_id": "1:1",
+    "guide_node_id": "1:20",
+    "guide": "Use one primary button per screen.",
+    "props": {"Size": {"type": "VARIANT", "variantOptions": ["S", "M"]}},
+    "variants_count": 2,
+}
+
+
+def test_names_only_format_loads_without_data():
+    snapshot = Snapshot({"components": ["Button", "Checkbox"], "patterns": ["Валидация"]})
+    assert snapshot.format == 1
+    assert len(snapshot) == 3 and snapshot.detailed() == 0
+    assert snapshot.names() == {"components": ["Button", "Checkbox"], "organisms": [], "patterns": ["Валидация"]}
+    assert snapshot.find("components", "Button") is None
+
+
+def test_find_by_file_or_kind():
+    snapshot = Snapshot({"format": 2, "files": {"KIT": {"kind": "components", "version": "1"}}, "components": [BUTTON]})
+    assert snapshot.find("KIT", "button") is snapshot.find("components", "Button ") is not None
+    assert snapshot.find("OTHER", "Button") is None
+    assert snapshot.version("KIT") == "1" and snapshot.version("OTHER") is None
+
+
+def test_replace_rebuilds_one_file():
+    snapshot = Snapshot({"components": ["Button"]}).replace("components", "KIT", "1", [BUTTON])
+    assert snapshot.format == SNAPSHOT_FORMAT
+    assert snapshot.names()["components"] == ["Button"]  # The names-only entry is dropped
+    checkbox = {**BUTTON, "name": "Checkbox", "node_id": "2:10"}
+    replaced = snapshot.replace("components", "KIT", "2", [checkbox])
+    assert replaced.names()["components"] == ["Checkbox"]
+    assert replaced.version("KIT") == "2"
+    assert snapshot.version("KIT") == "1"
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "snapshot" / "index.json")
+    snapshot = Snapshot().replace("components", "KIT", "1", [BUTTON])
+    snapshot.built_at = "2026-01-01T00:00:00+00:00"
+    snapshot.save(path)
+    loaded = Snapshot.load(path)
+    assert loaded.to_dict() == snapshot.to_dict()
+    assert loaded.find("KIT", "Button") == BUTTON
+
+
+def test_load_snapshot_prefers_the_refreshed_copy(tools, monkeypatch, tmp_path):
+    bundled, refreshed = str(tmp_path / "bundled.json"), str(tmp_path / "refreshed.json")
+    Snapshot({"components": ["Button"]}).save(bundled)
+    monkeypatch.setattr(tools, "SNAPSHOT_PATH", bundled)
+    monkeypatch.setattr(tools, "SNAPSHOT_CACHE_PATH", refreshed)
+    assert tools.load_snapshot().format == 1
+    Snapshot().replace("components", "KIT", "1", [BUTTON]).save(refreshed)
+    assert tools.load_snapshot().detailed() == 1
+    assert tools.get_snapshot() is tools._snapshot
+
+
+@pytest.fixture
+async def snapshot(tools, monkeypatch):
+    """A snapshot of the UI kit built from the in-memory files."""
+    built = await tools.build_snapshot(file_keys=[tools.FIGMA_UI_KIT_KEY])
+    monkeypatch.setattr(tools, "_snapshot", built)
+    for name in ("_catalogs", "_guide_indexes", "_guide_texts", "_page_indexes"):
+        monkeypatch.setattr(tools, name, {})
+    return built
+
+
+async def test_build_snapshot(tools, snapshot):
+    key = tools.FIGMA_UI_KIT_KEY
+    assert snapshot.version(key) == "1"
+    button = snapshot.find(key, "Button")
+    assert button == {
+        "name": "Button",
+        "file_key": key,
+        "node_id": "1:10",
+        "page_id": "1:0",
+        "cover_node_id": "1:1",
+        "guide_node_id": "1:20",
+        "guide": "Use one primary button per screen.\n\nKeep button labels short.",
+        "props": button["props"],
+        "variants_count": 2,
+    }
+    assert set(button["props"]) == {"Size", "Disabled"}
+    assert snapshot.find(key, "Checkbox")["cover_node_id"] == "2:2"
+
+
+async def test_details_are_served_from_a_current_snapshot(tools, snapshot, figma):
+    figma.requests.clear()
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "button")
+    assert result["found_name"] == "Button"
+    assert result["_debug_info"]["source"] == "snapshot"
+    assert result["guide"].startswith("Use one primary button per screen.")
+    assert result["props"]["definitions"] == snapshot.find(tools.FIGMA_UI_KIT_KEY, "Button")["props"]
+    # Only the preview is rendered
+    assert [r.url.path.split("/")[2] for r in figma.requests] == ["images"]
+
+
+async def test_stale_snapshot_falls_back_to_figma(tools, snapshot, files, figma):
+    key = tools.FIGMA_UI_KIT_KEY
+    files.set_version(key, "2")
+    client.get_version_tracker().invalidate(key)
+    result = await tools.get_component_details(key, "Button")
+    assert "source" not in result["_debug_info"]
+    await tools._snapshot_refresh  # A stale entry starts a refresh
+    assert tools.get_snapshot().version(key) == "2"
+
+
+async def test_snapshot_is_served_when_figma_is_unreachable(tools, snapshot, figma):
+    def handler(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+    figma.handler = handler
+    client.get_version_tracker().invalidate()
+
+    result = await tools.get_component_details(tools.FIGMA_UI_KIT_KEY, "Button")
+    assert result["_debug_info"]["source"] == "snapshot"
+    assert result["guide"].startswith("Use one primary button per screen.")
+    assert result["image_url"] is None
@@ -0,0 +1,92 @@
+"""Streaming node parser on canned Figma responses."""
+import json
+
+import httpx
+import pytest
+
+from src.figma_api.client import FigmaAPIError
+from src.figma_api.files import figma_stream_nodes, instances_of, name_contains, of_type, text_under
+
+
+DOCUMENT = {
+    "id": "0:0", "type": "DOCUMENT", "name": "Document",
+    "children": [
+        {
+            "id": "0:1", "type": "CANVAS", "name": "Buttons",
+            "backgroundColor": {"r": 1, "g": 1, "b": 1, "a": 1},
+            "children": [
+                {
+                    "id": "1:1", "type": "FRAME", "name": "Button / Guide",
+                    "absoluteBoundingBox": {"x": 0, "y": 0, "width": 100, "height": 50},
+                    "children": [
+                        {"id": "1:2", "type": "TEXT", "name": "Title", "characters": "Buttons"},
+                        {"id": "1:3", "type": "INSTANCE", "name": "Button", "componentId": "9:1",
+                         "children": [{"id": "I1:3;1", "type": "TEXT", "characters": "OK"}]},
+                        {"id": "1:4", "type": "TEXT", "name": "Body", "characters": "Use one primary button"},
+                    ],
+                },
+                {"id": "1:5", "type": "TEXT", "name": "Note", "characters": "Outside the guide"},
+            ],
+        },
+        {"id": "0:2", "type": "CANVAS", "name": "Inputs", "children": []},
+    ],
+}
+
+
+def _chunked(payload: dict, size: int = 7):
+    """Response body in small chunks, splitting tokens across reads."""
+    body = json.dumps(payload).encode()
+
+    async def chunks():
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+    return chunks()
+
+
+async def _collect(file_key, visitor, **kwargs):
+    return [(dict(node), [a.get("id") for a in ancestors])
+            async for node, ancestors in figma_stream_nodes(file_key, visitor, **kwargs)]
+
+
+async def test_streams_picked_nodes_in_document_order(figma):
+    figma.handler = lambda request: httpx.Response(
+        200, content=_chunked({"name": "Kit", "version": "7", "document": DOCUMENT})
+    )
+    found = await _collect("KEY", text_under({"1:1"}))
+    assert [node["characters"] for node, _ in found] == ["Buttons", "OK", "Use one primary button"]
+    assert found[0][1] == ["0:0", "0:1", "1:1"]
+    assert figma.requests[0].url.path == "/v1/files/KEY"
+
+
+async def test_nested_properties_are_skipped(figma):
+    figma.handler = lambda request: httpx.Response(200, content=_chunked({"document": DOCUMENT}))
+    found = await _collect("KEY", name_contains("guide"), depth=2)
+    assert found == [({"id": "1:1", "type": "FRAME", "name": "Button / Guide"}, ["0:0", "0:1"])]
+    assert figma.requests[0].url.params["depth"] == "2"
+
+
+async def test_pages_and_instances(figma):
+    figma.handler = lambda request: httpx.Response(200, content=_chunked({"document": DOCUMENT}))
+    pages = await _collect("KEY", of_type("CANVAS"))
+    assert [node["name"] for node, _ in pages] == ["Buttons", "Inputs"]
+    instances = await _collect("KEY", instances_of("9:1"))
+    assert [(node["id"], ancestors[-1]) for node, ancestors in instances] == [("1:3", "1:1")]
+
+
+async def test_streams_nodes_endpoint(figma):
+    guide = DOCUMENT["children"][0]["children"][0]
+    payload = {
+        "name": "Kit",
+        "nodes": {"1:1": {"document": guide, "components": {"9:1": {"name": "Button", "key": "abc"}}}},
+    }
+    figma.handler = lambda request: httpx.Response(200, content=_chunked(payload, size=3))
+    found = await _collect("KEY", of_type("TEXT"), ids=["1:1"])
+    assert [node["id"] for node, _ in found] == ["1:2", "I1:3;1", "1:4"]
+    assert figma.requests[0].url.path == "/v1/files/KEY/nodes"
+    assert figma.requests[0].url.params["ids"] == "1:1"
+
+
+async def test_error_response_raises(figma):
+    figma.handler = lambda request: httpx.Response(404, json={"status": 404, "err": "Not found"})
+    with pytest.raises(FigmaAPIError, match="HTTP 404"):
+        await _collect("MISSING", of_type("TEXT"))
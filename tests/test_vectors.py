@@ -0,0 +1,74 @@
+"""Local vector similarity search."""
+import numpy as np
+import pytest
+
+from tools.vectors import VectorIndex, ngrams
+
+
+TEXTS = [
+    "Модальное окно",
+    "Кнопка",
+    "Выпадающий список",
+    "Высота модального окна не больше 80% экрана",
+    "Поле ввода с ошибкой",
+]
+
+
+@pytest.fixture
+def index():
+    items = [{"kind": "passage" if i == 3 else "component", "name": text} for i, text in enumerate(TEXTS)]
+    return VectorIndex(TEXTS, items)
+
+
+def test_ngrams():
+    assert ngrams("Ёж") == [" еж", "еж ", " еж "]
+    assert ngrams("ab cd")[:2] == [" ab", "ab "]
+
+
+def test_similar_texts_rank_first(index):
+    results = index.search("модалка")
+    assert results[0]["name"] == "Модальное окно"
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert index.search("выпадащий спсок")[0]["name"] == "Выпадающий список"  # Typos still overlap
+
+
+def test_scores_are_cosine_similarities(index):
+    scores = index.scores(["Кнопка", "zzz"])
+    assert scores.shape == (2, len(TEXTS))
+    assert scores[0, 1] == pytest.approx(1.0, abs=1e-5)
+    assert np.all(scores[1] == 0)
+
+
+def test_search_batch_matches_single_searches(index):
+    queries = ["модальное", "ошибка в поле", "кнопки"]
+    assert index.search_batch(queries, limit=3) == [index.search(q, limit=3) for q in queries]
+
+
+def test_filters(index):
+    assert [r["name"] for r in index.search("модального окна", kinds={"passage"})] == [TEXTS[3]]
+    assert index.search("модалка", min_score=1.0) == []
+    assert len(index.search("окно", limit=1, min_score=0.0)) == 1
+
+
+def test_empty_index():
+    index = VectorIndex([], [])
+    assert len(index) == 0
+    assert index.search_batch(["кнопка", "поле"]) == [[], []]
+
+
+def test_texts_and_items_must_match():
+    with pytest.raises(ValueError):
+        VectorIndex(["Кнопка"], [])
+
+
+async def test_similar_search_mode(tools, files):
+    files.add(tools.FILE_KEYS["organisms"], {"id": "0:0", "type": "DOCUMENT", "children": []})
+    files.add(tools.FIGMA_PATTERNS_KEY, {"id": "0:0", "type": "DOCUMENT", "children": []})
+    results = await tools.search_design_system("чекбокс checkbox", mode="similar")
+    assert results[0]["name"] == "Checkbox"
+    assert results[0]["source"] == "ui-kit" and results[0]["matched"] == "frame"
+
+    await tools._fulltext_refresh  # Guides found in the background are indexed too
+    results = await tools.search_design_system("checkboxes select options", mode="similar")
+    assert results[0]["matched"] == "passage" and results[0]["name"] == "Checkbox"
+    assert await tools.get_vector_index() is await tools.get_vector_index()